@@ -0,0 +1,333 @@
+import argparse
+import gzip
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from bson import CodecOptions, decode_file_iter, json_util
+from bson.raw_bson import RawBSONDocument
+from pymongo import IndexModel, MongoClient
+from pymongo.client_session import ClientSession
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+from database import COLLECTIONS, DATABASE_NAME, DATABASE_URL
+from utils.images import IMAGES_BUCKET
+
+# Backup settings
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+DUMP_BATCH_SIZE = 1000  # Documents requested per raw batch from the server
+RESTORE_BATCH_SIZE = 1000  # Documents sent per insert_many call
+COMPRESSION_LEVEL = 6  # gzip level used for the dump files
+DUPLICATE_KEY_ERROR = 11000
+# GridFS collections of the recipe images, backed up next to the document models
+GRIDFS_COLLECTIONS = [f"{IMAGES_BUCKET}.files", f"{IMAGES_BUCKET}.chunks"]
+
+
+def collection_name(model: type) -> str:
+    """
+    Resolve the MongoDB collection name of a Beanie model without initializing Beanie.
+
+    Args:
+        model (type): Beanie document model listed in COLLECTIONS.
+
+    Returns:
+        str: The collection name declared in the model settings or the class name.
+    """
+    settings = getattr(model, "Settings", None)
+    return getattr(settings, "name", None) or model.__name__
+
+
+def backup_collections() -> List[str]:
+    """
+    List the collections included in a backup.
+
+    Returns:
+        List[str]: The collections of the COLLECTIONS models and the GridFS collections.
+    """
+    return [collection_name(model) for model in COLLECTIONS] + GRIDFS_COLLECTIONS
+
+
+def count_raw_documents(batch: bytes) -> int:
+    """
+    Count the documents in a raw BSON batch by walking the length prefixes, without decoding them.
+
+    Args:
+        batch (bytes): Concatenated BSON documents.
+
+    Returns:
+        int: Number of documents in the batch.
+    """
+    count = 0
+    offset = 0
+    while offset < len(batch):
+        (size,) = struct.unpack_from("<i", batch, offset)
+        offset += size
+        count += 1
+    return count
+
+
+def report(action: str, name: str, documents: int, size: int, elapsed: float) -> None:
+    """
+    Print the throughput of a dump or restore step.
+
+    Args:
+        action (str): Name of the step (dump or restore).
+        name (str): Collection name or "total".
+        documents (int): Number of documents processed.
+        size (int): Uncompressed BSON bytes processed.
+        elapsed (float): Elapsed seconds.
+    """
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"{action} {name}: {documents} docs, {size / 1_000_000:.2f} MB in {elapsed:.2f}s "
+        f"({size / 1_000_000 / elapsed:.2f} MB/s, {documents / elapsed:.0f} docs/s)"
+    )
+
+
+def dump_collection(
+    db: Database, name: str, output_dir: str, session: ClientSession
+) -> Tuple[int, int]:
+    """
+    Stream a collection to `<name>.bson.gz` using raw BSON batches and save its index specs.
+
+    Args:
+        db (Database): Source database.
+        name (str): Collection name.
+        output_dir (str): Directory for the dump files.
+        session (ClientSession): Session of the dump, a snapshot session reads every collection at the same point in time.
+
+    Returns:
+        Tuple[int, int]: Number of documents and uncompressed bytes written.
+    """
+    collection = db[name]
+    documents = 0
+    size = 0
+    start = time.perf_counter()
+
+    with gzip.open(
+        os.path.join(output_dir, f"{name}.bson.gz"),
+        "wb",
+        compresslevel=COMPRESSION_LEVEL,
+    ) as file:
+        # Raw batches are written as received, no decode/encode round trip
+        for batch in collection.find_raw_batches(
+            batch_size=DUMP_BATCH_SIZE, session=session
+        ):
+            file.write(batch)
+            documents += count_raw_documents(batch)
+            size += len(batch)
+
+    indexes = [index for index in collection.list_indexes() if index["name"] != "_id_"]
+    with open(os.path.join(output_dir, f"{name}.indexes.json"), "w") as file:
+        file.write(json_util.dumps(indexes))
+
+    report("dump", name, documents, size, time.perf_counter() - start)
+    return documents, size
+
+
+def insert_batch(
+    collection: Collection, batch: List[RawBSONDocument]
+) -> Tuple[int, int]:
+    """
+    Insert a batch of documents, skipping the ones whose _id or unique keys already exist.
+
+    Args:
+        collection (Collection): Target collection.
+        batch (List[RawBSONDocument]): Documents to insert.
+
+    Raises:
+        BulkWriteError: If an insert fails for another reason than a duplicate key.
+
+    Returns:
+        Tuple[int, int]: Number of inserted and skipped documents.
+    """
+    try:
+        collection.insert_many(batch, ordered=False)
+    except BulkWriteError as error:
+        if any(
+            write_error["code"] != DUPLICATE_KEY_ERROR
+            for write_error in error.details["writeErrors"]
+        ):
+            raise
+        return error.details["nInserted"], len(error.details["writeErrors"])
+    return len(batch), 0
+
+
+def restore_collection(
+    db: Database, name: str, input_dir: str, drop: bool
+) -> Tuple[int, int]:
+    """
+    Restore a collection from its dump file with unordered insert_many batches.
+
+    Args:
+        db (Database): Target database.
+        name (str): Collection name.
+        input_dir (str): Directory with the dump files.
+        drop (bool): Drop the collection before restoring it.
+
+    Returns:
+        Tuple[int, int]: Number of documents and uncompressed bytes restored.
+    """
+    path = os.path.join(input_dir, f"{name}.bson.gz")
+    if not os.path.exists(path):
+        print(f"restore {name}: no dump file, skipped")
+        return 0, 0
+
+    collection = db.get_collection(name, codec_options=RAW_CODEC_OPTIONS)
+    if drop:
+        collection.drop()
+
+    documents = 0
+    skipped = 0
+    size = 0
+    batch: List[RawBSONDocument] = []
+    start = time.perf_counter()
+
+    with gzip.open(path, "rb") as file:
+        for document in decode_file_iter(file, RAW_CODEC_OPTIONS):
+            batch.append(document)
+            size += len(document.raw)
+            if len(batch) >= RESTORE_BATCH_SIZE:
+                inserted, duplicates = insert_batch(collection, batch)
+                documents += inserted
+                skipped += duplicates
+                batch = []
+        if batch:
+            inserted, duplicates = insert_batch(collection, batch)
+            documents += inserted
+            skipped += duplicates
+
+    report("restore", name, documents, size, time.perf_counter() - start)
+    if skipped:
+        # Restoring without --drop keeps the documents already in the collection
+        print(f"restore {name}: {skipped} duplicates skipped")
+    return documents, size
+
+
+def rebuild_indexes(db: Database, name: str, input_dir: str) -> None:
+    """
+    Recreate the indexes saved next to a collection dump.
+
+    Args:
+        db (Database): Target database.
+        name (str): Collection name.
+        input_dir (str): Directory with the dump files.
+    """
+    path = os.path.join(input_dir, f"{name}.indexes.json")
+    if not os.path.exists(path):
+        return
+
+    with open(path) as file:
+        specs = json_util.loads(file.read())
+
+    indexes = []
+    for spec in specs:
+        keys = list(spec.pop("key").items())
+        spec.pop("v", None)
+        spec.pop("ns", None)
+        indexes.append(IndexModel(keys, **spec))
+
+    if indexes:
+        db[name].create_indexes(indexes)
+        print(f"indexes {name}: {len(indexes)} rebuilt")
+
+
+def dump(client: MongoClient, output_dir: str, snapshot: bool) -> None:
+    """
+    Dump every backed up collection to the output directory.
+
+    Args:
+        client (MongoClient): MongoDB client.
+        output_dir (str): Directory for the dump files.
+        snapshot (bool): Use snapshot reads (replica sets only).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    db = client[DATABASE_NAME]
+    start = time.perf_counter()
+    documents = 0
+    size = 0
+    # One session for every collection, with snapshot reads they share its point in time
+    with client.start_session(snapshot=snapshot) as session:
+        for name in backup_collections():
+            collection_documents, collection_size = dump_collection(
+                db, name, output_dir, session
+            )
+            documents += collection_documents
+            size += collection_size
+    report("dump", "total", documents, size, time.perf_counter() - start)
+
+
+def restore(client: MongoClient, input_dir: str, drop: bool, workers: int) -> None:
+    """
+    Restore every backed up collection in parallel and rebuild the indexes at the end.
+
+    Args:
+        client (MongoClient): MongoDB client.
+        input_dir (str): Directory with the dump files.
+        drop (bool): Drop each collection before restoring it.
+        workers (int): Number of collections restored at the same time.
+    """
+    db = client[DATABASE_NAME]
+    names = backup_collections()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda name: restore_collection(db, name, input_dir, drop), names
+            )
+        )
+
+    # Indexes are built once the data is loaded, which is faster than maintaining them per insert
+    for name in names:
+        rebuild_indexes(db, name, input_dir)
+
+    documents = sum(result[0] for result in results)
+    size = sum(result[1] for result in results)
+    report("restore", "total", documents, size, time.perf_counter() - start)
+
+
+def main() -> None:
+    """
+    Command line entry point: `python backup.py dump|restore <directory>`.
+    """
+    parser = argparse.ArgumentParser(
+        description="MongoChef database backup and restore."
+    )
+    parser.add_argument("--uri", default=DATABASE_URL, help="MongoDB connection string")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = subparsers.add_parser(
+        "dump", help="Dump the collections to a directory"
+    )
+    dump_parser.add_argument("directory")
+    dump_parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Read from a single snapshot (replica sets only)",
+    )
+
+    restore_parser = subparsers.add_parser(
+        "restore", help="Restore the collections from a directory"
+    )
+    restore_parser.add_argument("directory")
+    restore_parser.add_argument(
+        "--drop", action="store_true", help="Drop collections before restoring"
+    )
+    restore_parser.add_argument("--workers", type=int, default=len(COLLECTIONS))
+
+    args = parser.parse_args()
+    client = MongoClient(args.uri)
+    try:
+        if args.command == "dump":
+            dump(client, args.directory, args.snapshot)
+        else:
+            restore(client, args.directory, args.drop, args.workers)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
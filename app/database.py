@@ -1,3 +1,4 @@
+import os
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 from models.users_model import Users
@@ -5,9 +6,14 @@ from models.ingredients_model import Ingredients
 from models.kitchen_tools_model import KitchenTools
 from models.categories_model import Categories
 from models.recipes_model import Recipes
+from models.recipe_signatures_model import RecipeSignatures
+from utils.db_roundtrips import roundtrip_listener
+from utils.query_log import slow_query_listener
+from utils.read_routing import causal_token_listener
 
 # MongoDB connection settings
-DATABASE_URL = "mongodb://localhost:27017"
+# A replica set URL, such as mongodb://localhost:27017/?replicaSet=rs0, enables the secondary reads
+DATABASE_URL = os.getenv("MONGOCHEF_DATABASE_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "mongochef"
 COLLECTIONS = [
     Users,
@@ -15,6 +21,7 @@ COLLECTIONS = [
     KitchenTools,
     Categories,
     Recipes,
+    RecipeSignatures,
 ]  # Collections to use and create
 
 
@@ -26,7 +33,15 @@ async def init() -> AsyncIOMotorClient:
     Returns:
         AsyncIOMotorClient: The MongoDB client instance.
     """
-    client = AsyncIOMotorClient(DATABASE_URL)
+    client = AsyncIOMotorClient(
+        DATABASE_URL,
+        event_listeners=[
+            slow_query_listener,
+            roundtrip_listener,
+            causal_token_listener,
+        ],
+    )
     db = client[DATABASE_NAME]
+    slow_query_listener.attach(db)
     await init_beanie(database=db, document_models=COLLECTIONS)
     return client  # Return the client for close use
@@ -2,13 +2,25 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from database import init
 from routers import (
+    admin_router,
+    events_router,
     users_router,
     ingredients_router,
     kitchen_tools_router,
     categories_router,
     recipes_router,
+    recipe_images_router,
 )
-from typing import AsyncGenerator, Any
+from typing import AsyncGenerator, Any, Dict
+from utils.admission import AdmissionControl
+from utils.compression import compression
+from utils.db_roundtrips import db_accounting
+from utils.events import change_stream_source
+from utils.images import shutdown_thumbnail_pool
+from utils.profiling import PROFILING_ENABLED, RequestProfiler
+from utils.read_routing import causal_tokens
+from utils.request_context import request_context
+from utils.views import view_counter
 
 
 @asynccontextmanager
@@ -20,8 +32,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
         app (FastAPI): FastAPI application instance.
     """
     app.state.mongo_client = await init()
+    if change_stream_source is not None:
+        change_stream_source.start()
+    view_counter.start()
     yield
-    await app.state.mongo_client.close()
+    # The views still in memory are written before the connection closes
+    await view_counter.stop()
+    if change_stream_source is not None:
+        await change_stream_source.stop()
+    shutdown_thumbnail_pool()
+    app.state.mongo_client.close()
 
 
 # Instance with the initial settings
@@ -33,8 +53,38 @@ app = FastAPI(
     lifespan=lifespan,  # Event handler for the lifespan of the app
 )
 
+# Profiles the requests selected by the sample rate or the X-Profile header, innermost
+# so it runs in the same task as the route handler
+if PROFILING_ENABLED:
+    app.add_middleware(RequestProfiler)
+# Requests of saturated route groups are shed before they reach the connection pool
+app.add_middleware(AdmissionControl)
+# Reports the MongoDB round trips of each request in the response headers
+app.middleware("http")(db_accounting)
+# Returns the time of the writes of each request for the causally consistent reads
+app.middleware("http")(causal_tokens)
+# Publishes the current route to the MongoDB command listeners
+app.middleware("http")(request_context)
+# Compresses the large JSON and MessagePack bodies with gzip or brotli
+app.middleware("http")(compression)
+
+
+@app.get("/health", tags=["health"])
+async def health() -> Dict[str, str]:
+    """
+    Health check that never waits for the admission control or MongoDB.
+
+    Returns:
+        Dict[str, str]: The status of the API worker.
+    """
+    return {"status": "ok"}
+
+
 app.include_router(users_router.router, tags=["users"])
 app.include_router(ingredients_router.router, tags=["ingredients"])
 app.include_router(kitchen_tools_router.router, tags=["kitchen_tools"])
 app.include_router(categories_router.router, tags=["categories"])
 app.include_router(recipes_router.router, tags=["recipes"])
+app.include_router(recipe_images_router.router, tags=["recipes"])
+app.include_router(admin_router.router, tags=["admin"])
+app.include_router(events_router.router, tags=["events"])
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from database import DATABASE_NAME, DATABASE_URL, init
+from models.recipes_model import Recipes
+from utils.fingerprint import backfill_fingerprints
+from utils.migrations import migrate_names, migrate_object_ids
+from utils.similarity import rebuild_index
+from utils.usage import reconcile_usage_counts
+
+
+async def rebuild_similarity() -> None:
+    """
+    Rebuild the similar recipes index from every recipe in the database.
+    """
+    indexed = await rebuild_index()
+    print(f"similarity: {indexed} recipes indexed")
+
+
+async def reconcile_usage() -> None:
+    """
+    Rebuild the usage counters of the ingredients, kitchen tools and categories.
+    """
+    summary = await reconcile_usage_counts()
+    for collection, in_use in summary.items():
+        print(f"usage: {collection} {in_use} entries in use")
+
+
+async def backfill_fingerprint() -> None:
+    """
+    Compute the content fingerprint of the recipes that do not have it or whose content changed.
+    """
+    updated = await backfill_fingerprints()
+    print(f"fingerprint: {updated} recipes updated")
+
+
+async def migrate_references() -> None:
+    """
+    Convert the catalog references of the recipes to ObjectIds and print the size reduction of the collection.
+    """
+    summary = await migrate_object_ids(Recipes.get_motor_collection().database)
+    print(f"references: {summary['migrated']} recipes converted")
+    for key, before in summary["before"].items():
+        after = summary["after"].get(key, 0)
+        print(f"references: {key} {before} -> {after} ({after - before:+d})")
+
+
+async def migrate_collation() -> None:
+    """
+    Merge the near-duplicate names before the collation indexes are built, then rebuild the usage counters.
+    """
+    # Beanie would try to build the unique collation indexes over the duplicates
+    client = AsyncIOMotorClient(DATABASE_URL)
+    try:
+        summary = await migrate_names(client[DATABASE_NAME])
+    finally:
+        client.close()
+    for collection, counts in summary.items():
+        print(f"names: {collection} {counts}")
+
+    client = await init()
+    try:
+        await reconcile_usage()
+    finally:
+        client.close()
+
+
+# Maintenance jobs available from the command line
+JOBS = {
+    "rebuild-similarity": rebuild_similarity,
+    "reconcile-usage": reconcile_usage,
+    "backfill-fingerprint": backfill_fingerprint,
+    "migrate-object-ids": migrate_references,
+}
+# Jobs that open their own connections because the Beanie indexes may not be buildable yet
+MIGRATIONS = {
+    "migrate-collation": migrate_collation,
+}
+
+
+async def run(job: str) -> None:
+    """
+    Connect to MongoDB and run a maintenance job.
+
+    Args:
+        job (str): Name of the job in JOBS or MIGRATIONS.
+    """
+    if job in MIGRATIONS:
+        await MIGRATIONS[job]()
+        return
+
+    client = await init()
+    try:
+        await JOBS[job]()
+    finally:
+        client.close()
+
+
+def main() -> None:
+    """
+    Command line entry point: `python maintenance.py <job>`.
+    """
+    parser = argparse.ArgumentParser(description="MongoChef maintenance jobs.")
+    parser.add_argument("job", choices=[*JOBS, *MIGRATIONS])
+    args = parser.parse_args()
+    asyncio.run(run(args.job))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,31 @@
-from beanie import Document, Indexed
+from beanie import Indexed
+from pymongo import ASCENDING, IndexModel
+from utils.normalize import NAME_COLLATION
+from utils.read_routing import ReadRoutedDocument
 
 
-class Categories(Document):
+class Categories(ReadRoutedDocument):
     """
     Recipes category model extends from Document for MongoDB template with Beanie ODM.
 
     Attributes:
-        - name: str
+        - name: str (unique, case and diacritic insensitive)
         - description: str | None
+        - usage_count: int (recipes that reference it)
     """
 
-    name: Indexed(str, unique=True)  # type: ignore
+    name: str
     description: str | None = None
+    usage_count: Indexed(int) = 0  # type: ignore
 
     class Settings:
         name = "categories"
+        indexes = [
+            # Case and diacritic insensitive uniqueness, equality lookups use the same collation
+            IndexModel(
+                [("name", ASCENDING)],
+                name="name_ci",
+                unique=True,
+                collation=NAME_COLLATION,
+            ),
+        ]
@@ -0,0 +1,24 @@
+from beanie import Indexed, PydanticObjectId
+from typing import List
+from utils.read_routing import ReadRoutedDocument
+
+
+class RecipeSignatures(ReadRoutedDocument):
+    """
+    MinHash signature of a recipe with its LSH bucket keys, used by the similar recipes index.
+
+    Attributes:
+        - recipe_id: PydanticObjectId (unique=True)
+        - title: str
+        - signature: List[int]
+        - buckets: List[str]
+    """
+
+    recipe_id: Indexed(PydanticObjectId, unique=True)  # type: ignore
+    title: str
+    signature: List[int]
+    buckets: List[str]
+
+    class Settings:
+        name = "recipe_signatures"
+        indexes = ["buckets"]  # Multikey index, one entry per LSH band
@@ -1,7 +1,10 @@
-from beanie import Document, Indexed
+from beanie import PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import BaseModel
 from typing import List
 from datetime import timedelta
+from utils.normalize import NAME_COLLATION
+from utils.read_routing import ReadRoutedDocument
 
 
 class IngredientsInfo(BaseModel):
@@ -9,11 +12,11 @@ class IngredientsInfo(BaseModel):
     Template for the ingredients model with Beanie linked to Recipes model.
 
     Attributes:
-        id (str): Id of the ingredient.
+        id (PydanticObjectId): Id of the ingredient.
         name (str): Name of the ingredient.
     """
 
-    id: str
+    id: PydanticObjectId
     name: str
 
 
@@ -22,11 +25,11 @@ class KitchenToolsInfo(BaseModel):
     Template for the kitchen tools model with Beanie linked to Recipes model.
 
     Attributes:
-        id (str): Id of the kitchen tool.
+        id (PydanticObjectId): Id of the kitchen tool.
         name (str): Name of the kitchen tool.
     """
 
-    id: str
+    id: PydanticObjectId
     name: str
 
 
@@ -35,12 +38,12 @@ class CategoriesInfo(BaseModel):
     Template for the categories model with Beanie linked to Recipes model.
 
     Attributes:
-        id (str): Id of the category.
+        id (PydanticObjectId): Id of the category.
         name (str): Name of the category.
         description (str | None): Description of the category.
     """
 
-    id: str
+    id: PydanticObjectId
     name: str
     description: str | None = None
 
@@ -60,7 +63,24 @@ class IngredientsDetail(BaseModel):
     unit: str
 
 
-class Recipes(Document):
+class RecipeImage(BaseModel):
+    """
+    Template for the image attribute in the Recipes model, the files are stored in GridFS named by their content hash.
+
+    Attributes:
+        sha256 (str): SHA-256 of the original image.
+        content_type (str): Content type of the original image.
+        length (int): Size of the original image in bytes.
+        thumbnail_sha256 (str): SHA-256 of the thumbnail.
+    """
+
+    sha256: str
+    content_type: str
+    length: int
+    thumbnail_sha256: str
+
+
+class Recipes(ReadRoutedDocument):
     """
     Recipe model with Beanie to save in a MongoDB database.
 
@@ -73,12 +93,44 @@ class Recipes(Document):
         instructions (str): Instructions to prepare the recipe.
         cooking_time (timedelta): Cooking time for the recipe.
         category (CategoriesInfo): Category of the recipe.
+        image (RecipeImage | None): Image of the recipe.
+        fingerprint (str | None): Hash of the canonical content, equal for recipes that only differ in title or formatting.
+        view_count (int): Views of the recipe, written behind by the view counters.
+        trending_score (float): Views weighted with an exponential decay, higher is more viewed lately.
     """
 
-    title: Indexed(str, unique=True)  # type: ignore
+    title: str
     ingredients: List[IngredientsDetail]
     kitchen_tools: List[KitchenToolsInfo]
     portions: int
     instructions: str
     cooking_time: timedelta
     category: CategoriesInfo
+    image: RecipeImage | None = None
+    fingerprint: str | None = None
+    view_count: int = 0
+    trending_score: float = 0.0
+
+    class Settings:
+        indexes = [
+            # Case and diacritic insensitive uniqueness, equality lookups use the same collation
+            IndexModel(
+                [("title", ASCENDING)],
+                name="title_ci",
+                unique=True,
+                collation=NAME_COLLATION,
+            ),
+            # Finds the recipes that still reference an image before its files are deleted
+            IndexModel([("image.sha256", ASCENDING)], name="image_sha256", sparse=True),
+            # Duplicate content probes, not unique so the existing duplicates can be listed and merged
+            IndexModel([("fingerprint", ASCENDING)], name="fingerprint", sparse=True),
+            # Filtered counts and reference updates of the catalog entries
+            IndexModel([("category.id", ASCENDING)], name="category_id"),
+            IndexModel(
+                [("ingredients.ingredient_object.id", ASCENDING)],
+                name="ingredient_ids",
+            ),
+            IndexModel([("kitchen_tools.id", ASCENDING)], name="kitchen_tool_ids"),
+            # Trending recipes, read in score order
+            IndexModel([("trending_score", DESCENDING)], name="trending_score"),
+        ]
@@ -1,8 +1,9 @@
-from beanie import Document, Indexed, Link
+from beanie import Indexed, Link
 from pydantic import EmailStr
+from utils.read_routing import ReadRoutedDocument
 
 
-class Users(Document):
+class Users(ReadRoutedDocument):
     """
     Users model extends from Document for MongoDB template with Beanie ODM.
 
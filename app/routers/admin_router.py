@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, List
+from utils import admission, batcher
+from utils.admin_auth import require_admin
+from utils.counts import count_cache
+from utils.events import event_hub
+from utils.profiling import profile_store
+from utils.query_log import slow_query_listener
+from utils.single_flight import read_flights
+from utils.views import view_counter
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Get the runtime counters of the API worker.
+
+    Returns:
+        Dict[str, Any]: Counters grouped by component.
+    """
+    return {
+        "single_flight": read_flights.stats(),
+        "admission": admission.stats(),
+        "insert_batchers": batcher.stats(),
+        "events": event_hub.stats(),
+        "count_cache": count_cache.stats(),
+        "views": view_counter.stats(),
+    }
+
+
+@router.get("/slow_queries")
+async def get_slow_queries() -> List[Dict[str, Any]]:
+    """
+    Get the latest MongoDB commands slower than the configured threshold.
+
+    Returns:
+        List[Dict[str, Any]]: Slow commands with their route, query shape and explain summary, newest first.
+    """
+    return slow_query_listener.snapshot()
+
+
+@router.get("/profiles")
+async def get_profiles() -> List[Dict[str, Any]]:
+    """
+    Get the routes profiled by the sample rate or the X-Profile header.
+
+    Returns:
+        List[Dict[str, Any]]: Requests, wall and CPU seconds and stack samples per route, slowest first.
+    """
+    return profile_store.summary()
+
+
+@router.get("/profiles/collapsed", response_class=PlainTextResponse)
+async def get_profile_collapsed(
+    route: str | None = Query(
+        None,
+        description='Route such as "GET /recipes/{recipes_title}", every route if omitted',
+    )
+) -> PlainTextResponse:
+    """
+    Download the sampled stacks of the profiled requests as collapsed stacks, the input of flamegraph.pl and speedscope.
+
+    Args:
+        route (str | None): Method and route template to export.
+
+    Raises:
+        HTTPException: If the route has no samples, a 404 Not Found error is raised.
+
+    Returns:
+        PlainTextResponse: One "frame;frame;frame count" line per stack.
+    """
+    collapsed = profile_store.collapsed(route)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="No profile samples")
+    return PlainTextResponse(collapsed)
+
+
+@router.get("/profiles/pstats")
+async def get_profile_pstats(
+    route: str | None = Query(
+        None,
+        description='Route such as "GET /recipes/{recipes_title}", every route if omitted',
+    )
+) -> Response:
+    """
+    Download the cProfile statistics of the profiled requests, readable with python -m pstats or snakeviz.
+
+    Args:
+        route (str | None): Method and route template to export.
+
+    Raises:
+        HTTPException: If the route has no profile, a 404 Not Found error is raised.
+
+    Returns:
+        Response: The statistics file.
+    """
+    dump = profile_store.pstats_dump(route)
+    if dump is None:
+        raise HTTPException(status_code=404, detail="No profile statistics")
+    return Response(
+        content=dump,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="mongochef.pstats"'},
+    )
+
+
+@router.delete("/profiles")
+async def delete_profiles() -> Dict[str, int]:
+    """
+    Remove the profiles collected so far.
+
+    Returns:
+        Dict[str, int]: Number of routes removed.
+    """
+    return {"routes": profile_store.clear()}
@@ -1,31 +1,90 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from models.categories_model import Categories
 from schemas.categories_schema import CategoriesBase
 from pymongo.errors import DuplicateKeyError
 from typing import List
-from utils.normalize import normalized_string
+from schemas.bulk_schema import BulkUpsertResult
+from schemas.counts_schema import CountResponse
+from utils.bulk_import import BULK_OPENAPI, bulk_upsert
+from utils.counts import count_documents, set_total_count
+from utils.events import publish_change
+from utils.normalize import NAME_COLLATION, normalized_string
+from utils.pagination import MAX_PAGE_SIZE, page_query, set_next_cursor
+from utils.read_routing import secondary_reads
+from utils.single_flight import coalesced
+from utils.usage import delete_unused
 
 router = APIRouter(prefix="/categories")
 
 
-@router.get("/", response_model=List[Categories])
-async def get_categories() -> List[Categories]:
+@router.get(
+    "/",
+    response_model=List[Categories],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_categories(
+    response: Response,
+    popular: bool = False,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+) -> List[Categories]:
     """
     Get all categories stored in the database in a list.
 
+    Args:
+        response (Response): The response, receives the X-Next-Cursor and X-Total-Count headers.
+        popular (bool): Sort the categories by the number of recipes that use them, only the first page is available.
+        after (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of categories in the page.
+        with_total (bool): Add the X-Total-Count header, estimated from the collection metadata.
+
     Raises:
         HTTPException: If no categories are found, a 404 error is raised.
+        HTTPException: If the cursor is not valid, a 400 error is raised.
 
     Returns:
         List[Categories]: A list of all categories.
     """
-    list_categories = await Categories.find_all().to_list()
-    if not list_categories:
+    query = page_query(
+        Categories, after, limit, sort=-Categories.usage_count if popular else None
+    )
+    list_categories = await query.to_list()
+    if not list_categories and after is None:
         raise HTTPException(status_code=404, detail="No categories found")
-    return list_categories
+    if with_total:
+        await set_total_count(response, Categories)
+    return set_next_cursor(response, list_categories, None if popular else limit)
+
+
+@router.get(
+    "/count",
+    response_model=CountResponse,
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def count_categories(
+    min_usage: int | None = Query(default=None, ge=0),
+    exact: bool = False,
+) -> CountResponse:
+    """
+    Count the categories without reading them.
+
+    Args:
+        min_usage (int | None): Only count the categories used by at least this number of recipes.
+        exact (bool): Count the documents instead of reading the collection metadata when there is no filter.
+
+    Returns:
+        CountResponse: The number of categories.
+    """
+    filters = {} if min_usage is None else {"usage_count": {"$gte": min_usage}}
+    count, estimated = await count_documents(Categories, filters, exact)
+    return CountResponse(count=count, estimated=estimated)
 
 
 @router.get("/{category_name}", response_model=Categories)
+@coalesced()
 async def get_category_by_name(category_name: str) -> Categories:
     """
     Get a category by its name.
@@ -40,7 +99,8 @@ async def get_category_by_name(category_name: str) -> Categories:
         Categories: The category object if found.
     """
     existing_category = await Categories.find_one(
-        Categories.name == normalized_string(category_name)
+        Categories.name == normalized_string(category_name),
+        collation=NAME_COLLATION,
     )
     if not existing_category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -65,11 +125,30 @@ async def create_category(category: CategoriesBase) -> Categories:
         new_category = Categories(**category.model_dump())
         new_category.name = normalized_string(category.name)
         await new_category.create()
+        publish_change("categories", "create", new_category)
         return new_category
     except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="Category already exists")
 
 
+@router.post("/bulk", response_model=BulkUpsertResult, openapi_extra=BULK_OPENAPI)
+async def bulk_upsert_categories(request: Request) -> BulkUpsertResult:
+    """
+    Create the categories of a CSV or NDJSON upload that do not exist yet, CSV uploads need a header with "name" and optional "description" columns.
+
+    Args:
+        request (Request): The request, its body is read as a stream and written in chunks.
+
+    Raises:
+        HTTPException: If the content type is not CSV or NDJSON, a 415 error is raised.
+        HTTPException: If the CSV header has no name column, a 400 error is raised.
+
+    Returns:
+        BulkUpsertResult: The number of created, existing and invalid categories.
+    """
+    return await bulk_upsert(request, Categories, CategoriesBase, "categories")
+
+
 @router.put("/update/{category_name}", response_model=Categories)
 async def update_category(category_name: str, category: CategoriesBase) -> Categories:
     """
@@ -87,7 +166,8 @@ async def update_category(category_name: str, category: CategoriesBase) -> Categ
         Categories: The updated category object from beanie model.
     """
     existing_category = await Categories.find_one(
-        Categories.name == normalized_string(category_name)
+        Categories.name == normalized_string(category_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_category:
@@ -98,11 +178,11 @@ async def update_category(category_name: str, category: CategoriesBase) -> Categ
     if not update_data:
         raise HTTPException(status_code=400, detail="No data provided for update")
 
-    for field, value in update_data.items():
-        setattr(existing_category, field, value)
-
-    existing_category.name = normalized_string(category.name)
-    await existing_category.save()
+    previous_name = existing_category.name
+    update_data["name"] = normalized_string(category.name)
+    # Only the schema fields are written, the usage counter may have changed since the lookup
+    await existing_category.set(update_data)
+    publish_change("categories", "update", existing_category, previous_name)
     return existing_category
 
 
@@ -117,16 +197,21 @@ async def delete_category(category_name: str) -> Categories:
 
     Raises:
         HTTPException: If the category is not found, a 404 error is raised.
+        HTTPException: If the category is still used by recipes, a 409 error is raised.
 
     Returns:
         Categories: The deleted category object from Beanie model into the database.
     """
     existing_category = await Categories.find_one(
-        Categories.name == normalized_string(category_name)
+        Categories.name == normalized_string(category_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    await existing_category.delete()
+    # Recipes increment the usage before referencing an entry, so an unused entry stays unused
+    await delete_unused(existing_category, "Category")
+
+    publish_change("categories", "delete", existing_category)
     return existing_category
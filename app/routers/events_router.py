@@ -0,0 +1,95 @@
+import asyncio
+import os
+from typing import AsyncIterator
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from utils.events import FEED_COLLECTIONS, Subscriber, event_hub
+
+# Seconds between keep-alive comments, below the idle timeout of the usual proxies
+KEEPALIVE_SECONDS = float(os.getenv("MONGOCHEF_EVENT_KEEPALIVE", "15"))
+# Reconnection delay suggested to the clients in milliseconds
+RETRY_MS = 3000
+
+router = APIRouter(prefix="/events")
+
+
+async def event_stream(
+    subscriber: Subscriber, prelude: bytes, replayed: list
+) -> AsyncIterator[bytes]:
+    """
+    Send the events of a subscriber until the client disconnects or is dropped.
+
+    Args:
+        subscriber (Subscriber): The subscriber of the connection.
+        prelude (bytes): Messages sent before the events.
+        replayed (list): Events missed since the Last-Event-ID of the client.
+
+    Yields:
+        bytes: Messages in the text/event-stream format.
+    """
+    try:
+        yield prelude
+        for event in replayed:
+            yield event.message
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if subscriber.dropped:
+                    break
+                yield b": keep-alive\n\n"
+                continue
+            yield event.message
+            if subscriber.dropped and subscriber.queue.empty():
+                break
+        # The client reconnects with its Last-Event-ID and resumes from the replay buffer
+        yield b"event: dropped\ndata: {}\n\n"
+    finally:
+        event_hub.unsubscribe(subscriber)
+
+
+@router.get("")
+async def get_events(
+    collections: str = ",".join(FEED_COLLECTIONS),
+    last_event_id: str | None = Header(default=None),
+) -> StreamingResponse:
+    """
+    Stream the create, update, delete and bulk upload events of the recipes and the catalog as Server-Sent Events.
+
+    Args:
+        collections (str): Comma separated collections to follow, all of them by default.
+        last_event_id (str | None): Last-Event-ID header sent by the client when it reconnects.
+
+    Raises:
+        HTTPException: If a collection is not part of the feed, a 400 Bad Request error is raised.
+
+    Returns:
+        StreamingResponse: The event stream. A "reset" event means some changes were missed and the client must reload.
+    """
+    followed = {name.strip() for name in collections.split(",") if name.strip()}
+    unknown = followed - set(FEED_COLLECTIONS)
+    if unknown or not followed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Collections must be some of {', '.join(FEED_COLLECTIONS)}",
+        )
+
+    subscriber = event_hub.subscribe(followed)
+    prelude = f"retry: {RETRY_MS}\n\n".encode()
+    replayed = []
+    if last_event_id is not None:
+        missed = event_hub.replay(last_event_id)
+        if missed is None:
+            prelude += (
+                f"id: {event_hub.last_event_id}\nevent: reset\ndata: {{}}\n\n"
+            ).encode()
+        else:
+            replayed = [event for event in missed if event.collection in followed]
+
+    return StreamingResponse(
+        event_stream(subscriber, prelude, replayed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,34 +1,95 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from models.ingredients_model import Ingredients
 from schemas.ingredients_schema import IngredientsBase
 from pymongo.errors import DuplicateKeyError
 from typing import List
-from utils.normalize import normalized_string
+from schemas.bulk_schema import BulkUpsertResult
+from schemas.counts_schema import CountResponse
+from utils.batcher import INSERT_BATCHERS
+from utils.bulk_import import BULK_OPENAPI, bulk_upsert
+from utils.counts import count_documents, set_total_count
+from utils.events import publish_change
+from utils.normalize import NAME_COLLATION, normalized_string
+from utils.pagination import MAX_PAGE_SIZE, page_query, set_next_cursor
+from utils.read_routing import secondary_reads
+from utils.single_flight import coalesced
+from utils.usage import delete_unused
 
 
 router = APIRouter(prefix="/ingredients")
 
 
 # GET all ingredients.
-@router.get("/", response_model=List[Ingredients])
-async def get_ingredients() -> List[Ingredients]:
+@router.get(
+    "/",
+    response_model=List[Ingredients],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_ingredients(
+    response: Response,
+    popular: bool = False,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+) -> List[Ingredients]:
     """
     Get all ingredients stored in the database.
 
+    Args:
+        response (Response): The response, receives the X-Next-Cursor and X-Total-Count headers.
+        popular (bool): Sort the ingredients by the number of recipes that use them, only the first page is available.
+        after (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of ingredients in the page.
+        with_total (bool): Add the X-Total-Count header, estimated from the collection metadata.
+
     Raises:
         HTTPException: If no ingredients are found, a 404 error is raised.
+        HTTPException: If the cursor is not valid, a 400 error is raised.
 
     Returns:
         List[Ingredients]: A list of all ingredients.
     """
-    list_ingredients = await Ingredients.find_all().to_list()
-    if not list_ingredients:
+    query = page_query(
+        Ingredients, after, limit, sort=-Ingredients.usage_count if popular else None
+    )
+    list_ingredients = await query.to_list()
+    if not list_ingredients and after is None:
         raise HTTPException(status_code=404, detail="No ingredients found")
-    return list_ingredients
+    if with_total:
+        await set_total_count(response, Ingredients)
+    return set_next_cursor(response, list_ingredients, None if popular else limit)
+
+
+# GET number of ingredients.
+@router.get(
+    "/count",
+    response_model=CountResponse,
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def count_ingredients(
+    min_usage: int | None = Query(default=None, ge=0),
+    exact: bool = False,
+) -> CountResponse:
+    """
+    Count the ingredients without reading them.
+
+    Args:
+        min_usage (int | None): Only count the ingredients used by at least this number of recipes.
+        exact (bool): Count the documents instead of reading the collection metadata when there is no filter.
+
+    Returns:
+        CountResponse: The number of ingredients.
+    """
+    filters = {} if min_usage is None else {"usage_count": {"$gte": min_usage}}
+    count, estimated = await count_documents(Ingredients, filters, exact)
+    return CountResponse(count=count, estimated=estimated)
 
 
 # GET ingredient by name.
 @router.get("/{ingredient_name}", response_model=Ingredients)
+@coalesced()
 async def get_ingredient_by_name(ingredient_name: str) -> Ingredients:
     """
     Get an ingredient by its name.
@@ -43,7 +104,8 @@ async def get_ingredient_by_name(ingredient_name: str) -> Ingredients:
         Ingredients: The ingredient object if found.
     """
     existing_ingredient = await Ingredients.find_one(
-        Ingredients.name == normalized_string(ingredient_name)
+        Ingredients.name == normalized_string(ingredient_name),
+        collation=NAME_COLLATION,
     )
     if not existing_ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
@@ -68,12 +130,33 @@ async def create_ingredient(ingredient: IngredientsBase) -> Ingredients:
     try:
         new_ingredient = Ingredients(**ingredient.model_dump())
         new_ingredient.name = normalized_string(new_ingredient.name)
-        await new_ingredient.insert()
+        # Concurrent creations are written together with one insert_many
+        await INSERT_BATCHERS["ingredients"].insert(new_ingredient)
+        publish_change("ingredients", "create", new_ingredient)
         return new_ingredient
     except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="Ingredient already exists")
 
 
+# POST create many ingredients.
+@router.post("/bulk", response_model=BulkUpsertResult, openapi_extra=BULK_OPENAPI)
+async def bulk_upsert_ingredients(request: Request) -> BulkUpsertResult:
+    """
+    Create the ingredients of a CSV or NDJSON upload that do not exist yet, CSV uploads need a header with a "name" column.
+
+    Args:
+        request (Request): The request, its body is read as a stream and written in chunks.
+
+    Raises:
+        HTTPException: If the content type is not CSV or NDJSON, a 415 error is raised.
+        HTTPException: If the CSV header has no name column, a 400 error is raised.
+
+    Returns:
+        BulkUpsertResult: The number of created, existing and invalid ingredients.
+    """
+    return await bulk_upsert(request, Ingredients, IngredientsBase, "ingredients")
+
+
 # PUT update an existing ingredient.
 @router.put("/update/{ingredient_name}", response_model=Ingredients)
 async def update_ingredient(
@@ -94,15 +177,19 @@ async def update_ingredient(
         Ingredients: The updated ingredient object from Beanie model.
     """
     existing_ingredient = await Ingredients.find_one(
-        Ingredients.name == normalized_string(ingredient_name)
+        Ingredients.name == normalized_string(ingredient_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
 
-    if ingredient.name and ingredient.name != existing_ingredient.name:
-        existing_ingredient.name = normalized_string(ingredient.name)
-        await existing_ingredient.save()
+    new_name = normalized_string(ingredient.name)
+    if new_name and new_name != existing_ingredient.name:
+        previous_name = existing_ingredient.name
+        # Only the name is written, the usage counter may have changed since the lookup
+        await existing_ingredient.set({Ingredients.name: new_name})
+        publish_change("ingredients", "update", existing_ingredient, previous_name)
     else:
         raise HTTPException(
             status_code=400,
@@ -123,16 +210,21 @@ async def delete_ingredient(ingredient_name: str) -> Ingredients:
 
     Raises:
         HTTPException: If the ingredient is not found, a 404 error is raised.
+        HTTPException: If the ingredient is still used by recipes, a 409 error is raised.
 
     Returns:
         Ingredients: The deleted ingredient object from Beanie model into the database.
     """
     existing_ingredient = await Ingredients.find_one(
-        Ingredients.name == normalized_string(ingredient_name)
+        Ingredients.name == normalized_string(ingredient_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
 
-    await existing_ingredient.delete()
+    # Recipes increment the usage before referencing an entry, so an unused entry stays unused
+    await delete_unused(existing_ingredient, "Ingredient")
+
+    publish_change("ingredients", "delete", existing_ingredient)
     return existing_ingredient
@@ -1,32 +1,92 @@
-from fastapi import APIRouter, HTTPException
-from utils.normalize import normalized_string
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from schemas.bulk_schema import BulkUpsertResult
+from schemas.counts_schema import CountResponse
+from utils.batcher import INSERT_BATCHERS
+from utils.bulk_import import BULK_OPENAPI, bulk_upsert
+from utils.counts import count_documents, set_total_count
+from utils.events import publish_change
+from utils.normalize import NAME_COLLATION, normalized_string
 from models.kitchen_tools_model import KitchenTools
 from schemas.kitchen_tools_schema import KitchenToolsBase
 from pymongo.errors import DuplicateKeyError
 from typing import List
+from utils.pagination import MAX_PAGE_SIZE, page_query, set_next_cursor
+from utils.read_routing import secondary_reads
+from utils.single_flight import coalesced
+from utils.usage import delete_unused
 
 
 router = APIRouter(prefix="/kitchen_tools")
 
 
-@router.get("/", response_model=List[KitchenTools])
-async def get_kitchen_tools() -> List[KitchenTools]:
+@router.get(
+    "/",
+    response_model=List[KitchenTools],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_kitchen_tools(
+    response: Response,
+    popular: bool = False,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+) -> List[KitchenTools]:
     """
     Get all kitchen tools stored in the database in a list.
 
+    Args:
+        response (Response): The response, receives the X-Next-Cursor and X-Total-Count headers.
+        popular (bool): Sort the kitchen tools by the number of recipes that use them, only the first page is available.
+        after (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of kitchen tools in the page.
+        with_total (bool): Add the X-Total-Count header, estimated from the collection metadata.
+
     Raises:
         HTTPException: If no kitchen tools are found, a 404 error is raised.
+        HTTPException: If the cursor is not valid, a 400 error is raised.
 
     Returns:
         List[KitchenTools]: A list of all kitchen tools.
     """
-    list_kitchen_tools = await KitchenTools.find_all().to_list()
-    if not list_kitchen_tools:
+    query = page_query(
+        KitchenTools, after, limit, sort=-KitchenTools.usage_count if popular else None
+    )
+    list_kitchen_tools = await query.to_list()
+    if not list_kitchen_tools and after is None:
         raise HTTPException(status_code=404, detail="No kitchen tools found")
-    return list_kitchen_tools
+    if with_total:
+        await set_total_count(response, KitchenTools)
+    return set_next_cursor(response, list_kitchen_tools, None if popular else limit)
+
+
+@router.get(
+    "/count",
+    response_model=CountResponse,
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def count_kitchen_tools(
+    min_usage: int | None = Query(default=None, ge=0),
+    exact: bool = False,
+) -> CountResponse:
+    """
+    Count the kitchen tools without reading them.
+
+    Args:
+        min_usage (int | None): Only count the kitchen tools used by at least this number of recipes.
+        exact (bool): Count the documents instead of reading the collection metadata when there is no filter.
+
+    Returns:
+        CountResponse: The number of kitchen tools.
+    """
+    filters = {} if min_usage is None else {"usage_count": {"$gte": min_usage}}
+    count, estimated = await count_documents(KitchenTools, filters, exact)
+    return CountResponse(count=count, estimated=estimated)
 
 
 @router.get("/{kitchen_tool_name}", response_model=KitchenTools)
+@coalesced()
 async def get_kitchen_tool_by_name(kitchen_tool_name: str) -> KitchenTools:
     """
     Get a kitchen tool by its name.
@@ -41,7 +101,8 @@ async def get_kitchen_tool_by_name(kitchen_tool_name: str) -> KitchenTools:
         KitchenTools: The kitchen tool object if found.
     """
     existing_kitchen_tool = await KitchenTools.find_one(
-        KitchenTools.name == normalized_string(kitchen_tool_name)
+        KitchenTools.name == normalized_string(kitchen_tool_name),
+        collation=NAME_COLLATION,
     )
     if not existing_kitchen_tool:
         raise HTTPException(status_code=404, detail="Kitchen tool not found")
@@ -65,12 +126,32 @@ async def create_kitchen_tool(kitchen_tool: KitchenToolsBase) -> KitchenTools:
     try:
         new_kitchen_tool = KitchenTools(**kitchen_tool.model_dump())
         new_kitchen_tool.name = normalized_string(kitchen_tool.name)
-        await new_kitchen_tool.insert()
+        # Concurrent creations are written together with one insert_many
+        await INSERT_BATCHERS["kitchen_tools"].insert(new_kitchen_tool)
+        publish_change("kitchen_tools", "create", new_kitchen_tool)
         return new_kitchen_tool
     except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="Kitchen tool already exists")
 
 
+@router.post("/bulk", response_model=BulkUpsertResult, openapi_extra=BULK_OPENAPI)
+async def bulk_upsert_kitchen_tools(request: Request) -> BulkUpsertResult:
+    """
+    Create the kitchen tools of a CSV or NDJSON upload that do not exist yet, CSV uploads need a header with a "name" column.
+
+    Args:
+        request (Request): The request, its body is read as a stream and written in chunks.
+
+    Raises:
+        HTTPException: If the content type is not CSV or NDJSON, a 415 error is raised.
+        HTTPException: If the CSV header has no name column, a 400 error is raised.
+
+    Returns:
+        BulkUpsertResult: The number of created, existing and invalid kitchen tools.
+    """
+    return await bulk_upsert(request, KitchenTools, KitchenToolsBase, "kitchen_tools")
+
+
 @router.put("/update/{kitchen_tool_name}", response_model=KitchenTools)
 async def update_kitchen_tool(
     kitchen_tool_name: str, kitchen_tool: KitchenToolsBase
@@ -90,15 +171,19 @@ async def update_kitchen_tool(
         KitchenTools: The updated kitchen tool object from beanie model.
     """
     existing_kitchen_tool = await KitchenTools.find_one(
-        KitchenTools.name == normalized_string(kitchen_tool_name)
+        KitchenTools.name == normalized_string(kitchen_tool_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_kitchen_tool:
         raise HTTPException(status_code=404, detail="kitchen_tool not found")
 
-    if kitchen_tool.name and kitchen_tool.name != existing_kitchen_tool.name:
-        existing_kitchen_tool.name = normalized_string(kitchen_tool.name)
-        await existing_kitchen_tool.save()
+    new_name = normalized_string(kitchen_tool.name)
+    if new_name and new_name != existing_kitchen_tool.name:
+        previous_name = existing_kitchen_tool.name
+        # Only the name is written, the usage counter may have changed since the lookup
+        await existing_kitchen_tool.set({KitchenTools.name: new_name})
+        publish_change("kitchen_tools", "update", existing_kitchen_tool, previous_name)
     else:
         raise HTTPException(
             status_code=400,
@@ -119,16 +204,21 @@ async def delete_kitchen_tool(kitchen_tool_name: str) -> KitchenTools:
 
     Raises:
         HTTPException: If the kitchen tool is not found, a 404 error is raised.
+        HTTPException: If the kitchen tool is still used by recipes, a 409 error is raised.
 
     Returns:
         KitchenTools: The deleted kitchen tool object from Beanie model into the database.
     """
     existing_kitchen_tool = await KitchenTools.find_one(
-        KitchenTools.name == normalized_string(kitchen_tool_name)
+        KitchenTools.name == normalized_string(kitchen_tool_name),
+        collation=NAME_COLLATION,
     )
 
     if not existing_kitchen_tool:
         raise HTTPException(status_code=404, detail="Kitchen tool not found")
 
-    await existing_kitchen_tool.delete()
+    # Recipes increment the usage before referencing an entry, so an unused entry stays unused
+    await delete_unused(existing_kitchen_tool, "Kitchen tool")
+
+    publish_change("kitchen_tools", "delete", existing_kitchen_tool)
     return existing_kitchen_tool
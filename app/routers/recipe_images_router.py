@@ -0,0 +1,169 @@
+from fastapi import APIRouter, Header, HTTPException, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from models.recipes_model import Recipes
+from utils.events import publish_change
+from utils.images import (
+    CACHE_CONTROL,
+    IMAGE_MEDIA_TYPES,
+    MAX_IMAGE_BYTES,
+    ImageTooLarge,
+    InvalidImage,
+    open_image,
+    parse_range,
+    release_image,
+    store_image,
+    stream_file,
+)
+from utils.normalize import NAME_COLLATION, normalized_string
+
+router = APIRouter(prefix="/recipes")
+
+
+async def find_recipe(recipes_title: str) -> Recipes:
+    """
+    Find a recipe by its title.
+
+    Args:
+        recipes_title (str): The title of the recipe.
+
+    Raises:
+        HTTPException: If the recipe is not found, a 404 Not Found error is raised.
+
+    Returns:
+        Recipes: The recipe object.
+    """
+    existing_recipe = await Recipes.find_one(
+        Recipes.title == normalized_string(recipes_title),
+        collation=NAME_COLLATION,
+    )
+    if not existing_recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return existing_recipe
+
+
+@router.get("/images/{sha256}")
+async def get_image(
+    sha256: str = Path(pattern="^[0-9a-f]{64}$"),
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """
+    Download a recipe image or thumbnail by its content hash, supporting byte ranges.
+
+    Args:
+        sha256 (str): SHA-256 of the image, as stored in the recipe image attribute.
+        range_header (str | None): Range header with a single byte range.
+        if_none_match (str | None): If-None-Match header with the cached ETag.
+
+    Raises:
+        HTTPException: If the image is not found, a 404 Not Found error is raised.
+        HTTPException: If the range is outside the image, a 416 Range Not Satisfiable error is raised.
+
+    Returns:
+        Response: The image, a 206 Partial Content response for a range or a 304 Not Modified response.
+    """
+    etag = f'"{sha256}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    grid_out = await open_image(sha256)
+    if grid_out is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    length = grid_out.length
+    media_type = grid_out.metadata["content_type"]
+
+    try:
+        byte_range = parse_range(range_header, length)
+    except ValueError:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"},
+        )
+    if byte_range is None:
+        start, end, status_code = 0, length - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        stream_file(grid_out, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.put("/{recipes_title}/image", response_model=Recipes)
+async def upload_recipe_image(
+    recipes_title: str,
+    request: Request,
+    content_type: str = Header(),
+) -> Recipes:
+    """
+    Upload the image of a recipe as the raw request body, replacing the previous one.
+
+    Args:
+        recipes_title (str): The title of the recipe.
+        request (Request): The request with the image as body.
+        content_type (str): Content-Type header of the image.
+
+    Raises:
+        HTTPException: If the recipe is not found, a 404 Not Found error is raised.
+        HTTPException: If the image is too large, a 413 Content Too Large error is raised.
+        HTTPException: If the content type is not supported or the image can not be decoded, a 415 Unsupported Media Type error is raised.
+
+    Returns:
+        Recipes: The recipe with its new image.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in IMAGE_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Image must be one of {', '.join(sorted(IMAGE_MEDIA_TYPES))}",
+        )
+    existing_recipe = await find_recipe(recipes_title)
+
+    try:
+        image = await store_image(request.stream(), media_type)
+    except ImageTooLarge:
+        raise HTTPException(
+            status_code=413, detail=f"Image is larger than {MAX_IMAGE_BYTES} bytes"
+        )
+    except InvalidImage:
+        raise HTTPException(status_code=415, detail="Image can not be decoded")
+
+    previous_image = existing_recipe.image
+    # Only the image is written, the view counters are flushed concurrently
+    await existing_recipe.set({Recipes.image: image})
+    publish_change("recipes", "update", existing_recipe)
+    if previous_image and previous_image.sha256 != image.sha256:
+        await release_image(previous_image)
+    return existing_recipe
+
+
+@router.delete("/{recipes_title}/image", response_model=Recipes)
+async def delete_recipe_image(recipes_title: str) -> Recipes:
+    """
+    Remove the image of a recipe.
+
+    Args:
+        recipes_title (str): The title of the recipe.
+
+    Raises:
+        HTTPException: If the recipe or its image is not found, a 404 Not Found error is raised.
+
+    Returns:
+        Recipes: The recipe without image.
+    """
+    existing_recipe = await find_recipe(recipes_title)
+    if existing_recipe.image is None:
+        raise HTTPException(status_code=404, detail="Recipe has no image")
+
+    previous_image = existing_recipe.image
+    await existing_recipe.set({Recipes.image: None})
+    publish_change("recipes", "update", existing_recipe)
+    await release_image(previous_image)
+    return existing_recipe
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Any, Dict, Iterable, List, Type
+from beanie import Document
+from beanie.operators import In
 from pymongo.errors import DuplicateKeyError
 from models.categories_model import Categories
 from models.kitchen_tools_model import KitchenTools
@@ -11,32 +13,167 @@ from models.recipes_model import (
     KitchenToolsInfo,
     Recipes,
 )
-from schemas.recipes_schema import RecipesBase
+from schemas.counts_schema import CountResponse
+from schemas.recipes_schema import (
+    DuplicateCluster,
+    RecipesBase,
+    RecipesBatchItem,
+    RecipesBatchRequest,
+    SimilarRecipe,
+)
 from datetime import timedelta
-from utils.normalize import normalized_string
+from utils.normalize import NAME_COLLATION, normalized_string
+from utils.read_routing import secondary_reads
+from utils.usage import acquire_references, release_references
+from utils.similarity import index_recipe, remove_recipe, similar_recipes
+from utils.pagination import MAX_PAGE_SIZE, page_query, set_next_cursor
+from utils.single_flight import coalesced
+from utils.images import release_image
+from utils.counts import count_documents, set_total_count
+from utils.events import publish_change
+from utils.fingerprint import duplicate_clusters, find_duplicate, recipe_fingerprint
+from utils.views import count_view
 
 
 router = APIRouter(prefix="/recipes")
+# Titles of the fixed GET routes, a recipe with one of them could not be read by title
+RESERVED_TITLES = {"count", "duplicates", "trending"}
 
 
-@router.get("/", response_model=List[Recipes])
-async def get_all_recipes() -> List[Recipes]:
+@router.get(
+    "/",
+    response_model=List[Recipes],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_all_recipes(
+    response: Response,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+) -> List[Recipes]:
     """
     Get all recipes from the database.
 
+    Args:
+        response (Response): The response, receives the X-Next-Cursor and X-Total-Count headers.
+        after (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of recipes in the page.
+        with_total (bool): Add the X-Total-Count header, estimated from the collection metadata.
+
     Raises:
         HTTPException: If no recipes are found, a 404 Not Found error is raised.
+        HTTPException: If the cursor is not valid, a 400 Bad Request error is raised.
 
     Returns:
         List[Recipes]: A list of recipe objects.
     """
-    recipes = await Recipes.find_all().to_list()
-    if not recipes:
+    recipes = await page_query(Recipes, after, limit).to_list()
+    if not recipes and after is None:
         raise HTTPException(status_code=404, detail="No recipes found")
-    return recipes
+    if with_total:
+        await set_total_count(response, Recipes)
+    return set_next_cursor(response, recipes, limit)
+
 
+@router.get(
+    "/count",
+    response_model=CountResponse,
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def count_recipes(
+    category: str | None = None,
+    ingredient: str | None = None,
+    kitchen_tool: str | None = None,
+    exact: bool = False,
+) -> CountResponse:
+    """
+    Count the recipes without reading them, optionally only the ones that use a category, ingredient or kitchen tool.
 
-@router.get("/{recipes_title}", response_model=Recipes)
+    Args:
+        category (str | None): Name of the category of the recipes.
+        ingredient (str | None): Name of an ingredient of the recipes.
+        kitchen_tool (str | None): Name of a kitchen tool of the recipes.
+        exact (bool): Count the documents instead of reading the collection metadata when there is no filter.
+
+    Returns:
+        CountResponse: The number of recipes.
+    """
+    filters = {}
+    for name, model, id_path in (
+        (category, Categories, "category.id"),
+        (ingredient, Ingredients, "ingredients.ingredient_object.id"),
+        (kitchen_tool, KitchenTools, "kitchen_tools.id"),
+    ):
+        if name is None:
+            continue
+        # The name is resolved in the catalog, the recipes are counted by indexed id
+        entry = await model.find_one(
+            model.name == normalized_string(name), collation=NAME_COLLATION
+        )
+        if entry is None:
+            return CountResponse(count=0, estimated=False)
+        # Recipes not migrated by migrate-object-ids still store the id as a string
+        filters[id_path] = {"$in": [entry.id, str(entry.id)]}
+
+    count, estimated = await count_documents(Recipes, filters, exact)
+    return CountResponse(count=count, estimated=estimated)
+
+
+@router.get(
+    "/duplicates",
+    response_model=List[DuplicateCluster],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_duplicate_recipes(
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+) -> List[DuplicateCluster]:
+    """
+    Get the groups of recipes with the same content fingerprint, largest groups first.
+
+    Args:
+        limit (int): Maximum number of groups.
+
+    Returns:
+        List[DuplicateCluster]: The groups of duplicate recipes, empty if there are none.
+    """
+    return [
+        DuplicateCluster(**cluster) for cluster in await duplicate_clusters(limit)
+    ]
+
+
+@router.get(
+    "/trending",
+    response_model=List[Recipes],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_trending_recipes(
+    limit: int = Query(default=20, ge=1, le=100),
+) -> List[Recipes]:
+    """
+    Get the recipes with the most views lately, read through the trending score index.
+
+    Args:
+        limit (int): Maximum number of recipes.
+
+    Returns:
+        List[Recipes]: The trending recipes, highest score first, empty if no recipe was viewed yet.
+    """
+    return (
+        await Recipes.find(Recipes.trending_score > 0)
+        .sort(-Recipes.trending_score)
+        .limit(limit)
+        .to_list()
+    )
+
+
+@router.get(
+    "/{recipes_title}", response_model=Recipes, dependencies=[Depends(count_view)]
+)
+@coalesced()
 async def get_recipe_by_title(recipes_title: str) -> Recipes:
     """
     Get a recipe by its title.
@@ -51,106 +188,242 @@ async def get_recipe_by_title(recipes_title: str) -> Recipes:
         Recipes: The recipe object if found.
     """
     existing_recipe = await Recipes.find_one(
-        Recipes.title == normalized_string(recipes_title)
+        Recipes.title == normalized_string(recipes_title),
+        collation=NAME_COLLATION,
     )
     if not existing_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return existing_recipe
 
 
-@router.post("/create", response_model=Recipes)
-async def create_recipe(recipe: RecipesBase) -> Recipes:
+@router.get(
+    "/{recipes_title}/similar",
+    response_model=List[SimilarRecipe],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def get_similar_recipes(
+    recipes_title: str, k: int = Query(default=10, ge=1, le=100)
+) -> List[SimilarRecipe]:
     """
-    Create a new recipe in the database checking if the recipe already exists. Creating ingredients, kitchen tools and categories if they do not exist or use if they do.
+    Get the recipes with the most similar ingredients using the MinHash/LSH index.
 
     Args:
-        recipe (RecipesBase): Recipe object model from the request body.
+        recipes_title (str): The title of the reference recipe.
+        k (int): The maximum number of similar recipes to return.
 
     Raises:
-        HTTPException: If the recipe with the same title already exists, a 400 Bad Request error is raised.
+        HTTPException: If the recipe is not found, a 404 Not Found error is raised.
 
     Returns:
-        Recipes: The created recipe object.
+        List[SimilarRecipe]: The approximate top-k similar recipes, most similar first.
     """
-    # List to store the ingredients and kitchen tools dicts
-    ingredients_list = []
-    kitchen_tools_list = []
+    existing_recipe = await Recipes.find_one(
+        Recipes.title == normalized_string(recipes_title),
+        collation=NAME_COLLATION,
+    )
+    if not existing_recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
 
-    # Check if the recipe already exists
-    for ingredient in recipe.ingredients:
-        ingredient_obj = await Ingredients.find_one(
-            Ingredients.name == normalized_string(ingredient.name)
+    neighbours = await similar_recipes(existing_recipe, k)
+    return [
+        SimilarRecipe(title=title, similarity=similarity)
+        for title, similarity in neighbours
+    ]
+
+
+@router.post("/batch", response_model=List[RecipesBatchItem])
+@coalesced()
+async def get_recipes_batch(batch: RecipesBatchRequest) -> List[RecipesBatchItem]:
+    """
+    Get many recipes by their titles with a single query on the title index.
+
+    Args:
+        batch (RecipesBatchRequest): The titles of the recipes.
+
+    Returns:
+        List[RecipesBatchItem]: One item per requested title in the same order, marked as not found when the recipe does not exist.
+    """
+    titles = [normalized_string(title) for title in batch.titles]
+    recipes = await Recipes.find(
+        In(Recipes.title, list(set(titles))), collation=NAME_COLLATION
+    ).to_list()
+    by_title = {normalized_string(recipe.title): recipe for recipe in recipes}
+    return [
+        RecipesBatchItem(
+            title=requested, found=title in by_title, recipe=by_title.get(title)
         )
-        # If the ingredient does not exist, create it
-        if not ingredient_obj:
-            ingredient_obj = Ingredients(name=normalized_string(ingredient.name))
-            await ingredient_obj.insert()
+        for requested, title in zip(batch.titles, titles)
+    ]
+
+
+async def find_catalog_entries(
+    model: Type[Document], names: Iterable[str]
+) -> Dict[str, Document | None]:
+    """
+    Look up catalog entries by name without creating the missing ones.
+
+    Args:
+        model (Type[Document]): Ingredients, KitchenTools or Categories.
+        names (Iterable[str]): Names from the request body.
+
+    Returns:
+        Dict[str, Document | None]: The entry of each normalized name, None if it does not exist.
+    """
+    entries: Dict[str, Document | None] = {}
+    for name in map(normalized_string, names):
+        if name not in entries:
+            entries[name] = await model.find_one(
+                model.name == name, collation=NAME_COLLATION
+            )
+    return entries
+
+
+async def create_missing_entries(
+    model: Type[Document], entries: Dict[str, Document | None], collection: str
+) -> None:
+    """
+    Create the catalog entries that were not found.
+
+    Args:
+        model (Type[Document]): Ingredients, KitchenTools or Categories.
+        entries (Dict[str, Document | None]): Entries by name, the created ones replace the None values.
+        collection (str): Name of the collection in the change feed.
+    """
+    for name, entry in entries.items():
+        if entry is None:
+            entry = model(name=name)
+            await entry.insert()
+            publish_change(collection, "create", entry)
+            entries[name] = entry
 
-        # Append the ingredient object to the list
+
+async def resolve_recipe(recipe: RecipesBase, recipe_id: Any = None) -> Recipes:
+    """
+    Build the recipe document of a request body, rejecting duplicates before any catalog entry is created.
+
+    A recipe with a new ingredient, kitchen tool or category can not duplicate another one, so the missing entries are only created once the title is free and the duplicate check passed or was not needed.
+
+    Args:
+        recipe (RecipesBase): Recipe from the request body.
+        recipe_id (Any): Id of the recipe being updated, None for a new recipe.
+
+    Raises:
+        HTTPException: If the title is reserved by a route or another recipe already has it, a 400 Bad Request error is raised.
+        HTTPException: If another recipe with the same content already exists, a 409 Conflict error is raised.
+
+    Returns:
+        Recipes: The recipe with its references and fingerprint, not saved.
+    """
+    title = normalized_string(recipe.title)
+    if title in RESERVED_TITLES:
+        raise HTTPException(status_code=400, detail="Recipe title is reserved")
+    # The unique index still rejects a title taken after this check
+    same_title = [Recipes.title == title]
+    if recipe_id is not None:
+        same_title.append(Recipes.id != recipe_id)
+    if await Recipes.find_one(*same_title, collation=NAME_COLLATION):
+        raise HTTPException(
+            status_code=400, detail="Recipe with this title already exists"
+        )
+
+    ingredients = await find_catalog_entries(
+        Ingredients, [ingredient.name for ingredient in recipe.ingredients]
+    )
+    kitchen_tools = await find_catalog_entries(
+        KitchenTools, [tool.name for tool in recipe.kitchen_tools]
+    )
+    categories = await find_catalog_entries(Categories, [recipe.category.name])
+    catalog = [
+        (Ingredients, ingredients, "ingredients"),
+        (KitchenTools, kitchen_tools, "kitchen_tools"),
+        (Categories, categories, "categories"),
+    ]
+    complete = all(
+        entry is not None for _, entries, _ in catalog for entry in entries.values()
+    )
+    if not complete:
+        for model, entries, collection in catalog:
+            await create_missing_entries(model, entries, collection)
+
+    ingredients_list = []
+    for ingredient in recipe.ingredients:
+        ingredient_obj = ingredients[normalized_string(ingredient.name)]
         ingredients_list.append(
             IngredientsDetail(
                 ingredient_object=IngredientsInfo(
-                    id=str(ingredient_obj.id),
-                    name=normalized_string(ingredient_obj.name),
+                    id=ingredient_obj.id,
+                    name=ingredient_obj.name,
                 ),
                 quantity=ingredient.quantity,
                 unit=normalized_string(ingredient.unit),
             )
         )
 
-    # Check if the kitchen tool already exists
+    kitchen_tools_list = []
     for kitchen_tool in recipe.kitchen_tools:
-        kitchen_tool_obj = await KitchenTools.find_one(
-            KitchenTools.name == normalized_string(kitchen_tool.name)
-        )
-        # If the kitchen tool does not exist, create it
-        if not kitchen_tool_obj:
-            kitchen_tool_obj = KitchenTools(name=normalized_string(kitchen_tool.name))
-            await kitchen_tool_obj.insert()
-
-        # Append the kitchen tool object to the list
+        kitchen_tool_obj = kitchen_tools[normalized_string(kitchen_tool.name)]
         kitchen_tools_list.append(
-            KitchenToolsInfo(
-                id=str(kitchen_tool_obj.id),
-                name=normalized_string(kitchen_tool_obj.name),
-            )
-        )
-
-    # Check if the category already exists
-    category_obj = await Categories.find_one(
-        Categories.name == normalized_string(recipe.category.name)
-    )
-    # If the category does not exist, create it
-    if not category_obj:
-        category_obj = Categories(
-            name=normalized_string(recipe.category.name), description=None
+            KitchenToolsInfo(id=kitchen_tool_obj.id, name=kitchen_tool_obj.name)
         )
-        await category_obj.insert()
-    # Create the category info object
-    category_info = CategoriesInfo(
-        id=str(category_obj.id),
-        name=normalized_string(category_obj.name),
-        description=category_obj.description,
-    )
 
-    # Create the recipe object
+    category_obj = categories[normalized_string(recipe.category.name)]
     recipe_obj = Recipes(
+        id=recipe_id,
         title=normalized_string(recipe.title),
         ingredients=ingredients_list,
         kitchen_tools=kitchen_tools_list,
         portions=recipe.portions,
         instructions=recipe.instructions,
         cooking_time=timedelta(minutes=recipe.cooking_time),
-        category=category_info,
+        category=CategoriesInfo(
+            id=category_obj.id,
+            name=category_obj.name,
+            description=category_obj.description,
+        ),
     )
+    if not complete:
+        recipe_obj.fingerprint = recipe_fingerprint(recipe_obj)
+        return recipe_obj
+
+    duplicate = await find_duplicate(recipe_obj)
+    if duplicate:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Recipe with the same content already exists: {duplicate.title}",
+        )
+    return recipe_obj
+
+
+@router.post("/create", response_model=Recipes)
+async def create_recipe(recipe: RecipesBase) -> Recipes:
+    """
+    Create a new recipe in the database checking if the recipe already exists. Creating ingredients, kitchen tools and categories if they do not exist or use if they do.
+
+    Args:
+        recipe (RecipesBase): Recipe object model from the request body.
+
+    Raises:
+        HTTPException: If the recipe with the same title already exists, a 400 Bad Request error is raised.
+        HTTPException: If a recipe with the same content already exists, a 409 Conflict error is raised.
+
+    Returns:
+        Recipes: The created recipe object.
+    """
+    recipe_obj = await resolve_recipe(recipe)
 
+    await acquire_references(None, recipe_obj)
     try:
         await recipe_obj.insert()
-        return recipe_obj
     except DuplicateKeyError:
+        await release_references(recipe_obj, None)
         raise HTTPException(
             status_code=400, detail="Recipe with this title already exists"
         )
+    # Only the recipe write can collide on the title, the follow-up writes report their own errors
+    await index_recipe(recipe_obj)
+    publish_change("recipes", "create", recipe_obj)
+    return recipe_obj
 
 
 @router.put("/update/{recipe_title}", response_model=Recipes)
@@ -165,89 +438,46 @@ async def update_recipe(recipe_title: str, recipe: RecipesBase) -> Recipes:
     Raises:
         HTTPException: The recipe with the given title does not exist, a 404 Not Found error is raised.
         HTTPException: If another recipe with the same title already exists, a 400 Bad Request error is raised.
+        HTTPException: If another recipe with the same content already exists, a 409 Conflict error is raised.
 
     Returns:
         Recipes: The updated recipe object.
     """
     # Find the existing recipe by title
     existing_recipe = await Recipes.find_one(
-        Recipes.title == normalized_string(recipe_title)
+        Recipes.title == normalized_string(recipe_title),
+        collation=NAME_COLLATION,
     )
     if not existing_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
+    # Keep the previous references to update the catalog usage counters
+    previous_recipe = existing_recipe.model_copy(deep=True)
 
-    ingredients_list = []
-    for ingredient in recipe.ingredients:
-        name_norm = normalized_string(ingredient.name)
-        # Check if the ingredient already exists
-        ingr_obj = await Ingredients.find_one(Ingredients.name == name_norm)
-        if not ingr_obj:
-            # If the ingredient does not exist, create it
-            ingr_obj = Ingredients(name=name_norm)
-            await ingr_obj.insert()
-
-        # Append the ingredient object to the list
-        ingredients_list.append(
-            IngredientsDetail(
-                ingredient_object=IngredientsInfo(
-                    id=str(ingr_obj.id),
-                    name=ingr_obj.name,
-                ),
-                quantity=ingredient.quantity,
-                unit=normalized_string(ingredient.unit),
-            )
-        )
-
-    kitchen_tools_list = []
-    for tool in recipe.kitchen_tools:
-        tool_name = normalized_string(tool.name)
-        # Check if the kitchen tool already exists
-        tool_obj = await KitchenTools.find_one(KitchenTools.name == tool_name)
-        if not tool_obj:
-            # If the kitchen tool does not exist, create it
-            tool_obj = KitchenTools(name=tool_name)
-            await tool_obj.insert()
-
-        # Append the kitchen tool object to the list
-        kitchen_tools_list.append(
-            KitchenToolsInfo(
-                id=str(tool_obj.id),
-                name=tool_obj.name,
-            )
-        )
-
-    cat_name = normalized_string(recipe.category.name)
-    # Check if the category already exists
-    cat_obj = await Categories.find_one(Categories.name == cat_name)
-    if not cat_obj:
-        # If the category does not exist, create it
-        cat_obj = Categories(name=cat_name, description=None)
-        await cat_obj.insert()
-
-    # Create the category info object
-    category_info = CategoriesInfo(
-        id=str(cat_obj.id),
-        name=cat_obj.name,
-        description=cat_obj.description,
-    )
-
-    # Update the existing recipe with the new values
-    existing_recipe.title = normalized_string(recipe.title)
-    existing_recipe.ingredients = ingredients_list
-    existing_recipe.kitchen_tools = kitchen_tools_list
-    existing_recipe.portions = recipe.portions
-    existing_recipe.instructions = recipe.instructions
-    existing_recipe.cooking_time = timedelta(minutes=recipe.cooking_time)
-    existing_recipe.category = category_info
-
-    # Save the updated recipe to the database
+    updated_recipe = await resolve_recipe(recipe, existing_recipe.id)
+    await acquire_references(previous_recipe, updated_recipe)
+    # Only the fields of the request are written, the view counters are flushed concurrently
     try:
-        await existing_recipe.save()
-        return existing_recipe
+        await existing_recipe.set(
+            {
+                Recipes.title: updated_recipe.title,
+                Recipes.ingredients: updated_recipe.ingredients,
+                Recipes.kitchen_tools: updated_recipe.kitchen_tools,
+                Recipes.portions: updated_recipe.portions,
+                Recipes.instructions: updated_recipe.instructions,
+                Recipes.cooking_time: updated_recipe.cooking_time,
+                Recipes.category: updated_recipe.category,
+                Recipes.fingerprint: updated_recipe.fingerprint,
+            }
+        )
     except DuplicateKeyError:
+        await release_references(updated_recipe, previous_recipe)
         raise HTTPException(
             status_code=400, detail="Another recipe with this title already exists"
         )
+    await release_references(previous_recipe, existing_recipe)
+    await index_recipe(existing_recipe)
+    publish_change("recipes", "update", existing_recipe, previous_recipe.title)
+    return existing_recipe
 
 
 @router.delete("/delete/{recipe_title}", response_model=Recipes)
@@ -264,8 +494,15 @@ async def delete_recipe(recipe_title: str) -> Recipes:
     Returns:
         Recipes: The deleted recipe object.
     """
-    existing_recipe = await Recipes.find_one(Recipes.title == recipe_title)
+    existing_recipe = await Recipes.find_one(
+        Recipes.title == normalized_string(recipe_title),
+        collation=NAME_COLLATION,
+    )
     if not existing_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     await existing_recipe.delete()
+    await release_references(existing_recipe, None)
+    await remove_recipe(existing_recipe.id)
+    await release_image(existing_recipe.image)
+    publish_change("recipes", "delete", existing_recipe)
     return existing_recipe
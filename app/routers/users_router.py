@@ -1,32 +1,78 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from beanie.operators import In
 from pydantic import EmailStr
 from pymongo.errors import DuplicateKeyError
 from models.users_model import Users
-from schemas.users_schema import UsersBase
+from schemas.counts_schema import CountResponse
+from schemas.users_schema import UsersBase, UsersBatchItem, UsersBatchRequest
 
 from typing import List
+from utils.counts import count_documents, set_total_count
+from utils.pagination import MAX_PAGE_SIZE, page_query, set_next_cursor
+from utils.read_routing import secondary_reads
+from utils.single_flight import coalesced
 
 
 router = APIRouter(prefix="/users")
 
 
 # Get all users in the database
-@router.get("/", response_model=List[Users])
-async def get_users() -> List[Users]:
+@router.get(
+    "/",
+    response_model=List[Users],
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced(normalize=str)
+async def get_users(
+    response: Response,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+) -> List[Users]:
     """
     Get all users from the database.
 
+    Args:
+        response (Response): The response, receives the X-Next-Cursor and X-Total-Count headers.
+        after (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of users in the page.
+        with_total (bool): Add the X-Total-Count header, estimated from the collection metadata.
+
     Returns:
         List[Users]: A list of user objects.
     """
-    list_users = await Users.find_all().to_list()
-    if not list_users:
+    list_users = await page_query(Users, after, limit).to_list()
+    if not list_users and after is None:
         raise HTTPException(status_code=404, detail="No users found")
-    return list_users
+    if with_total:
+        await set_total_count(response, Users)
+    return set_next_cursor(response, list_users, limit)
+
+
+# Count the users in the database
+@router.get(
+    "/count",
+    response_model=CountResponse,
+    dependencies=[Depends(secondary_reads)],
+)
+@coalesced()
+async def count_users(exact: bool = False) -> CountResponse:
+    """
+    Count the users without reading them.
+
+    Args:
+        exact (bool): Count the documents instead of reading the collection metadata.
+
+    Returns:
+        CountResponse: The number of users.
+    """
+    count, estimated = await count_documents(Users, {}, exact)
+    return CountResponse(count=count, estimated=estimated)
 
 
 # Get a user by their email address
 @router.get("/{user_email}", response_model=Users)
+@coalesced(normalize=str)
 async def get_user_by_email(user_email: EmailStr) -> Users:
     """
     Return a user by their email address.
@@ -43,6 +89,27 @@ async def get_user_by_email(user_email: EmailStr) -> Users:
     return existing_user
 
 
+# Get many users by their email addresses
+@router.post("/batch", response_model=List[UsersBatchItem])
+@coalesced(normalize=str)
+async def get_users_batch(batch: UsersBatchRequest) -> List[UsersBatchItem]:
+    """
+    Return many users by their email addresses with a single query on the email index.
+
+    Args:
+        batch (UsersBatchRequest): The email addresses of the users.
+
+    Returns:
+        List[UsersBatchItem]: One item per requested email in the same order, marked as not found when the user does not exist.
+    """
+    users = await Users.find(In(Users.email, list(set(batch.emails)))).to_list()
+    by_email = {user.email: user for user in users}
+    return [
+        UsersBatchItem(email=email, found=email in by_email, user=by_email.get(email))
+        for email in batch.emails
+    ]
+
+
 # Create a new user in the database
 @router.post("/create", response_model=Users)
 async def create_user(user: UsersBase) -> Users:
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class BulkUpsertResult(BaseModel):
+    """
+    BulkUpsertResult is a Pydantic model that represents the outcome of a bulk upload to a catalog collection.
+
+    Attributes:
+        created (int): The number of new entries.
+        existing (int): The number of entries that already existed or were repeated in the upload.
+        invalid (int): The number of lines that could not be parsed or validated.
+        errors (List[str]): The first validation errors, with their line numbers.
+    """
+
+    created: int = 0
+    existing: int = 0
+    invalid: int = 0
+    errors: List[str] = Field(default_factory=list)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class CountResponse(BaseModel):
+    """
+    CountResponse is a Pydantic model that represents the number of documents of a collection.
+
+    Attributes:
+        count (int): The number of documents matching the filters.
+        estimated (bool): True when the count comes from the collection metadata and may be slightly off.
+    """
+
+    count: int
+    estimated: bool
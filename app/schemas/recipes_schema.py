@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List
+from models.recipes_model import Recipes
+from utils.pagination import MAX_BATCH_KEYS
 
 
 class IngredientsBaseDetail(BaseModel):
@@ -60,3 +62,57 @@ class RecipesBase(BaseModel):
     instructions: str = Field(min_length=1)
     cooking_time: int = Field(gt=0)
     category: CategoriesBaseInfo
+
+
+class SimilarRecipe(BaseModel):
+    """
+    SimilarRecipe is a Pydantic model that represents a neighbour returned by the similar recipes index.
+
+    Attributes:
+        title (str): The title of the similar recipe.
+        similarity (float): The estimated Jaccard similarity of the ingredient sets, from 0 to 1.
+    """
+
+    title: str
+    similarity: float
+
+
+class DuplicateCluster(BaseModel):
+    """
+    DuplicateCluster is a Pydantic model that represents a group of recipes with the same content.
+
+    Attributes:
+        fingerprint (str): The content fingerprint shared by the recipes.
+        titles (List[str]): The titles of the recipes, oldest first.
+        ids (List[str]): The ids of the recipes, in the same order as the titles.
+    """
+
+    fingerprint: str
+    titles: List[str]
+    ids: List[str]
+
+
+class RecipesBatchRequest(BaseModel):
+    """
+    RecipesBatchRequest is a Pydantic model that represents the titles requested from the batch endpoint.
+
+    Attributes:
+        titles (List[str]): The titles of the recipes, in the order of the answer.
+    """
+
+    titles: List[str] = Field(min_length=1, max_length=MAX_BATCH_KEYS)
+
+
+class RecipesBatchItem(BaseModel):
+    """
+    RecipesBatchItem is a Pydantic model that represents the answer for one title of a batch.
+
+    Attributes:
+        title (str): The requested title.
+        found (bool): Whether a recipe has the title.
+        recipe (Recipes | None): The recipe, None if it was not found.
+    """
+
+    title: str
+    found: bool
+    recipe: Recipes | None = None
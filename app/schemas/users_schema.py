@@ -1,5 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Union
+from typing import List, Union
+from models.users_model import Users
+from utils.pagination import MAX_BATCH_KEYS
 
 
 class UsersBase(BaseModel):
@@ -18,3 +20,29 @@ class UsersBase(BaseModel):
     lastname1: str = Field(min_length=1, max_length=70)
     lastname2: Union[str, None] = Field(default=None, max_length=70)
     email: EmailStr = Field(min_length=1, max_length=150)
+
+
+class UsersBatchRequest(BaseModel):
+    """
+    Pydantic model for the emails requested from the batch endpoint
+
+    Attributes:
+        - emails: List[EmailStr]
+    """
+
+    emails: List[EmailStr] = Field(min_length=1, max_length=MAX_BATCH_KEYS)
+
+
+class UsersBatchItem(BaseModel):
+    """
+    Pydantic model for the answer of one email of a batch
+
+    Attributes:
+        - email: EmailStr
+        - found: bool
+        - user: Users | None
+    """
+
+    email: EmailStr
+    found: bool
+    user: Users | None = None
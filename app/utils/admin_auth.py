@@ -0,0 +1,38 @@
+import os
+import secrets
+from fastapi import HTTPException, Request
+
+# Token required in the X-Admin-Token header, without it only local requests are admin
+ADMIN_TOKEN = os.getenv("MONGOCHEF_ADMIN_TOKEN")
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+def is_admin(request: Request) -> bool:
+    """
+    Check if a request is allowed to use the admin features.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        bool: True if the request carries the admin token or, when no token is configured, comes from localhost.
+    """
+    if ADMIN_TOKEN:
+        return secrets.compare_digest(
+            request.headers.get("x-admin-token", ""), ADMIN_TOKEN
+        )
+    return request.client is not None and request.client.host in LOCAL_HOSTS
+
+
+async def require_admin(request: Request) -> None:
+    """
+    Dependency that rejects the requests that are not allowed to use the admin endpoints.
+
+    Args:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: If the request is not an admin request, a 403 Forbidden error is raised.
+    """
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin access required")
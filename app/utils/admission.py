@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+from typing import Dict, List, Tuple
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Queue timeout in seconds shared by every route group
+QUEUE_TIMEOUT = float(os.getenv("MONGOCHEF_QUEUE_TIMEOUT", "2"))
+
+# Priorities inside a route group, lower values are admitted first
+DETAIL_PRIORITY = 0
+LIST_PRIORITY = 1
+
+# Paths that never wait for a slot: health checks, docs, admin and long-lived streams
+EXEMPT_PREFIXES = ("/health", "/admin", "/events", "/docs", "/redoc", "/openapi.json")
+# Last path segments of the bulk routes, a title or name that only contains them is not bulk
+BULK_SEGMENTS = {"bulk", "export", "batch"}
+# Last path segments of the reads that scan or aggregate a collection, queued with the lists
+AGGREGATE_SEGMENTS = {"count", "trending", "duplicates", "similar"}
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limiter with a bounded priority wait queue and a queue timeout.
+
+    Attributes:
+        name (str): Name of the route group.
+        limit (int): Maximum number of requests running at the same time.
+        max_queue (int): Maximum number of requests waiting for a slot.
+        queue_timeout (float): Seconds a request can wait before it is rejected.
+    """
+
+    def __init__(
+        self, name: str, limit: int, max_queue: int, queue_timeout: float
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def retry_after(self) -> int:
+        """
+        Seconds suggested to the client in the Retry-After header.
+        """
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def acquire(self, priority: int) -> bool:
+        """
+        Wait for a slot in the group.
+
+        Args:
+            priority (int): Priority of the request, lower values are admitted first.
+
+        Returns:
+            bool: True if the request got a slot, False if it was shed.
+        """
+        if self.active < self.limit and self.queued == 0:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        # Drop the entries of requests that already left the queue
+        if len(self._queue) > 2 * self.max_queue:
+            self._queue = [entry for entry in self._queue if not entry[2].done()]
+            heapq.heapify(self._queue)
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The cancelled waiter stays in the heap and is skipped by release()
+            self.queued -= 1
+            self.timeouts += 1
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # The slot was handed over while the request was going away
+            else:
+                waiter.cancel()
+                self.queued -= 1
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Hand the slot over to the next waiting request or free it.
+        """
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self.queued -= 1
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the group.
+
+        Returns:
+            Dict[str, int]: Limits, running and queued requests, admissions and rejections.
+        """
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+def _limiter_from_env(name: str, limit: int, max_queue: int) -> AdmissionLimiter:
+    """
+    Create the limiter of a route group with the limits from the environment.
+
+    Args:
+        name (str): Name of the route group.
+        limit (int): Default concurrency limit.
+        max_queue (int): Default wait queue size.
+
+    Returns:
+        AdmissionLimiter: The limiter of the group.
+    """
+    prefix = f"MONGOCHEF_{name.upper()}"
+    return AdmissionLimiter(
+        name,
+        limit=int(os.getenv(f"{prefix}_CONCURRENCY", str(limit))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+        queue_timeout=QUEUE_TIMEOUT,
+    )
+
+
+# Limiters per route group, sized below the Motor connection pool (100 by default)
+LIMITERS = {
+    "read": _limiter_from_env("read", limit=50, max_queue=200),
+    "write": _limiter_from_env("write", limit=20, max_queue=100),
+    "bulk": _limiter_from_env("bulk", limit=4, max_queue=8),
+}
+
+
+def route_group(request: Request) -> Tuple[str, int] | None:
+    """
+    Classify a request into a route group and a priority.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Tuple[str, int] | None: Route group and priority, None for the exempt paths.
+    """
+    path = request.url.path
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    segments = [segment for segment in path.split("/") if segment]
+    if segments and segments[-1] in BULK_SEGMENTS:
+        return "bulk", DETAIL_PRIORITY
+    if request.method not in ("GET", "HEAD"):
+        return "write", DETAIL_PRIORITY
+    # "/recipes/" and the aggregates such as "/recipes/count" are lists, "/recipes/{title}" is a detail read
+    if len(segments) <= 1 or segments[-1] in AGGREGATE_SEGMENTS:
+        return "read", LIST_PRIORITY
+    return "read", DETAIL_PRIORITY
+
+
+class AdmissionControl:
+    """
+    ASGI middleware that sheds the requests of a saturated route group with a 503 Service Unavailable.
+
+    It is a plain ASGI middleware so the slot is held until the last byte of the body is sent, streamed downloads and exports included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = route_group(Request(scope)) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = LIMITERS[group[0]]
+        if not await limiter.acquire(group[1]):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, try again later"},
+                headers={"Retry-After": str(limiter.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get the counters of every route group.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Counters per route group.
+    """
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
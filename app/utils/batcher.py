@@ -0,0 +1,186 @@
+import asyncio
+import contextvars
+import os
+from typing import Dict, Generic, List, Set, Tuple, Type, TypeVar
+from beanie import Document, PydanticObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from models.ingredients_model import Ingredients
+from models.kitchen_tools_model import KitchenTools
+from utils.request_context import RequestContext, current_request
+
+# Micro-batching settings
+BATCH_WINDOW_MS = float(os.getenv("MONGOCHEF_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("MONGOCHEF_BATCH_MAX_SIZE", "500"))
+
+DUPLICATE_KEY_ERROR = 11000
+
+DocumentType = TypeVar("DocumentType", bound=Document)
+# (document, future of the caller, RequestContext of the caller) of a pending insert
+PendingInsert = Tuple[DocumentType, asyncio.Future, RequestContext | None]
+
+
+class InsertBatcher(Generic[DocumentType]):
+    """
+    Collects the concurrent inserts of a collection and writes them with one unordered insert_many.
+
+    Attributes:
+        model (Type[DocumentType]): Beanie model of the collection.
+        window (float): Seconds a batch stays open after its first document.
+        max_size (int): Number of documents that flushes a batch before the window ends.
+    """
+
+    def __init__(
+        self, model: Type[DocumentType], window_ms: float, max_size: int
+    ) -> None:
+        self.model = model
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.batches = 0
+        self.documents = 0
+        self.duplicates = 0
+        self.largest_batch = 0
+        self._pending: List[PendingInsert] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def insert(self, document: DocumentType) -> DocumentType:
+        """
+        Insert a document with the next batch.
+
+        Args:
+            document (DocumentType): The document to insert.
+
+        Raises:
+            DuplicateKeyError: If the document violates a unique index.
+            WriteError: If the server rejects the document for another reason.
+
+        Returns:
+            DocumentType: The inserted document with its id.
+        """
+        if self.max_size <= 1:
+            return await document.insert()
+
+        # Ids are generated here so each caller knows its document before the batch is written
+        if document.id is None:
+            document.id = PydanticObjectId()
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._pending.append((document, waiter, current_request.get()))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            # The batch is shared by many requests, so it runs outside the context of the first one
+            self._timer = loop.call_later(
+                self.window, self._flush, context=contextvars.Context()
+            )
+        return await waiter
+
+    def _flush(self) -> None:
+        """
+        Close the current batch and write it in a background task.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._write(batch), context=contextvars.Context()
+        )
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[PendingInsert]) -> None:
+        """
+        Write a batch and resolve the callers with their document or their own error.
+
+        The batch is written in its own session, whose operation and cluster times go to the RequestContext of each caller so their responses carry the X-Causal-Token of the write.
+
+        Args:
+            batch (List[PendingInsert]): Documents, futures and request contexts of the callers.
+        """
+        self.batches += 1
+        self.documents += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        errors: Dict[int, Exception] = {}
+        client = self.model.get_motor_collection().database.client
+        session = None
+        try:
+            session = await client.start_session()
+            await self.model.insert_many(
+                [document for document, _, _ in batch], ordered=False, session=session
+            )
+        except BulkWriteError as error:
+            # Unordered inserts report the position of every rejected document
+            for write_error in error.details.get("writeErrors", []):
+                error_class = (
+                    DuplicateKeyError
+                    if write_error["code"] == DUPLICATE_KEY_ERROR
+                    else WriteError
+                )
+                errors[write_error["index"]] = error_class(
+                    write_error["errmsg"], write_error["code"], write_error
+                )
+            self.duplicates += sum(
+                isinstance(exception, DuplicateKeyError)
+                for exception in errors.values()
+            )
+        except Exception as error:
+            for _, waiter, _ in batch:
+                if not waiter.done():
+                    waiter.set_exception(error)
+            return
+        finally:
+            if session is not None:
+                await session.end_session()
+
+        # Standalone servers answer without times, there is nothing to be consistent with
+        operation_time, cluster_time = session.operation_time, session.cluster_time
+        for index, (document, waiter, context) in enumerate(batch):
+            if index in errors:
+                if not waiter.done():
+                    waiter.set_exception(errors[index])
+                continue
+            if context is not None and operation_time is not None and cluster_time:
+                context.record_write(operation_time, cluster_time)
+            # A caller that went away is skipped, its document was written anyway
+            if not waiter.done():
+                waiter.set_result(document)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the counters of the batcher.
+
+        Returns:
+            Dict[str, float]: Batches written, documents, duplicates and the average batch size.
+        """
+        return {
+            "batches": self.batches,
+            "documents": self.documents,
+            "duplicates": self.duplicates,
+            "largest_batch": self.largest_batch,
+            "average_batch": (
+                round(self.documents / self.batches, 2) if self.batches else 0
+            ),
+            "pending": len(self._pending),
+        }
+
+
+# Batchers of the catalog collections with high insert rates
+INSERT_BATCHERS = {
+    "ingredients": InsertBatcher(Ingredients, BATCH_WINDOW_MS, BATCH_MAX_SIZE),
+    "kitchen_tools": InsertBatcher(KitchenTools, BATCH_WINDOW_MS, BATCH_MAX_SIZE),
+}
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get the counters of every insert batcher.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Counters per collection.
+    """
+    return {name: batcher.stats() for name, batcher in INSERT_BATCHERS.items()}
@@ -0,0 +1,250 @@
+import codecs
+import csv
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Tuple, Type
+from beanie import Document
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from schemas.bulk_schema import BulkUpsertResult
+from utils.events import publish_bulk
+from utils.normalize import NAME_COLLATION, normalized_string
+
+# Bulk upload settings
+BULK_CHUNK_SIZE = int(os.getenv("MONGOCHEF_BULK_CHUNK_SIZE", "1000"))
+MAX_LINE_LENGTH = 64 * 1024  # Bounds the memory held by a line without a newline
+MAX_REPORTED_ERRORS = 20
+DUPLICATE_KEY_ERROR = 11000
+
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Request body of the bulk endpoints in the OpenAPI schema, FastAPI does not read it
+BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            media_type: {"schema": {"type": "string", "format": "binary"}}
+            for media_type in (CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPES[0])
+        },
+    }
+}
+
+# (line number, record, error) yielded by the parsers
+ParsedLine = Tuple[int, Dict[str, Any] | None, str | None]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a streamed UTF-8 body into lines without reading it whole.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the request.
+
+    Raises:
+        HTTPException: If a line is longer than MAX_LINE_LENGTH, a 413 Content Too Large error is raised.
+
+    Yields:
+        str: The lines with their line ending.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(pending) > MAX_LINE_LENGTH:
+            raise HTTPException(status_code=413, detail="Line too long")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedLine]:
+    """
+    Parse CSV lines into records keyed by the normalized names of the header columns.
+
+    Args:
+        lines (AsyncIterator[str]): Lines of the body, the first one is the header.
+
+    Raises:
+        HTTPException: If the header has no "name" column, a 400 Bad Request error is raised.
+
+    Yields:
+        ParsedLine: The first line number of each row with its record, empty cells are None. A row longer than MAX_LINE_LENGTH is reported as invalid and parsing goes on at the next line.
+    """
+    header = None
+    pending = ""
+    number = start = quotes = 0
+    async for line in lines:
+        number += 1
+        if not pending:
+            start = number
+        pending += line
+        quotes += line.count('"')
+        if quotes % 2:
+            # A quoted cell goes on in the next line, up to MAX_LINE_LENGTH
+            if len(pending) > MAX_LINE_LENGTH:
+                yield start, None, "Row too long or unterminated quoted cell"
+                pending, quotes = "", 0
+            continue
+        text, pending, quotes = pending, "", 0
+        if not text.strip():
+            continue
+
+        row = next(csv.reader([text]))
+        if header is None:
+            header = [normalized_string(column) for column in row]
+            if "name" not in header:
+                raise HTTPException(
+                    status_code=400, detail='The CSV header must have a "name" column'
+                )
+            continue
+        yield start, {column: value or None for column, value in zip(header, row)}, None
+
+    if pending:
+        yield start, None, "Unterminated quoted cell"
+
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedLine]:
+    """
+    Parse NDJSON lines, one object per line.
+
+    Args:
+        lines (AsyncIterator[str]): Lines of the body.
+
+    Yields:
+        ParsedLine: The line number with its record or the parse error.
+    """
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, None, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+async def write_chunk(
+    model: Type[Document], documents: Dict[str, Dict[str, Any]]
+) -> Tuple[int, int]:
+    """
+    Upsert a chunk of catalog entries with one unordered bulk write, keeping the entries that already exist.
+
+    Args:
+        model (Type[Document]): Beanie model of the catalog collection.
+        documents (Dict[str, Dict[str, Any]]): Documents by normalized name.
+
+    Raises:
+        BulkWriteError: If a write fails for another reason than a concurrent insert of the same name.
+
+    Returns:
+        Tuple[int, int]: Number of created and existing entries.
+    """
+    operations = [
+        UpdateOne(
+            {"name": name},
+            {"$setOnInsert": document},
+            upsert=True,
+            collation=NAME_COLLATION,
+        )
+        for name, document in documents.items()
+    ]
+    try:
+        result = await model.get_motor_collection().bulk_write(
+            operations, ordered=False
+        )
+        created = result.upserted_count
+    except BulkWriteError as error:
+        # Two upserts of a new name can race, the loser finds it created by the other one
+        if any(
+            write_error["code"] != DUPLICATE_KEY_ERROR
+            for write_error in error.details["writeErrors"]
+        ):
+            raise
+        created = error.details["nUpserted"]
+    return created, len(operations) - created
+
+
+async def bulk_upsert(
+    request: Request,
+    model: Type[Document],
+    schema: Type[BaseModel],
+    collection: str,
+) -> BulkUpsertResult:
+    """
+    Create the catalog entries of a CSV or NDJSON upload that do not exist yet, reading and writing it in chunks.
+
+    The upload can be sent again after an error, the entries already written are counted as existing.
+
+    Args:
+        request (Request): The request with the streamed body.
+        model (Type[Document]): Beanie model of the catalog collection.
+        schema (Type[BaseModel]): Schema used to validate each record.
+        collection (str): Name of the collection in the change feed.
+
+    Raises:
+        HTTPException: If the content type is not CSV or NDJSON, a 415 Unsupported Media Type error is raised.
+
+    Returns:
+        BulkUpsertResult: Number of created, existing and invalid entries.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type == CSV_MEDIA_TYPE:
+        parser = iter_csv
+    elif media_type in NDJSON_MEDIA_TYPES:
+        parser = iter_ndjson
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Send the entries as text/csv or application/x-ndjson",
+        )
+
+    result = BulkUpsertResult()
+    chunk: Dict[str, Dict[str, Any]] = {}
+
+    async def flush() -> None:
+        created, existing = await write_chunk(model, chunk)
+        result.created += created
+        result.existing += existing
+        chunk.clear()
+
+    async for number, record, error in parser(iter_lines(request.stream())):
+        if record is not None:
+            try:
+                item = schema.model_validate(
+                    {field: record.get(field) for field in schema.model_fields}
+                )
+                name = normalized_string(item.name)
+                if not name:
+                    error = "name: String should have at least 1 character"
+            except ValidationError as validation_error:
+                details = validation_error.errors()[0]
+                error = f"{'.'.join(map(str, details['loc']))}: {details['msg']}"
+        if error is not None:
+            result.invalid += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"line {number}: {error}")
+            continue
+
+        if name in chunk:
+            result.existing += 1  # Repeated in the upload
+            continue
+        document = model(**{**item.model_dump(), "name": name})
+        chunk[name] = document.model_dump(exclude={"id", "revision_id"})
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+
+    publish_bulk(collection, result.created)
+    return result
@@ -0,0 +1,100 @@
+import gzip
+import os
+from typing import Awaitable, Callable
+import brotli
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from utils.encoding import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, parse_quality
+
+# Compression settings
+COMPRESSION_MIN_SIZE = int(os.getenv("MONGOCHEF_COMPRESSION_MIN_SIZE", "1024"))
+THREADPOOL_MIN_SIZE = int(os.getenv("MONGOCHEF_COMPRESSION_THREADPOOL_SIZE", "65536"))
+GZIP_LEVEL = int(os.getenv("MONGOCHEF_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("MONGOCHEF_BROTLI_QUALITY", "4"))
+
+# Only buffered API payloads are compressed, streams without a content-length and images pass through
+COMPRESSIBLE_TYPES = {JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, "text/plain", "text/csv"}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Choose the content encoding of a response.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header of the request.
+
+    Returns:
+        str | None: "br", "gzip" or None for an uncompressed response.
+    """
+    qualities = parse_quality(accept_encoding)
+    best = max(
+        ["br", "gzip"], key=lambda encoding: qualities.get(encoding, qualities.get("*", 0))
+    )
+    return best if qualities.get(best, qualities.get("*", 0)) > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with the configured level.
+
+    Args:
+        body (bytes): The response body.
+        encoding (str): "br" or "gzip".
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+async def compression(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    HTTP middleware that compresses large API payloads with gzip or brotli.
+
+    Args:
+        request (Request): The incoming request.
+        call_next (Callable[[Request], Awaitable[Response]]): The next handler in the chain.
+
+    Returns:
+        Response: The route response, compressed when the client accepts it and the body is large enough.
+    """
+    response = await call_next(request)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    media_type = response.headers.get("content-type", "").split(";")[0].strip()
+    content_length = response.headers.get("content-length")
+    if (
+        encoding is None
+        or content_length is None
+        or media_type not in COMPRESSIBLE_TYPES
+        or "content-encoding" in response.headers
+        or response.status_code in (204, 206, 304)
+        or int(content_length) < COMPRESSION_MIN_SIZE
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = [
+        (name, value)
+        for name, value in response.headers.raw
+        if name not in (b"content-length", b"vary")
+    ]
+    vary = response.headers.get("vary")
+    vary = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+    # Large bodies are compressed in a worker thread to keep the event loop free
+    if len(body) >= THREADPOOL_MIN_SIZE:
+        body = await run_in_threadpool(compress, body, encoding)
+    else:
+        body = compress(body, encoding)
+
+    compressed_response = Response(content=body, status_code=response.status_code)
+    compressed_response.raw_headers = headers + [
+        (b"content-encoding", encoding.encode()),
+        (b"content-length", str(len(body)).encode()),
+        (b"vary", vary.encode()),
+    ]
+    return compressed_response
@@ -0,0 +1,120 @@
+import os
+import time
+from typing import Any, Dict, Hashable, Tuple, Type
+from beanie import Document
+from fastapi import Response
+from utils.events import ChangeEvent, event_hub
+from utils.read_routing import read_session
+
+# Seconds a filtered count is reused, bounds the staleness left by the writes of other workers (0 disables the cache)
+COUNT_CACHE_TTL = float(os.getenv("MONGOCHEF_COUNT_CACHE_TTL", "30"))
+# Response header with the number of documents of the collection
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class CountCache:
+    """
+    In-process cache of the filtered counts, cleared by the change events of the routers.
+
+    Attributes:
+        ttl (float): Seconds an entry is reused.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+
+    def get(self, key: Hashable) -> int | None:
+        """
+        Get a cached count.
+
+        Args:
+            key (Hashable): Collection and filter of the count.
+
+        Returns:
+            int | None: The count, None if it is not cached or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, count: int) -> None:
+        """
+        Store a count.
+
+        Args:
+            key (Hashable): Collection and filter of the count.
+            count (int): The number of documents.
+        """
+        if self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, count)
+
+    def clear(self, event: ChangeEvent | None = None) -> None:
+        """
+        Remove every count, a recipe write changes the usage counters of the catalog and a catalog rename the recipes.
+
+        Args:
+            event (ChangeEvent | None): The change event that invalidated the counts.
+        """
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the cache.
+
+        Returns:
+            Dict[str, int]: Entries, hits and misses.
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Cache shared by the count endpoints of the worker
+count_cache = CountCache(COUNT_CACHE_TTL)
+event_hub.add_listener(count_cache.clear)
+
+
+async def count_documents(
+    model: Type[Document], filters: Dict[str, Any], exact: bool = False
+) -> Tuple[int, bool]:
+    """
+    Count the documents of a collection, from the collection metadata when no filter or exact count is requested.
+
+    Args:
+        model (Type[Document]): Beanie model of the collection.
+        filters (Dict[str, Any]): MongoDB filter on indexed fields.
+        exact (bool): Count the documents even without a filter.
+
+    Returns:
+        Tuple[int, bool]: The count and whether it is estimated.
+    """
+    collection = model.get_motor_collection()
+    session = read_session.get()
+    if not filters:
+        if exact:
+            return await collection.count_documents({}, session=session), False
+        return await collection.estimated_document_count(), True
+
+    # A count after a write of the client skips the cache, it may predate that write
+    key = repr((collection.name, sorted(filters.items())))
+    count = count_cache.get(key) if session is None else None
+    if count is None:
+        count = await collection.count_documents(filters, session=session)
+        count_cache.put(key, count)
+    return count, False
+
+
+async def set_total_count(response: Response, model: Type[Document]) -> None:
+    """
+    Add the estimated number of documents of a collection to a list response, read from the collection metadata.
+
+    Args:
+        response (Response): The response injected in the route handler.
+        model (Type[Document]): Beanie model of the collection.
+    """
+    total = await model.get_motor_collection().estimated_document_count()
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
@@ -0,0 +1,112 @@
+import logging
+import os
+from typing import Awaitable, Callable, Dict
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pymongo import monitoring
+from utils.query_log import command_collection, query_shape
+from utils.request_context import current_request
+
+# Round-trip accounting settings
+REPEATED_SHAPE_THRESHOLD = int(os.getenv("MONGOCHEF_REPEATED_SHAPE_THRESHOLD", "5"))
+DEFAULT_ROUNDTRIP_BUDGET = int(os.getenv("MONGOCHEF_ROUNDTRIP_BUDGET", "20"))
+# Test mode: requests over their budget fail with a 500 error instead of logging a warning
+STRICT_ROUNDTRIP_BUDGET = os.getenv("MONGOCHEF_STRICT_ROUNDTRIP_BUDGET", "0") == "1"
+
+# Round-trip budgets per route, the other routes use DEFAULT_ROUNDTRIP_BUDGET
+ROUNDTRIP_BUDGETS: Dict[str, int] = {
+    "POST /recipes/create": 60,
+    "PUT /recipes/update/{recipe_title}": 60,
+    # One insert per GridFS chunk of the image and its thumbnail
+    "PUT /recipes/{recipes_title}/image": 200,
+    # One bulk write per chunk of the upload
+    "POST /ingredients/bulk": 500,
+    "POST /kitchen_tools/bulk": 500,
+    "POST /categories/bulk": 500,
+}
+
+logger = logging.getLogger(__name__)
+
+
+class RoundTripListener(monitoring.CommandListener):
+    """
+    Command listener that accounts the MongoDB commands and their time to the request that sent them.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        request = current_request.get()
+        if request is None:
+            return
+
+        shape = query_shape(event.command_name, event.command)
+        repeated = request.record_command(shape)
+        # Cursor batches, GridFS chunks and chunked bulk writes are expected to repeat,
+        # other shapes repeating point to an N+1 pattern
+        expected = (
+            event.command_name == "getMore"
+            or command_collection(event.command_name, event.command).endswith(".chunks")
+            or len(event.command.get("updates", ())) > 1
+        )
+        if repeated == REPEATED_SHAPE_THRESHOLD + 1 and not expected:
+            logger.warning(
+                "Query shape repeated more than %d times in %s: %s",
+                REPEATED_SHAPE_THRESHOLD,
+                request.route,
+                shape,
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record_duration(event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record_duration(event.duration_micros)
+
+    @staticmethod
+    def _record_duration(duration_micros: int) -> None:
+        """
+        Add the duration of a finished command to the current request.
+
+        Args:
+            duration_micros (int): Duration of the command in microseconds.
+        """
+        request = current_request.get()
+        if request is not None:
+            request.record_duration(duration_micros / 1000)
+
+
+# Listener registered on the Motor client
+roundtrip_listener = RoundTripListener()
+
+
+async def db_accounting(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    HTTP middleware that reports the MongoDB round trips of the request and enforces the route budget.
+
+    Args:
+        request (Request): The incoming request.
+        call_next (Callable[[Request], Awaitable[Response]]): The next handler in the chain.
+
+    Returns:
+        Response: The route response with the X-DB-Roundtrips and Server-Timing headers.
+    """
+    response = await call_next(request)
+    context = current_request.get()
+    if context is None:
+        return response
+
+    budget = ROUNDTRIP_BUDGETS.get(context.route, DEFAULT_ROUNDTRIP_BUDGET)
+    if context.db_roundtrips > budget:
+        message = f"{context.route} sent {context.db_roundtrips} MongoDB commands, budget is {budget}"
+        if STRICT_ROUNDTRIP_BUDGET:
+            logger.error(message)
+            response = JSONResponse(status_code=500, content={"detail": message})
+        else:
+            logger.warning(message)
+
+    response.headers["X-DB-Roundtrips"] = str(context.db_roundtrips)
+    response.headers["Server-Timing"] = (
+        f'db;dur={context.db_time_ms:.2f};desc="{context.db_roundtrips} MongoDB commands"'
+    )
+    return response
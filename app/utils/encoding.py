@@ -0,0 +1,127 @@
+import hashlib
+from typing import Any, Callable, Dict
+import msgpack
+from fastapi.responses import JSONResponse
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Media types accepted in the Accept header for MessagePack
+MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+
+# Encoders of jsonable content per media type
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    JSON_MEDIA_TYPE: lambda content: JSONResponse(content).body,
+    MSGPACK_MEDIA_TYPE: lambda content: msgpack.packb(content, use_bin_type=True),
+}
+
+
+def parse_quality(header: str) -> Dict[str, float]:
+    """
+    Parse a header with quality values such as Accept or Accept-Encoding.
+
+    Args:
+        header (str): The header value.
+
+    Returns:
+        Dict[str, float]: Quality per value, lowercase.
+    """
+    qualities = {}
+    for item in header.split(","):
+        value, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, number = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            qualities[value.lower()] = quality
+    return qualities
+
+
+def negotiate_media_type(accept: str) -> str:
+    """
+    Choose between JSON and MessagePack for a response body.
+
+    Args:
+        accept (str): The Accept header of the request.
+
+    Returns:
+        str: MSGPACK_MEDIA_TYPE when the client asks for it at least as much as JSON, JSON_MEDIA_TYPE otherwise.
+    """
+    qualities = parse_quality(accept)
+    msgpack_quality = max(
+        (qualities.get(alias, 0.0) for alias in MSGPACK_ALIASES), default=0.0
+    )
+    json_quality = qualities.get(JSON_MEDIA_TYPE, qualities.get("*/*", 0.0))
+    if msgpack_quality > 0 and msgpack_quality >= json_quality:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+class SerializedContent:
+    """
+    Jsonable content with its encoded bodies, each media type is encoded once and shared.
+
+    Attributes:
+        content (Any): The jsonable content.
+        headers (Dict[str, str]): Headers set by the handler that produced the content.
+    """
+
+    def __init__(self, content: Any, headers: Dict[str, str] | None = None) -> None:
+        self.content = content
+        self.headers = headers or {}
+        self._bodies: Dict[str, bytes] = {}
+
+    def body(self, media_type: str) -> bytes:
+        """
+        Get the body of the content encoded with a media type.
+
+        Args:
+            media_type (str): JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE.
+
+        Returns:
+            bytes: The encoded body.
+        """
+        if media_type not in self._bodies:
+            self._bodies[media_type] = ENCODERS[media_type](self.content)
+        return self._bodies[media_type]
+
+    def etag(self, media_type: str) -> str:
+        """
+        Get the entity tag of the content encoded with a media type.
+
+        Args:
+            media_type (str): JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE.
+
+        Returns:
+            str: A weak entity tag, weak because compression changes the bytes on the wire.
+        """
+        digest = hashlib.blake2b(self.body(media_type), digest_size=16)
+        # Headers such as X-Total-Count are part of the representation
+        for name, value in sorted(self.headers.items()):
+            digest.update(f"\n{name}: {value}".encode())
+        return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag with the weak comparison.
+
+    Args:
+        if_none_match (str | None): The If-None-Match header of the request.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
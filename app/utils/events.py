@@ -0,0 +1,367 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import secrets
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Set, Type
+from beanie import Document
+from fastapi.encoders import jsonable_encoder
+from models.categories_model import Categories
+from models.ingredients_model import Ingredients
+from models.kitchen_tools_model import KitchenTools
+from models.recipes_model import Recipes
+
+# Event feed settings
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("MONGOCHEF_EVENT_QUEUE_SIZE", "256"))
+REPLAY_BUFFER_SIZE = int(os.getenv("MONGOCHEF_EVENT_REPLAY_SIZE", "1000"))
+# "local" publishes the changes of this worker, "change_stream" follows MongoDB (replica set required)
+EVENT_SOURCE = os.getenv("MONGOCHEF_EVENT_SOURCE", "local")
+
+# Collections of the feed: event name, model and field used as key in the URLs
+FEED_COLLECTIONS: Dict[str, Type[Document]] = {
+    "recipes": Recipes,
+    "ingredients": Ingredients,
+    "kitchen_tools": KitchenTools,
+    "categories": Categories,
+}
+KEY_FIELDS = {"recipes": "title"}  # The catalog collections use "name"
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent:
+    """
+    Change of a document sent to the subscribers, encoded once as a Server-Sent Event.
+
+    Attributes:
+        sequence (int): Position of the event in the feed of the worker.
+        event_id (str): Id of the hub and sequence, sent as the event id so the other workers do not mistake it for theirs.
+        collection (str): Name of the collection in FEED_COLLECTIONS.
+        action (str): "create", "update", "delete" or "bulk".
+        data (Dict[str, Any]): Id, key and, except for deletes, the document. Bulk events only carry the number of created entries.
+        message (bytes): The event in the text/event-stream format.
+    """
+
+    def __init__(
+        self,
+        hub_id: str,
+        sequence: int,
+        collection: str,
+        action: str,
+        data: Dict[str, Any],
+    ) -> None:
+        self.sequence = sequence
+        self.event_id = f"{hub_id}-{sequence}"
+        self.collection = collection
+        self.action = action
+        self.data = data
+        payload = json.dumps(
+            {"collection": collection, "action": action, **data},
+            separators=(",", ":"),
+        )
+        self.message = (
+            f"id: {self.event_id}\nevent: {collection}.{action}\ndata: {payload}\n\n"
+        ).encode()
+
+
+class Subscriber:
+    """
+    Connection of a client to the feed with its bounded queue.
+
+    Attributes:
+        collections (Set[str]): Collections the client follows.
+        queue (asyncio.Queue): Events waiting to be sent.
+        dropped (bool): True when the client was too slow and lost events.
+    """
+
+    def __init__(self, collections: Set[str], queue_size: int) -> None:
+        self.collections = collections
+        self.queue: asyncio.Queue[ChangeEvent] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class EventHub:
+    """
+    In-process broadcast of change events to the subscribers of the worker.
+
+    Attributes:
+        hub_id (str): Random id of the hub, a restarted worker or another worker behind the load balancer gets a different one.
+        queue_size (int): Events a subscriber can have pending before it is dropped.
+        replay_size (int): Recent events kept to resume a reconnecting client.
+    """
+
+    def __init__(self, queue_size: int, replay_size: int) -> None:
+        self.hub_id = secrets.token_hex(4)
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.published = 0
+        self.dropped = 0
+        self._sequence = itertools.count(1)
+        self._subscribers: Set[Subscriber] = set()
+        self._recent: Deque[ChangeEvent] = deque(maxlen=replay_size)
+        self._listeners: List[Callable[[ChangeEvent], None]] = []
+
+    def subscribe(self, collections: Set[str]) -> Subscriber:
+        """
+        Register a new subscriber.
+
+        Args:
+            collections (Set[str]): Collections the client follows.
+
+        Returns:
+            Subscriber: The subscriber with its queue.
+        """
+        subscriber = Subscriber(collections, self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """
+        Remove a subscriber.
+
+        Args:
+            subscriber (Subscriber): The subscriber of a closed connection.
+        """
+        self._subscribers.discard(subscriber)
+
+    def add_listener(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """
+        Register a function called synchronously with every event, for in-process caches.
+
+        Args:
+            listener (Callable[[ChangeEvent], None]): The function to call.
+        """
+        self._listeners.append(listener)
+
+    @property
+    def last_event_id(self) -> str:
+        """
+        Id of the last published event, sent with a reset so the client resumes from there.
+
+        Returns:
+            str: The event id, with sequence 0 before the first event.
+        """
+        return f"{self.hub_id}-{self.published}"
+
+    def replay(self, last_event_id: str) -> List[ChangeEvent] | None:
+        """
+        Get the events published after the last one a client received.
+
+        Args:
+            last_event_id (str): Last-Event-ID header sent by the client.
+
+        Returns:
+            List[ChangeEvent] | None: The missed events, None if the id was not issued by this hub or some of the events are no longer kept.
+        """
+        hub_id, _, sequence = last_event_id.partition("-")
+        if hub_id != self.hub_id or not sequence.isdigit():
+            return None  # Issued by another worker or before a restart, the sequences do not match
+        last_sequence = int(sequence)
+        if last_sequence == self.published:
+            return []
+        if last_sequence > self.published:
+            return None
+        if not self._recent or self._recent[0].sequence > last_sequence + 1:
+            return None
+        return [event for event in self._recent if event.sequence > last_sequence]
+
+    def publish(self, collection: str, action: str, data: Dict[str, Any]) -> None:
+        """
+        Send an event to the listeners and the subscribers of its collection, dropping the full queues.
+
+        Args:
+            collection (str): Name of the collection in FEED_COLLECTIONS.
+            action (str): "create", "update", "delete" or "bulk".
+            data (Dict[str, Any]): Id, key and document of the change.
+        """
+        event = ChangeEvent(self.hub_id, next(self._sequence), collection, action, data)
+        self.published = event.sequence
+        self._recent.append(event)
+
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Event listener failed")
+
+        for subscriber in list(self._subscribers):
+            if collection not in subscriber.collections:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow client must not hold memory or delay the others, it resumes after reconnecting
+                subscriber.dropped = True
+                self._subscribers.discard(subscriber)
+                self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the hub.
+
+        Returns:
+            Dict[str, int]: Subscribers, published events and dropped subscribers.
+        """
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+# Hub shared by the routers and the /events endpoint of the worker
+event_hub = EventHub(SUBSCRIBER_QUEUE_SIZE, REPLAY_BUFFER_SIZE)
+
+
+def event_data(collection: str, document: Document, deleted: bool) -> Dict[str, Any]:
+    """
+    Build the data of an event from a document.
+
+    Args:
+        collection (str): Name of the collection in FEED_COLLECTIONS.
+        document (Document): The changed document.
+        deleted (bool): The document was deleted, only its id and key are sent.
+
+    Returns:
+        Dict[str, Any]: Id, key and document.
+    """
+    data = {
+        "id": str(document.id),
+        "key": getattr(document, KEY_FIELDS.get(collection, "name")),
+    }
+    if not deleted:
+        data["document"] = jsonable_encoder(document)
+    return data
+
+
+def publish_change(
+    collection: str,
+    action: str,
+    document: Document,
+    previous_key: str | None = None,
+) -> None:
+    """
+    Publish the change of a document made by a router.
+
+    With the change stream source the events come from MongoDB instead, so nothing is published here.
+
+    Args:
+        collection (str): Name of the collection in FEED_COLLECTIONS.
+        action (str): "create", "update" or "delete".
+        document (Document): The changed document.
+        previous_key (str | None): Previous title or name when an update renamed the document.
+    """
+    if EVENT_SOURCE != "local":
+        return
+    data = event_data(collection, document, deleted=action == "delete")
+    if previous_key is not None and previous_key != data["key"]:
+        data["previous_key"] = previous_key
+    event_hub.publish(collection, action, data)
+
+
+def publish_bulk(collection: str, created: int) -> None:
+    """
+    Publish the entries created by a bulk upload as a single event, one event per entry would drop every subscriber.
+
+    Args:
+        collection (str): Name of the collection in FEED_COLLECTIONS.
+        created (int): Number of created entries.
+    """
+    if EVENT_SOURCE != "local" or not created:
+        return
+    event_hub.publish(collection, "bulk", {"created": created})
+
+
+class ChangeStreamSource:
+    """
+    Feeds the hub from a MongoDB change stream, so every worker sees the changes made by the others.
+
+    Attributes:
+        hub (EventHub): The hub of the worker.
+    """
+
+    OPERATIONS = {
+        "insert": "create",
+        "update": "update",
+        "replace": "update",
+        "delete": "delete",
+    }
+
+    def __init__(self, hub: EventHub) -> None:
+        self.hub = hub
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """
+        Start following the change stream in a background task.
+        """
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop following the change stream.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """
+        Follow the change stream, resuming after errors from the last seen token.
+        """
+        collections = {
+            model.get_motor_collection().name: name
+            for name, model in FEED_COLLECTIONS.items()
+        }
+        database = Recipes.get_motor_collection().database
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": list(collections)},
+                    "operationType": {"$in": list(self.OPERATIONS)},
+                }
+            }
+        ]
+        resume_token = None
+        while True:
+            try:
+                async with database.watch(
+                    pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._publish(collections[change["ns"]["coll"]], change)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change stream failed, resuming")
+                await asyncio.sleep(1)
+
+    def _publish(self, collection: str, change: Dict[str, Any]) -> None:
+        """
+        Convert a change document into an event.
+
+        Args:
+            collection (str): Name of the collection in FEED_COLLECTIONS.
+            change (Dict[str, Any]): The change stream document.
+        """
+        action = self.OPERATIONS[change["operationType"]]
+        full_document = change.get("fullDocument")
+        if full_document is None:
+            # Deletes only carry the id, updates lose the document when it was deleted right after
+            data = {"id": str(change["documentKey"]["_id"]), "key": None}
+        else:
+            document = FEED_COLLECTIONS[collection].model_validate(full_document)
+            data = event_data(collection, document, deleted=action == "delete")
+        self.hub.publish(collection, action, data)
+
+
+# Source of the events, started with the application
+change_stream_source = (
+    ChangeStreamSource(event_hub) if EVENT_SOURCE == "change_stream" else None
+)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Tuple
+from pymongo import UpdateOne
+from models.recipes_model import Recipes
+from utils.normalize import normalized_string
+from utils.read_routing import read_session
+
+# Base unit and factor of the known units, the others are compared by their normalized name
+UNIT_FACTORS: Dict[str, Tuple[str, float]] = {
+    # Mass, in grams
+    "mg": ("g", 0.001),
+    "milligram": ("g", 0.001),
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "gram": ("g", 1.0),
+    "gramo": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "kilogram": ("g", 1000.0),
+    "kilogramo": ("g", 1000.0),
+    "oz": ("g", 28.349523125),
+    "ounce": ("g", 28.349523125),
+    "lb": ("g", 453.59237),
+    "pound": ("g", 453.59237),
+    # Volume, in millilitres
+    "ml": ("ml", 1.0),
+    "millilitre": ("ml", 1.0),
+    "milliliter": ("ml", 1.0),
+    "mililitro": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "litre": ("ml", 1000.0),
+    "liter": ("ml", 1000.0),
+    "litro": ("ml", 1000.0),
+    "tsp": ("ml", 5.0),
+    "teaspoon": ("ml", 5.0),
+    "cucharadita": ("ml", 5.0),
+    "tbsp": ("ml", 15.0),
+    "tablespoon": ("ml", 15.0),
+    "cucharada": ("ml", 15.0),
+    "cup": ("ml", 240.0),
+    "taza": ("ml", 240.0),
+    # Countable
+    "piece": ("unit", 1.0),
+    "pieza": ("unit", 1.0),
+    "unit": ("unit", 1.0),
+    "unidad": ("unit", 1.0),
+    "dozen": ("unit", 12.0),
+    "docena": ("unit", 12.0),
+}
+# Significant digits kept from the converted quantities, absorbs the rounding of the conversions
+QUANTITY_DIGITS = 6
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def canonical_unit(unit: str) -> str:
+    """
+    Normalize the name of a unit, removing the trailing dot and the plural.
+
+    Args:
+        unit (str): The unit of an ingredient.
+
+    Returns:
+        str: The normalized unit name.
+    """
+    name = normalized_string(unit).rstrip(".")
+    if name not in UNIT_FACTORS and name.endswith("es") and name[:-2] in UNIT_FACTORS:
+        return name[:-2]
+    if name not in UNIT_FACTORS and name.endswith("s") and name[:-1] in UNIT_FACTORS:
+        return name[:-1]
+    return name
+
+
+def canonical_quantity(quantity: int | float, unit: str) -> Tuple[str, str]:
+    """
+    Convert a quantity to the base unit of its dimension.
+
+    Args:
+        quantity (int | float): Quantity of the ingredient.
+        unit (str): Unit of the quantity.
+
+    Returns:
+        Tuple[str, str]: The formatted quantity and its base unit.
+    """
+    name = canonical_unit(unit)
+    base, factor = UNIT_FACTORS.get(name, (name, 1.0))
+    return f"{quantity * factor:.{QUANTITY_DIGITS}g}", base
+
+
+def canonical_instructions(instructions: str) -> str:
+    """
+    Normalize the instructions ignoring case, accents, punctuation and whitespace.
+
+    Args:
+        instructions (str): Instructions of the recipe.
+
+    Returns:
+        str: The normalized instructions.
+    """
+    return " ".join(_PUNCTUATION.sub(" ", normalized_string(instructions)).split())
+
+
+def recipe_fingerprint(recipe: Recipes) -> str:
+    """
+    Compute the content fingerprint of a recipe, equal for recipes that only differ in title, order or formatting.
+
+    Args:
+        recipe (Recipes): The recipe object.
+
+    Returns:
+        str: Hex digest of the canonical content.
+    """
+    canonical: Dict[str, Any] = {
+        "ingredients": sorted(
+            [
+                str(detail.ingredient_object.id),
+                *canonical_quantity(detail.quantity, detail.unit),
+            ]
+            for detail in recipe.ingredients
+        ),
+        "kitchen_tools": sorted({str(tool.id) for tool in recipe.kitchen_tools}),
+        "category": str(recipe.category.id),
+        "instructions": canonical_instructions(recipe.instructions),
+    }
+    encoded = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+async def find_duplicate(recipe: Recipes) -> Recipes | None:
+    """
+    Set the fingerprint of a recipe and look for another recipe with the same content, one probe of the fingerprint index.
+
+    Args:
+        recipe (Recipes): The recipe to insert or update.
+
+    Returns:
+        Recipes | None: The existing recipe with the same content, None if there is none.
+    """
+    recipe.fingerprint = recipe_fingerprint(recipe)
+    query = [Recipes.fingerprint == recipe.fingerprint]
+    if recipe.id is not None:
+        query.append(Recipes.id != recipe.id)
+    return await Recipes.find_one(*query)
+
+
+async def duplicate_clusters(limit: int) -> List[Dict[str, Any]]:
+    """
+    Group the recipes that share a fingerprint, largest groups first.
+
+    Args:
+        limit (int): Maximum number of groups.
+
+    Returns:
+        List[Dict[str, Any]]: Fingerprint, titles and ids of each group.
+    """
+    pipeline = [
+        {"$match": {"fingerprint": {"$type": "string"}}},
+        {"$sort": {"fingerprint": 1, "_id": 1}},
+        {
+            "$group": {
+                "_id": "$fingerprint",
+                "titles": {"$push": "$title"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+    ]
+    cursor = Recipes.get_motor_collection().aggregate(
+        pipeline, session=read_session.get()
+    )
+    clusters = await cursor.to_list(None)
+    return [
+        {
+            "fingerprint": cluster["_id"],
+            "titles": cluster["titles"],
+            "ids": [str(recipe_id) for recipe_id in cluster["ids"]],
+        }
+        for cluster in clusters
+    ]
+
+
+async def backfill_fingerprints(batch_size: int = 1000) -> int:
+    """
+    Compute the fingerprint of the recipes stored before it existed or whose content changed outside the API.
+
+    Args:
+        batch_size (int): Recipes updated per bulk write.
+
+    Returns:
+        int: Number of recipes updated.
+    """
+    collection = Recipes.get_motor_collection()
+    operations: List[UpdateOne] = []
+    updated = 0
+    async for recipe in Recipes.find_all():
+        fingerprint = recipe_fingerprint(recipe)
+        if recipe.fingerprint == fingerprint:
+            continue
+        operations.append(
+            UpdateOne({"_id": recipe.id}, {"$set": {"fingerprint": fingerprint}})
+        )
+        if len(operations) >= batch_size:
+            updated += (
+                await collection.bulk_write(operations, ordered=False)
+            ).modified_count
+            operations = []
+    if operations:
+        updated += (
+            await collection.bulk_write(operations, ordered=False)
+        ).modified_count
+    return updated
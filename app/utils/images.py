@@ -0,0 +1,288 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Tuple
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket, AsyncIOMotorGridOut
+from PIL import Image, ImageOps
+from pymongo import ASCENDING
+from models.recipes_model import RecipeImage, Recipes
+
+# Image settings
+IMAGES_BUCKET = "recipe_images"
+MAX_IMAGE_BYTES = int(os.getenv("MONGOCHEF_MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+THUMBNAIL_SIZE = int(os.getenv("MONGOCHEF_THUMBNAIL_SIZE", "320"))
+THUMBNAIL_WORKERS = int(os.getenv("MONGOCHEF_THUMBNAIL_WORKERS", "2"))
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+# Uploads up to this size are copied in memory for the thumbnail, larger ones on disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+IMAGE_MEDIA_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+# Files are named by their content hash, so a URL always serves the same bytes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_thumbnail_pool: ProcessPoolExecutor | None = None
+
+
+class ImageTooLarge(Exception):
+    """
+    Raised when an upload exceeds MAX_IMAGE_BYTES.
+    """
+
+
+class InvalidImage(Exception):
+    """
+    Raised when an upload can not be decoded as an image.
+    """
+
+
+def image_bucket() -> AsyncIOMotorGridFSBucket:
+    """
+    Get the GridFS bucket of the recipe images on the Beanie database.
+
+    Returns:
+        AsyncIOMotorGridFSBucket: The recipe images bucket.
+    """
+    return AsyncIOMotorGridFSBucket(
+        Recipes.get_motor_collection().database, bucket_name=IMAGES_BUCKET
+    )
+
+
+def make_thumbnail(data: bytes) -> bytes:
+    """
+    Build the JPEG thumbnail of an image, runs in the thumbnail process pool.
+
+    Args:
+        data (bytes): The original image.
+
+    Returns:
+        bytes: The thumbnail, at most THUMBNAIL_SIZE pixels wide and high.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        thumbnail = ImageOps.exif_transpose(image)
+        thumbnail.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        if thumbnail.mode != "RGB":
+            thumbnail = thumbnail.convert("RGB")
+        output = io.BytesIO()
+        thumbnail.save(output, "JPEG", quality=85, optimize=True)
+        return output.getvalue()
+
+
+def thumbnail_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool of the thumbnail generation, created on first use.
+
+    Returns:
+        ProcessPoolExecutor: The thumbnail process pool.
+    """
+    global _thumbnail_pool
+    if _thumbnail_pool is None:
+        # Spawned workers do not inherit the Motor threads and sockets of the API process
+        _thumbnail_pool = ProcessPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _thumbnail_pool
+
+
+def shutdown_thumbnail_pool() -> None:
+    """
+    Stop the thumbnail worker processes.
+    """
+    global _thumbnail_pool
+    if _thumbnail_pool is not None:
+        _thumbnail_pool.shutdown(cancel_futures=True)
+        _thumbnail_pool = None
+
+
+async def _find_file(sha256: str) -> AsyncIOMotorGridOut | None:
+    """
+    Find a stored file by its content hash.
+
+    Args:
+        sha256 (str): Hex SHA-256 of the file content.
+
+    Returns:
+        AsyncIOMotorGridOut | None: The file, None if it does not exist.
+    """
+    # The oldest copy wins when the same content was uploaded concurrently
+    cursor = image_bucket().find(
+        {"filename": sha256}, sort=[("uploadDate", ASCENDING)], limit=1
+    )
+    async for grid_out in cursor:
+        return grid_out
+    return None
+
+
+async def _store(data: bytes, sha256: str, media_type: str) -> None:
+    """
+    Store a file under its content hash unless the same content is already stored.
+
+    Args:
+        data (bytes): The file content.
+        sha256 (str): Hex SHA-256 of the content.
+        media_type (str): Content type of the file.
+    """
+    if await _find_file(sha256) is None:
+        await image_bucket().upload_from_stream(
+            sha256, data, metadata={"content_type": media_type}
+        )
+
+
+async def store_image(chunks: AsyncIterator[bytes], media_type: str) -> RecipeImage:
+    """
+    Stream an uploaded image into GridFS and store its thumbnail.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The request body chunks.
+        media_type (str): Content type of the image.
+
+    Raises:
+        ImageTooLarge: If the image exceeds MAX_IMAGE_BYTES.
+        InvalidImage: If the image can not be decoded.
+
+    Returns:
+        RecipeImage: The stored image.
+    """
+    bucket = image_bucket()
+    digest = hashlib.sha256()
+    size = 0
+    # The name is set to the content hash once the whole body has been read
+    grid_in = bucket.open_upload_stream("upload", metadata={"content_type": media_type})
+    # The thumbnail is built from a copy taken during the upload, bounded by MAX_IMAGE_BYTES
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as copy:
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    raise ImageTooLarge()
+                digest.update(chunk)
+                copy.write(chunk)
+                await grid_in.write(chunk)
+            sha256 = digest.hexdigest()
+            await grid_in.set("filename", sha256)
+            await grid_in.close()
+        except BaseException:
+            await grid_in.abort()
+            raise
+        copy.seek(0)
+        data = copy.read()
+
+    # Identical content is stored once, the new copy is dropped
+    existing = await _find_file(sha256)
+    if existing is not None and existing._id != grid_in._id:
+        await bucket.delete(grid_in._id)
+        file_id, length = existing._id, existing.length
+    else:
+        file_id, length = grid_in._id, grid_in.length
+
+    try:
+        thumbnail = await asyncio.get_running_loop().run_in_executor(
+            thumbnail_pool(), make_thumbnail, data
+        )
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        if file_id == grid_in._id:
+            await bucket.delete(file_id)
+        raise InvalidImage() from error
+
+    thumbnail_sha256 = hashlib.sha256(thumbnail).hexdigest()
+    await _store(thumbnail, thumbnail_sha256, THUMBNAIL_MEDIA_TYPE)
+    return RecipeImage(
+        sha256=sha256,
+        content_type=media_type,
+        length=length,
+        thumbnail_sha256=thumbnail_sha256,
+    )
+
+
+async def release_image(image: RecipeImage | None) -> None:
+    """
+    Delete the files of an image once no recipe references them.
+
+    Args:
+        image (RecipeImage | None): The image detached from a recipe.
+    """
+    if image is None:
+        return
+    if await Recipes.find_one({"image.sha256": image.sha256}) is not None:
+        return
+    bucket = image_bucket()
+    async for grid_out in bucket.find(
+        {"filename": {"$in": [image.sha256, image.thumbnail_sha256]}}
+    ):
+        await bucket.delete(grid_out._id)
+
+
+async def open_image(sha256: str) -> AsyncIOMotorGridOut | None:
+    """
+    Open a stored image or thumbnail by its content hash.
+
+    Args:
+        sha256 (str): Hex SHA-256 of the file content.
+
+    Returns:
+        AsyncIOMotorGridOut | None: The file opened for reading, None if it does not exist.
+    """
+    return await _find_file(sha256)
+
+
+def parse_range(header: str | None, length: int) -> Tuple[int, int] | None:
+    """
+    Parse a single byte range of a Range header.
+
+    Args:
+        header (str | None): The Range header of the request.
+        length (int): Length of the file.
+
+    Raises:
+        ValueError: If the range can not be satisfied.
+
+    Returns:
+        Tuple[int, int] | None: First and last byte positions, None to send the whole file.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if match is None:
+        return None  # Missing or multiple ranges, the whole file is sent
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        start = max(length - int(last), 0)
+        end = length - 1
+    else:
+        start = int(first)
+        end = min(int(last), length - 1) if last else length - 1
+    if start >= length or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+async def stream_file(
+    grid_out: AsyncIOMotorGridOut, start: int, end: int
+) -> AsyncIterator[bytes]:
+    """
+    Stream a byte range of a stored file chunk by chunk.
+
+    Args:
+        grid_out (AsyncIOMotorGridOut): The file opened for reading.
+        start (int): First byte position.
+        end (int): Last byte position, inclusive.
+
+    Yields:
+        bytes: The file chunks.
+    """
+    grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = await grid_out.readchunk()
+        if not chunk:
+            break
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
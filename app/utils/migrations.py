@@ -0,0 +1,314 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+from models.categories_model import Categories
+from models.ingredients_model import Ingredients
+from models.kitchen_tools_model import KitchenTools
+from models.recipes_model import Recipes
+from models.recipe_signatures_model import RecipeSignatures
+from utils.normalize import normalized_string
+
+RECIPES_COLLECTION = Recipes.__name__  # Recipes keeps the default collection name
+OBJECT_ID_BATCH_SIZE = 1000  # Recipes converted per update_many of migrate_object_ids
+
+# Embedded reference of each catalog collection inside Recipes: (array field, id path, name path)
+CATALOG_REFERENCES = {
+    Ingredients.Settings.name: (
+        "ingredients",
+        "ingredient_object.id",
+        "ingredient_object.name",
+    ),
+    KitchenTools.Settings.name: ("kitchen_tools", "id", "name"),
+    Categories.Settings.name: (None, "category.id", "category.name"),
+}
+
+
+async def _drop_index(
+    database: AsyncIOMotorDatabase, collection: str, name: str
+) -> None:
+    """
+    Drop an index if it exists.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+        collection (str): Collection name.
+        name (str): Index name.
+    """
+    try:
+        await database[collection].drop_index(name)
+    except OperationFailure:
+        pass  # The index does not exist
+
+
+async def _repoint_references(
+    database: AsyncIOMotorDatabase,
+    collection: str,
+    old_id: Any,
+    new_id: Any,
+    new_name: str,
+) -> int:
+    """
+    Make the recipes that reference a catalog entry point to another entry.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+        collection (str): Catalog collection name.
+        old_id (Any): Id of the referenced entry.
+        new_id (Any): Id of the entry that replaces it.
+        new_name (str): Name of the entry that replaces it.
+
+    Returns:
+        int: Number of recipes updated.
+    """
+    array, id_path, name_path = CATALOG_REFERENCES[collection]
+    # Ids are stored as strings or ObjectIds depending on the schema version
+    old_ids = [old_id, str(old_id)]
+    recipes = database[RECIPES_COLLECTION]
+
+    if array is None:
+        result = await recipes.update_many(
+            {id_path: {"$in": old_ids}},
+            {"$set": {id_path: new_id, name_path: new_name}},
+        )
+        return result.modified_count
+
+    result = await recipes.update_many(
+        {f"{array}.{id_path}": {"$in": old_ids}},
+        {
+            "$set": {
+                f"{array}.$[item].{id_path}": new_id,
+                f"{array}.$[item].{name_path}": new_name,
+            }
+        },
+        array_filters=[{f"item.{id_path}": {"$in": old_ids}}],
+    )
+    return result.modified_count
+
+
+async def merge_catalog_duplicates(
+    database: AsyncIOMotorDatabase, collection: str
+) -> Dict[str, int]:
+    """
+    Merge the catalog entries whose names are equal once normalized, keeping the most used one.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+        collection (str): Catalog collection name.
+
+    Returns:
+        Dict[str, int]: Number of merged entries, renamed entries and updated recipes.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    async for entry in database[collection].find({}, {"name": 1, "usage_count": 1}):
+        groups[normalized_string(entry["name"])].append(entry)
+
+    summary = {"merged": 0, "renamed": 0, "recipes": 0}
+    for name, entries in groups.items():
+        entries.sort(key=lambda entry: (-entry.get("usage_count", 0), entry["_id"]))
+        keeper, duplicates = entries[0], entries[1:]
+        if keeper["name"] == name and not duplicates:
+            continue
+
+        for entry in entries:
+            summary["recipes"] += await _repoint_references(
+                database, collection, entry["_id"], keeper["_id"], name
+            )
+        if duplicates:
+            await database[collection].delete_many(
+                {"_id": {"$in": [entry["_id"] for entry in duplicates]}}
+            )
+            summary["merged"] += len(duplicates)
+        if keeper["name"] != name:
+            await database[collection].update_one(
+                {"_id": keeper["_id"]}, {"$set": {"name": name}}
+            )
+            summary["renamed"] += 1
+
+    await _drop_index(database, collection, "name_1")
+    return summary
+
+
+async def rename_recipe_duplicates(database: AsyncIOMotorDatabase) -> Dict[str, int]:
+    """
+    Normalize the recipe titles and add a numeric suffix to the recipes whose titles collide once normalized.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+
+    Returns:
+        Dict[str, int]: Number of renamed recipes.
+    """
+    recipes = database[RECIPES_COLLECTION]
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    async for recipe in recipes.find({}, {"title": 1}):
+        groups[normalized_string(recipe["title"])].append(recipe)
+    taken = set(groups)
+
+    renamed = 0
+    for title, group in groups.items():
+        group.sort(key=lambda recipe: recipe["_id"])
+        for position, recipe in enumerate(group):
+            new_title = title
+            if position:
+                # The oldest recipe keeps the title, the others get the first free suffix
+                suffix = 2
+                while new_title in taken:
+                    new_title = f"{title} ({suffix})"
+                    suffix += 1
+                taken.add(new_title)
+            if recipe["title"] == new_title:
+                continue
+            await recipes.update_one(
+                {"_id": recipe["_id"]}, {"$set": {"title": new_title}}
+            )
+            await database[RecipeSignatures.Settings.name].update_many(
+                {"recipe_id": recipe["_id"]}, {"$set": {"title": new_title}}
+            )
+            renamed += 1
+
+    await _drop_index(database, RECIPES_COLLECTION, "title_1")
+    return {"renamed": renamed}
+
+
+async def migrate_names(database: AsyncIOMotorDatabase) -> Dict[str, Dict[str, int]]:
+    """
+    Prepare the data for the collation indexes: merge the near-duplicate catalog entries and rename the colliding recipes.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Summary per collection.
+    """
+    summary = {}
+    for collection in CATALOG_REFERENCES:
+        summary[collection] = await merge_catalog_duplicates(database, collection)
+    summary[RECIPES_COLLECTION] = await rename_recipe_duplicates(database)
+    return summary
+
+
+# Recipes with at least one catalog reference still stored as a string
+STRING_REFERENCES = {
+    "$or": [
+        {"category.id": {"$type": "string"}},
+        {"ingredients.ingredient_object.id": {"$type": "string"}},
+        {"kitchen_tools.id": {"$type": "string"}},
+    ]
+}
+# Pipeline update that converts every reference of a recipe, $toObjectId keeps the ObjectIds as they are
+OBJECT_ID_UPDATE = [
+    {
+        "$set": {
+            "category.id": {"$toObjectId": "$category.id"},
+            "ingredients": {
+                "$map": {
+                    "input": "$ingredients",
+                    "as": "item",
+                    "in": {
+                        "$mergeObjects": [
+                            "$$item",
+                            {
+                                "ingredient_object": {
+                                    "$mergeObjects": [
+                                        "$$item.ingredient_object",
+                                        {
+                                            "id": {
+                                                "$toObjectId": "$$item.ingredient_object.id"
+                                            }
+                                        },
+                                    ]
+                                }
+                            },
+                        ]
+                    },
+                }
+            },
+            "kitchen_tools": {
+                "$map": {
+                    "input": "$kitchen_tools",
+                    "as": "tool",
+                    "in": {
+                        "$mergeObjects": [
+                            "$$tool",
+                            {"id": {"$toObjectId": "$$tool.id"}},
+                        ]
+                    },
+                }
+            },
+        }
+    }
+]
+
+
+async def collection_sizes(
+    database: AsyncIOMotorDatabase, collection: str
+) -> Dict[str, int]:
+    """
+    Read the document, storage and index sizes of a collection from collStats.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+        collection (str): Collection name.
+
+    Returns:
+        Dict[str, int]: Documents, data size, average document size, storage size and index sizes in bytes.
+    """
+    stats = await database.command("collStats", collection)
+    sizes = {
+        key: int(stats.get(key, 0))
+        for key in ("count", "size", "avgObjSize", "storageSize", "totalIndexSize")
+    }
+    sizes.update(
+        {f"index:{name}": int(size) for name, size in stats["indexSizes"].items()}
+    )
+    return sizes
+
+
+async def migrate_object_ids(
+    database: AsyncIOMotorDatabase,
+    batch_size: int = OBJECT_ID_BATCH_SIZE,
+    pause: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Convert the catalog references of the recipes from strings to ObjectIds while the API keeps serving.
+
+    Each recipe is converted atomically by a batched update_many and the API already writes ObjectIds, so the job can be stopped and run again at any time.
+
+    Args:
+        database (AsyncIOMotorDatabase): The application database.
+        batch_size (int): Recipes converted per update.
+        pause (float): Seconds to wait between batches to leave room for the API traffic.
+
+    Returns:
+        Dict[str, Any]: Number of converted recipes and the collection sizes before and after.
+    """
+    recipes = database[RECIPES_COLLECTION]
+    before = await collection_sizes(database, RECIPES_COLLECTION)
+
+    migrated = 0
+    last_id = None
+    while True:
+        query = (
+            STRING_REFERENCES
+            if last_id is None
+            else {"$and": [{"_id": {"$gt": last_id}}, STRING_REFERENCES]}
+        )
+        batch = (
+            await recipes.find(query, {"_id": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .to_list(None)
+        )
+        if not batch:
+            break
+        ids = [recipe["_id"] for recipe in batch]
+        result = await recipes.update_many({"_id": {"$in": ids}}, OBJECT_ID_UPDATE)
+        migrated += result.modified_count
+        last_id = ids[-1]
+        if pause:
+            await asyncio.sleep(pause)
+
+    after = await collection_sizes(database, RECIPES_COLLECTION)
+    return {"migrated": migrated, "before": before, "after": after}
@@ -1,6 +1,13 @@
+import unicodedata
+from pymongo.collation import Collation
+
+# Collation of the unique name indexes: strength 1 ignores case and diacritics
+NAME_COLLATION = Collation(locale="en", strength=1)
+
+
 def normalized_string(string: str) -> str:
     """
-    Normalize a string by removing leading and trailing whitespace and converting it to lowercase.
+    Normalize a string by decomposing it (NFKD), removing the diacritics, folding the case and collapsing the whitespace.
 
     Args:
         string (str): The string to normalize.
@@ -8,4 +15,6 @@ def normalized_string(string: str) -> str:
     Returns:
         str: The normalized string.
     """
-    return string.strip().lower()
+    decomposed = unicodedata.normalize("NFKD", string)
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(folded.casefold().split())
@@ -0,0 +1,73 @@
+from typing import Any, List, Sequence, Type
+from beanie import Document, PydanticObjectId
+from beanie.odm.queries.find import FindMany
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response
+
+# Largest page a client can request
+MAX_PAGE_SIZE = 1000
+# Most keys a client can request from a batch endpoint
+MAX_BATCH_KEYS = 500
+# Response header with the cursor of the next page, missing on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_query(
+    model: Type[Document],
+    after: str | None,
+    limit: int | None,
+    sort: Any | None = None,
+) -> FindMany:
+    """
+    Build the query of a list endpoint, paginated by id unless another sort is requested.
+
+    Args:
+        model (Type[Document]): Beanie model of the collection.
+        after (str | None): Cursor returned in the X-Next-Cursor header of the previous page.
+        limit (int | None): Maximum number of documents in the page.
+        sort (Any | None): Another sort of the list, only its first page can be requested.
+
+    Raises:
+        HTTPException: If the cursor is not valid or is used with another sort, a 400 Bad Request error is raised.
+
+    Returns:
+        FindMany: The query of the page.
+    """
+    if after is None:
+        query = model.find_all()
+    elif sort is not None:
+        raise HTTPException(
+            status_code=400, detail="Cursors are only supported in the default order"
+        )
+    else:
+        try:
+            query = model.find(model.id > PydanticObjectId(after))
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if sort is not None:
+        query = query.sort(sort)
+    elif after is not None or limit is not None:
+        query = query.sort(+model.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def set_next_cursor(
+    response: Response, documents: Sequence[Document], limit: int | None
+) -> List[Document]:
+    """
+    Add the cursor of the next page to the response when the page is full.
+
+    Args:
+        response (Response): The response injected in the route handler.
+        documents (Sequence[Document]): Documents of the current page, in id order.
+        limit (int | None): The requested page size.
+
+    Returns:
+        List[Document]: The documents of the page.
+    """
+    if limit is not None and len(documents) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(documents[-1].id)
+    return list(documents)
@@ -0,0 +1,383 @@
+import cProfile
+import functools
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Dict, Generator, List
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.admin_auth import is_admin
+from utils.request_context import current_request
+
+# Profiling settings, the hook is only installed with MONGOCHEF_PROFILING=1
+PROFILING_ENABLED = os.getenv("MONGOCHEF_PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("MONGOCHEF_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("MONGOCHEF_PROFILE_INTERVAL_MS", "5")) / 1000
+MAX_STACKS_PER_ROUTE = 10000  # Distinct stacks kept per route, the rest are merged
+
+# Admin requests with this header set to 1 are profiled
+PROFILE_HEADER = b"x-profile"
+# Admin pages and long-lived streams are never profiled
+EXCLUDED_PREFIXES = ("/admin", "/events", "/health", "/docs", "/redoc", "/openapi.json")
+UNMATCHED_ROUTE = "<unmatched>"
+TRUNCATED_STACK = "<other stacks>"
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """
+    Shorten the file of a frame to its package and module names.
+
+    Args:
+        filename (str): File of the code object.
+
+    Returns:
+        str: The last two components of the path.
+    """
+    return "/".join(Path(filename).parts[-2:])
+
+
+def frame_label(code: CodeType) -> str:
+    """
+    Name of a function in the collapsed stacks.
+
+    Args:
+        code (CodeType): Code object of the frame.
+
+    Returns:
+        str: Qualified name, file and first line of the function.
+    """
+    return f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def async_stack(coroutine: Any, thread_frame: FrameType | None) -> List[str]:
+    """
+    Build the stack of a request, from the running frames of its thread or from the chain of awaited coroutines while it waits.
+
+    Args:
+        coroutine (Any): Root coroutine of the request.
+        thread_frame (FrameType | None): Current frame of the event loop thread.
+
+    Returns:
+        List[str]: Frame labels from the root to the leaf, empty when the request finished.
+    """
+    root = coroutine.cr_frame
+    if root is None:
+        return []
+    if coroutine.cr_running:
+        running = []
+        frame = thread_frame
+        while frame is not None:
+            running.append(frame_label(frame.f_code))
+            if frame is root:
+                return running[::-1]
+            frame = frame.f_back
+
+    # Suspended: follow what each coroutine awaits down to the pending future
+    waiting = []
+    awaitable = coroutine
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            waiting.append(f"[await {type(awaitable).__name__}]")
+            break
+        waiting.append(frame_label(frame.f_code))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return waiting
+
+
+class ProfiledRequest:
+    """
+    Awaitable that runs the coroutine of a request with cProfile enabled only while the coroutine runs, so the requests interleaved on the event loop stay out of its profile.
+
+    Attributes:
+        coroutine (Any): Coroutine of the request.
+        profile (cProfile.Profile): Deterministic profile of the request.
+        samples (Counter): Collapsed stacks sampled while the request was in progress.
+    """
+
+    def __init__(self, coroutine: Any) -> None:
+        self.coroutine = coroutine
+        self.thread_id = threading.get_ident()
+        self.profile = cProfile.Profile()
+        self.samples: Counter = Counter()
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        value, error = None, None
+        while True:
+            self.profile.enable()
+            try:
+                if error is None:
+                    yielded = self.coroutine.send(value)
+                else:
+                    yielded = self.coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profile.disable()
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coroutine.close()
+                raise
+            except BaseException as exception:  # Cancellations reach the request
+                value, error = None, exception
+
+    def sample(self, frames: Dict[int, FrameType]) -> None:
+        """
+        Record the current stack of the request.
+
+        Args:
+            frames (Dict[int, FrameType]): Current frame of every thread.
+        """
+        stack = async_stack(self.coroutine, frames.get(self.thread_id))
+        if stack:
+            self.samples[";".join(stack)] += 1
+
+
+class StackSampler:
+    """
+    Background thread that samples the stacks of the profiled requests, idle while there is none.
+
+    Attributes:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._active: Dict[int, ProfiledRequest] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, request: ProfiledRequest) -> None:
+        """
+        Start sampling a request.
+
+        Args:
+            request (ProfiledRequest): The profiled request.
+        """
+        with self._lock:
+            self._active[id(request)] = request
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="mongochef-profiler", daemon=True
+                )
+                self._thread.start()
+            self._wakeup.set()
+
+    def unregister(self, request: ProfiledRequest) -> None:
+        """
+        Stop sampling a request, its samples are complete when this returns.
+
+        Args:
+            request (ProfiledRequest): The profiled request.
+        """
+        with self._lock:
+            self._active.pop(id(request), None)
+
+    def _run(self) -> None:
+        """
+        Sample the registered requests every interval, waiting while there is none.
+        """
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._wakeup.clear()
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                frames = sys._current_frames()
+                for request in self._active.values():
+                    request.sample(frames)
+                del frames  # Frames keep their locals alive
+
+
+class ProfileStore:
+    """
+    Profiles of the requests aggregated per route.
+
+    Attributes:
+        max_stacks (int): Distinct stacks kept per route.
+    """
+
+    def __init__(self, max_stacks: int) -> None:
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._requests: Counter = Counter()
+        self._wall_time: Dict[str, float] = defaultdict(float)
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._stacks: Dict[str, Counter] = defaultdict(Counter)
+
+    def add(self, route: str, request: ProfiledRequest, wall_time: float) -> None:
+        """
+        Merge the profile of a finished request into its route.
+
+        Args:
+            route (str): Method and route template of the request.
+            request (ProfiledRequest): The finished request.
+            wall_time (float): Seconds the request took.
+        """
+        request.profile.create_stats()
+        with self._lock:
+            self._requests[route] += 1
+            self._wall_time[route] += wall_time
+            if request.profile.stats:
+                if route in self._stats:
+                    self._stats[route].add(request.profile)
+                else:
+                    self._stats[route] = pstats.Stats(request.profile)
+            stacks = self._stacks[route]
+            for stack, count in request.samples.items():
+                if stack not in stacks and len(stacks) >= self.max_stacks:
+                    stack = TRUNCATED_STACK
+                stacks[stack] += count
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Get the profiled routes.
+
+        Returns:
+            List[Dict[str, Any]]: Requests, wall and CPU seconds and stack samples per route, slowest first.
+        """
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    "requests": requests,
+                    "wall_seconds": round(self._wall_time[route], 6),
+                    "cpu_seconds": round(
+                        getattr(self._stats.get(route), "total_tt", 0.0), 6
+                    ),
+                    "samples": sum(self._stacks[route].values()),
+                }
+                for route, requests in self._requests.items()
+            ]
+        return sorted(routes, key=lambda route: route["wall_seconds"], reverse=True)
+
+    def collapsed(self, route: str | None = None) -> str | None:
+        """
+        Export the sampled stacks in the collapsed format read by flamegraph.pl and speedscope.
+
+        Args:
+            route (str | None): Route to export, every route under its own root frame if None.
+
+        Returns:
+            str | None: One "frame;frame;frame count" line per stack, None if the route has no samples.
+        """
+        with self._lock:
+            if route is not None:
+                stacks = self._stacks.get(route)
+                lines = [f"{stack} {count}" for stack, count in (stacks or {}).items()]
+            else:
+                lines = [
+                    f"{name};{stack} {count}"
+                    for name, stacks in self._stacks.items()
+                    for stack, count in stacks.items()
+                ]
+        return "\n".join(lines) + "\n" if lines else None
+
+    def pstats_dump(self, route: str | None = None) -> bytes | None:
+        """
+        Export the deterministic profile in the file format of pstats, snakeviz and gprof2dot.
+
+        Args:
+            route (str | None): Route to export, every route merged if None.
+
+        Returns:
+            bytes | None: The marshalled statistics, None if the route has no profile.
+        """
+        with self._lock:
+            selected = [
+                stats
+                for name, stats in self._stats.items()
+                if route is None or name == route
+            ]
+            if not selected:
+                return None
+            merged = pstats.Stats()
+            merged.add(*selected)
+        return marshal.dumps(merged.stats)
+
+    def clear(self) -> int:
+        """
+        Remove every profile.
+
+        Returns:
+            int: Number of routes removed.
+        """
+        with self._lock:
+            routes = len(self._requests)
+            self._requests.clear()
+            self._wall_time.clear()
+            self._stats.clear()
+            self._stacks.clear()
+        return routes
+
+
+# Sampler and profiles of the worker
+stack_sampler = StackSampler(PROFILE_INTERVAL)
+profile_store = ProfileStore(MAX_STACKS_PER_ROUTE)
+
+
+def should_profile(scope: Scope) -> bool:
+    """
+    Decide if a request is profiled, by the sample rate or by the X-Profile header of an admin request.
+
+    Args:
+        scope (Scope): ASGI scope of the request.
+
+    Returns:
+        bool: True if the request is profiled.
+    """
+    if scope["path"].startswith(EXCLUDED_PREFIXES):
+        return False
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return True
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.strip() == b"1" and is_admin(Request(scope))
+    return False
+
+
+class RequestProfiler:
+    """
+    ASGI middleware that profiles the selected requests from routing to the last byte of the response.
+
+    It is a plain ASGI middleware installed innermost so the route handler runs in the task it profiles.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        context = current_request.get()
+        if context is not None:
+            context.profiled = True
+        request = ProfiledRequest(self.app(scope, receive, send))
+        stack_sampler.register(request)
+        start = time.perf_counter()
+        try:
+            await request
+        finally:
+            stack_sampler.unregister(request)
+            # The router sets the matched route in the scope
+            path = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            profile_store.add(
+                f"{scope['method']} {path}", request, time.perf_counter() - start
+            )
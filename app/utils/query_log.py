@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set, Tuple
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import monitoring
+from utils.request_context import current_request
+
+# Slow query log settings
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("MONGOCHEF_SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("MONGOCHEF_SLOW_QUERY_LOG_SIZE", "500"))
+EXPLAIN_SLOW_QUERIES = os.getenv("MONGOCHEF_EXPLAIN_SLOW_QUERIES", "0") == "1"
+MAX_COMMAND_LENGTH = 2000  # Characters kept from each captured command
+
+# Commands that can be explained and the field that holds their filter
+FILTER_FIELDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+# Bulky or session fields that are not part of the captured command
+HIDDEN_FIELDS = {
+    "documents",
+    "lsid",
+    "txnNumber",
+    "$clusterTime",
+    "$db",
+    "$readPreference",
+}
+# Fields that explain does not accept inside the explained command
+EXPLAIN_EXCLUDED_FIELDS = HIDDEN_FIELDS | {
+    "readConcern",
+    "writeConcern",
+    "autocommit",
+    "startTransaction",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def shape_of(value: Any) -> Any:
+    """
+    Replace the literal values of a query with "?" keeping its field names and operators.
+
+    Args:
+        value (Any): Filter, pipeline or any part of them.
+
+    Returns:
+        Any: The query shape.
+    """
+    if isinstance(value, dict):
+        return {key: shape_of(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [shape_of(item) for item in value]
+        # Lists of literals ($in, $all...) have the same shape whatever their length
+        return shapes if any(shape != "?" for shape in shapes) else "?"
+    return "?"
+
+
+def command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    """
+    Get the collection targeted by a command.
+
+    Args:
+        command_name (str): Name of the command.
+        command (Dict[str, Any]): The command document.
+
+    Returns:
+        str: The collection name, empty for database commands.
+    """
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> str:
+    """
+    Build the normalized shape of a command, identical for every execution of the same query with other values.
+
+    Args:
+        command_name (str): Name of the command.
+        command (Dict[str, Any]): The command document.
+
+    Returns:
+        str: The query shape as "<command> <collection> <filter shape>".
+    """
+    field = FILTER_FIELDS.get(command_name)
+    query = command.get(field) if field else None
+    if command_name in ("update", "delete") and query:
+        query = [statement.get("q") for statement in query]
+    shape = json.dumps(shape_of(query), sort_keys=True) if query is not None else ""
+    return f"{command_name} {command_collection(command_name, command)} {shape}".strip()
+
+
+def plan_stages(node: Any) -> List[str]:
+    """
+    Collect the stages of the winning plans inside an explain output.
+
+    Args:
+        node (Any): Explain output or any part of it.
+
+    Returns:
+        List[str]: Stage names, rejected plans are ignored.
+    """
+    stages = []
+    if isinstance(node, dict):
+        if isinstance(node.get("stage"), str):
+            stages.append(node["stage"])
+        for key, item in node.items():
+            if key != "rejectedPlans":
+                stages.extend(plan_stages(item))
+    elif isinstance(node, list):
+        for item in node:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Command listener that records the commands slower than the threshold in a bounded ring buffer.
+
+    Attributes:
+        entries (deque): The latest slow commands, oldest first.
+        plans (Dict[str, Dict[str, Any]]): Explain summary per query shape.
+    """
+
+    def __init__(self) -> None:
+        self.entries: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self.plans: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[Tuple[Any, int], Tuple[Dict[str, Any], str]] = {}
+        self._explained: Set[str] = set()
+        self._lock = threading.Lock()
+        self._database: AsyncIOMotorDatabase | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def attach(self, database: AsyncIOMotorDatabase) -> None:
+        """
+        Give the listener the database and event loop used to run the explain commands.
+
+        Args:
+            database (AsyncIOMotorDatabase): The application database.
+        """
+        self._database = database
+        self._loop = asyncio.get_running_loop()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        request = current_request.get()
+        route = request.route if request else ""
+        self._pending[(event.connection_id, event.request_id)] = (event.command, route)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+    def _finish(
+        self, event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent
+    ) -> None:
+        """
+        Record the command of a finished event if it was slower than the threshold.
+
+        Args:
+            event (CommandSucceededEvent | CommandFailedEvent): The finished command event.
+        """
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        command, route = pending
+        shape = query_shape(event.command_name, command)
+        captured = {
+            key: value for key, value in command.items() if key not in HIDDEN_FIELDS
+        }
+        self.entries.append(
+            {
+                "time": datetime.now(timezone.utc).isoformat(),
+                "command": event.command_name,
+                "collection": command_collection(event.command_name, command),
+                "shape": shape,
+                "duration_ms": round(duration_ms, 3),
+                "route": route,
+                "query": json_util.dumps(captured)[:MAX_COMMAND_LENGTH],
+                "failed": isinstance(event, monitoring.CommandFailedEvent),
+            }
+        )
+
+        if EXPLAIN_SLOW_QUERIES and event.command_name in FILTER_FIELDS:
+            with self._lock:
+                if shape in self._explained:
+                    return
+                self._explained.add(shape)
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(
+                    self._explain(shape, command), self._loop
+                )
+
+    async def _explain(self, shape: str, command: Dict[str, Any]) -> None:
+        """
+        Explain a query shape once and flag its plan when it scans the whole collection.
+
+        Args:
+            shape (str): The query shape.
+            command (Dict[str, Any]): A command with that shape.
+        """
+        explained = {
+            key: value
+            for key, value in command.items()
+            if key not in EXPLAIN_EXCLUDED_FIELDS
+        }
+        try:
+            output = await self._database.command(
+                {"explain": explained, "verbosity": "queryPlanner"}
+            )
+        except Exception as error:
+            self.plans[shape] = {"error": str(error)}
+            return
+
+        stages = plan_stages(output)
+        self.plans[shape] = {"stages": stages, "collscan": "COLLSCAN" in stages}
+        if "COLLSCAN" in stages:
+            logger.warning("Slow query without index (COLLSCAN): %s", shape)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Get the recorded slow commands with the explain summary of their shape.
+
+        Returns:
+            List[Dict[str, Any]]: Slow commands, newest first.
+        """
+        return [
+            {**entry, "plan": self.plans.get(entry["shape"])}
+            for entry in reversed(list(self.entries))
+        ]
+
+
+# Listener registered on the Motor client
+slow_query_listener = SlowQueryListener()
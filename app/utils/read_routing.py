@@ -0,0 +1,204 @@
+import base64
+import os
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Tuple
+import bson
+from beanie import Document
+from bson.errors import InvalidBSON
+from bson.timestamp import Timestamp
+from fastapi import HTTPException, Request, Response
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo import monitoring
+from pymongo.read_preferences import SecondaryPreferred, _ServerMode
+from utils.request_context import current_request
+
+# Read routing settings, MongoDB rejects a maximum staleness below 90 seconds
+SECONDARY_READS = os.getenv("MONGOCHEF_SECONDARY_READS", "1") == "1"
+MAX_STALENESS_SECONDS = max(90, int(os.getenv("MONGOCHEF_MAX_STALENESS", "90")))
+SECONDARY_READ_PREFERENCE = SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS)
+
+# Header with the time of the last write of a client, sent back to read it from a secondary
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+
+# Read preference and causally consistent session of the current request, None reads from the primary
+read_preference: ContextVar[_ServerMode | None] = ContextVar(
+    "read_preference", default=None
+)
+read_session: ContextVar[AsyncIOMotorClientSession | None] = ContextVar(
+    "read_session", default=None
+)
+
+# Collections with the secondary read preference, by the collection they derive from
+_routed_collections: Dict[
+    int, Tuple[AsyncIOMotorCollection, AsyncIOMotorCollection]
+] = {}
+
+
+class ReadRoutedDocument(Document):
+    """
+    Base document whose queries follow the read preference and session of the current request.
+
+    Every Beanie query and the direct uses of get_motor_collection() go through the overridden methods, and writes always go to the primary whatever the read preference.
+    """
+
+    @classmethod
+    def get_motor_collection(cls) -> AsyncIOMotorCollection:
+        collection = super().get_motor_collection()
+        if read_preference.get() is None:
+            return collection
+        cached = _routed_collections.get(id(collection))
+        if cached is None or cached[0] is not collection:
+            cached = (
+                collection,
+                collection.with_options(read_preference=SECONDARY_READ_PREFERENCE),
+            )
+            _routed_collections[id(collection)] = cached
+        return cached[1]
+
+    @classmethod
+    def find_one(cls, *args: Any, session: Any = None, **kwargs: Any) -> Any:
+        return super().find_one(
+            *args,
+            session=session if session is not None else read_session.get(),
+            **kwargs,
+        )
+
+    @classmethod
+    def find_many(cls, *args: Any, session: Any = None, **kwargs: Any) -> Any:
+        return super().find_many(
+            *args,
+            session=session if session is not None else read_session.get(),
+            **kwargs,
+        )
+
+
+def encode_causal_token(operation_time: Timestamp, cluster_time: Dict[str, Any]) -> str:
+    """
+    Encode the time of a write for the X-Causal-Token header.
+
+    Args:
+        operation_time (Timestamp): Operation time of the write.
+        cluster_time (Dict[str, Any]): Signed cluster time of the reply, needed to send a later time to the other members.
+
+    Returns:
+        str: URL-safe base64 of the BSON times.
+    """
+    encoded = bson.encode(
+        {"operationTime": operation_time, "$clusterTime": cluster_time}
+    )
+    return base64.urlsafe_b64encode(encoded).rstrip(b"=").decode()
+
+
+def decode_causal_token(token: str) -> Tuple[Timestamp, Dict[str, Any]]:
+    """
+    Decode an X-Causal-Token header.
+
+    Args:
+        token (str): The header sent by the client.
+
+    Raises:
+        HTTPException: If the token is malformed, a 400 Bad Request error is raised.
+
+    Returns:
+        Tuple[Timestamp, Dict[str, Any]]: The operation time and cluster time of the write.
+    """
+    try:
+        times = bson.decode(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, InvalidBSON):
+        times = {}
+    operation_time = times.get("operationTime")
+    cluster_time = times.get("$clusterTime")
+    if not (
+        isinstance(operation_time, Timestamp)
+        and isinstance(cluster_time, dict)
+        and isinstance(cluster_time.get("clusterTime"), Timestamp)
+    ):
+        raise HTTPException(status_code=400, detail=f"Invalid {CAUSAL_TOKEN_HEADER}")
+    return operation_time, cluster_time
+
+
+class CausalTokenListener(monitoring.CommandListener):
+    """
+    Command listener that keeps the time of the latest write of each request, from the replies of the replica set.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        if event.command_name not in WRITE_COMMANDS:
+            return
+        request = current_request.get()
+        operation_time = event.reply.get("operationTime")
+        cluster_time = event.reply.get("$clusterTime")
+        # Standalone servers answer without times, there is nothing to be consistent with
+        if request is not None and operation_time is not None and cluster_time:
+            request.record_write(operation_time, cluster_time)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+# Listener registered on the Motor client
+causal_token_listener = CausalTokenListener()
+
+
+async def causal_tokens(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    HTTP middleware that returns the time of the writes of a request in the X-Causal-Token header.
+
+    Args:
+        request (Request): The incoming request.
+        call_next (Callable[[Request], Awaitable[Response]]): The next handler in the chain.
+
+    Returns:
+        Response: The route response, with the token when the request wrote to a replica set.
+    """
+    response = await call_next(request)
+    context = current_request.get()
+    if context is not None and context.write_time is not None:
+        response.headers[CAUSAL_TOKEN_HEADER] = encode_causal_token(
+            context.write_time, context.cluster_time
+        )
+    return response
+
+
+async def secondary_reads(request: Request) -> AsyncGenerator[None, None]:
+    """
+    Dependency of the list, search, count and stats routes that read from a secondary within the maximum staleness.
+
+    A request with the X-Causal-Token of a previous write reads in a causally consistent session, so the secondary waits until it has that write.
+
+    Args:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: If the X-Causal-Token header is malformed, a 400 Bad Request error is raised.
+
+    Yields:
+        None: The read preference and session stay set until the response is sent.
+    """
+    if not SECONDARY_READS:
+        yield
+        return
+
+    read_preference.set(SECONDARY_READ_PREFERENCE)
+    token = request.headers.get(CAUSAL_TOKEN_HEADER)
+    if token is None:
+        yield
+        return
+
+    operation_time, cluster_time = decode_causal_token(token)
+    session = await request.app.state.mongo_client.start_session(
+        causal_consistency=True
+    )
+    session.advance_cluster_time(cluster_time)
+    session.advance_operation_time(operation_time)
+    read_session.set(session)
+    try:
+        yield
+    finally:
+        await session.end_session()
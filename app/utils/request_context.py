@@ -0,0 +1,114 @@
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict
+from bson.timestamp import Timestamp
+from fastapi import Request, Response
+
+
+class RequestContext:
+    """
+    Information about the request being served, shared with code that has no access to the Request object.
+
+    Attributes:
+        method (str): HTTP method of the request.
+        path (str): Raw path of the request.
+        accept (str): Accept header of the request.
+        if_none_match (str | None): If-None-Match header of the request.
+        db_roundtrips (int): MongoDB commands sent while serving the request.
+        db_time_ms (float): Total duration of those commands in milliseconds.
+        shape_counts (Counter): Commands sent per query shape.
+        profiled (bool): Whether the request is being profiled.
+        write_time (Timestamp | None): Operation time of the latest write of the request on a replica set.
+        cluster_time (Dict[str, Any] | None): Signed cluster time of that write.
+    """
+
+    def __init__(self, request: Request) -> None:
+        self.method = request.method
+        self.path = request.url.path
+        self.accept = request.headers.get("accept", "")
+        self.if_none_match = request.headers.get("if-none-match")
+        self._scope = request.scope
+        self.db_roundtrips = 0
+        self.db_time_ms = 0.0
+        self.shape_counts: Counter = Counter()
+        self.profiled = False
+        self.write_time: Timestamp | None = None
+        self.cluster_time: Dict[str, Any] | None = None
+        # Commands of the same request can finish in different Motor executor threads
+        self._lock = threading.Lock()
+
+    def record_command(self, shape: str) -> int:
+        """
+        Count a MongoDB command sent for the request.
+
+        Args:
+            shape (str): Query shape of the command.
+
+        Returns:
+            int: Number of commands with that shape sent for the request so far.
+        """
+        with self._lock:
+            self.db_roundtrips += 1
+            self.shape_counts[shape] += 1
+            return self.shape_counts[shape]
+
+    def record_duration(self, duration_ms: float) -> None:
+        """
+        Add the duration of a finished MongoDB command to the request.
+
+        Args:
+            duration_ms (float): Duration of the command in milliseconds.
+        """
+        with self._lock:
+            self.db_time_ms += duration_ms
+
+    def record_write(
+        self, operation_time: Timestamp, cluster_time: Dict[str, Any]
+    ) -> None:
+        """
+        Keep the time of a write of the request if it is the latest one.
+
+        Args:
+            operation_time (Timestamp): Operation time of the write.
+            cluster_time (Dict[str, Any]): Signed cluster time of the reply.
+        """
+        with self._lock:
+            if self.write_time is None or operation_time > self.write_time:
+                self.write_time = operation_time
+                self.cluster_time = cluster_time
+
+    @property
+    def route(self) -> str:
+        """
+        Route template that matched the request, or the raw path before routing.
+        """
+        route = self._scope.get("route")
+        path = getattr(route, "path", self.path)
+        return f"{self.method} {path}"
+
+
+# Context of the current request, None outside of a request
+current_request: ContextVar[RequestContext | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+async def request_context(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    HTTP middleware that publishes the RequestContext of every request.
+
+    Args:
+        request (Request): The incoming request.
+        call_next (Callable[[Request], Awaitable[Response]]): The next handler in the chain.
+
+    Returns:
+        Response: The route response.
+    """
+    token = current_request.set(RequestContext(request))
+    try:
+        return await call_next(request)
+    finally:
+        current_request.reset(token)
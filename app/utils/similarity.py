@@ -0,0 +1,176 @@
+import hashlib
+import zlib
+import numpy as np
+from typing import List, Set, Tuple
+from beanie import PydanticObjectId
+from models.recipes_model import Recipes
+from models.recipe_signatures_model import RecipeSignatures
+from utils.read_routing import read_session
+
+# MinHash / LSH settings
+NUM_PERMUTATIONS = 128  # Length of each MinHash signature
+BANDS = 32  # LSH bands, each one with NUM_PERMUTATIONS // BANDS rows
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+MAX_CANDIDATES = 2000  # Bucket candidates scored per query, most shared bands first
+INCLUDE_KITCHEN_TOOLS = False  # Add the kitchen tools to the recipe token set
+MERSENNE_PRIME = (1 << 31) - 1  # Keeps a * x + b inside uint64 without overflow
+
+# Fixed seed so the persisted signatures stay comparable between restarts
+_generator = np.random.default_rng(seed=214)
+_A = _generator.integers(1, MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _generator.integers(0, MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def recipe_tokens(recipe: Recipes) -> Set[str]:
+    """
+    Build the token set of a recipe from its ingredient ids and, optionally, its kitchen tool ids.
+
+    Args:
+        recipe (Recipes): The recipe object.
+
+    Returns:
+        Set[str]: The set of tokens used to compute the signature.
+    """
+    tokens = {f"i:{detail.ingredient_object.id}" for detail in recipe.ingredients}
+    if INCLUDE_KITCHEN_TOOLS:
+        tokens.update(f"t:{tool.id}" for tool in recipe.kitchen_tools)
+    return tokens
+
+
+def minhash_signature(tokens: Set[str]) -> np.ndarray:
+    """
+    Compute the MinHash signature of a token set, applying every permutation at once with NumPy.
+
+    Args:
+        tokens (Set[str]): Tokens of the recipe, must not be empty.
+
+    Returns:
+        np.ndarray: Signature with NUM_PERMUTATIONS values.
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode()) for token in tokens),
+        dtype=np.uint64,
+        count=len(tokens),
+    ) % np.uint64(MERSENNE_PRIME)
+    # (tokens x permutations) matrix of universal hashes, minimum per permutation
+    permuted = (np.outer(hashes, _A) + _B) % np.uint64(MERSENNE_PRIME)
+    return permuted.min(axis=0)
+
+
+def lsh_buckets(signature: np.ndarray) -> List[str]:
+    """
+    Split a signature into bands and hash each band into a bucket key.
+
+    Args:
+        signature (np.ndarray): MinHash signature.
+
+    Returns:
+        List[str]: One bucket key per band.
+    """
+    bands = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        f"{band}:{hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()}"
+        for band, rows in enumerate(bands)
+    ]
+
+
+async def index_recipe(recipe: Recipes) -> None:
+    """
+    Insert or refresh the signature of a recipe in the similarity index.
+
+    Args:
+        recipe (Recipes): The created or updated recipe object.
+    """
+    tokens = recipe_tokens(recipe)
+    if not tokens:
+        await remove_recipe(recipe.id)
+        return
+
+    signature = minhash_signature(tokens)
+    entry = RecipeSignatures(
+        recipe_id=recipe.id,
+        title=recipe.title,
+        signature=signature.tolist(),
+        buckets=lsh_buckets(signature),
+    )
+    await RecipeSignatures.find_one(RecipeSignatures.recipe_id == recipe.id).upsert(
+        {
+            "$set": {
+                "title": entry.title,
+                "signature": entry.signature,
+                "buckets": entry.buckets,
+            }
+        },
+        on_insert=entry,
+    )
+
+
+async def remove_recipe(recipe_id: PydanticObjectId) -> None:
+    """
+    Remove the signature of a recipe from the similarity index.
+
+    Args:
+        recipe_id (PydanticObjectId): Id of the deleted recipe.
+    """
+    await RecipeSignatures.find(RecipeSignatures.recipe_id == recipe_id).delete()
+
+
+async def similar_recipes(recipe: Recipes, k: int) -> List[Tuple[str, float]]:
+    """
+    Get the approximate top-k recipes with the most similar ingredient sets.
+
+    Args:
+        recipe (Recipes): The reference recipe.
+        k (int): Number of neighbours to return.
+
+    Returns:
+        List[Tuple[str, float]]: Titles with their estimated Jaccard similarity, best first.
+    """
+    tokens = recipe_tokens(recipe)
+    if not tokens:
+        return []
+
+    signature = minhash_signature(tokens)
+    buckets = lsh_buckets(signature)
+    # Candidates sharing more bands are closer, the limit keeps those instead of an arbitrary subset
+    pipeline = [
+        {"$match": {"buckets": {"$in": buckets}, "recipe_id": {"$ne": recipe.id}}},
+        {
+            "$project": {
+                "title": 1,
+                "signature": 1,
+                "shared": {"$size": {"$setIntersection": ["$buckets", buckets]}},
+            }
+        },
+        {"$sort": {"shared": -1, "_id": 1}},
+        {"$limit": MAX_CANDIDATES},
+    ]
+    cursor = RecipeSignatures.get_motor_collection().aggregate(
+        pipeline, session=read_session.get()
+    )
+    candidates = await cursor.to_list(None)
+    if not candidates:
+        return []
+
+    # Share of equal signature positions estimates the Jaccard similarity
+    matrix = np.array(
+        [candidate["signature"] for candidate in candidates], dtype=np.uint64
+    )
+    scores = (matrix == signature).mean(axis=1)
+    best = np.argsort(-scores, kind="stable")[:k]
+    return [(candidates[i]["title"], float(scores[i])) for i in best]
+
+
+async def rebuild_index() -> int:
+    """
+    Rebuild the similarity index from every recipe in the database.
+
+    Returns:
+        int: Number of recipes indexed.
+    """
+    await RecipeSignatures.delete_all()
+    indexed = 0
+    async for recipe in Recipes.find_all():
+        await index_recipe(recipe)
+        indexed += 1
+    return indexed
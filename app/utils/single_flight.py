@@ -0,0 +1,175 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from utils.encoding import (
+    JSON_MEDIA_TYPE,
+    SerializedContent,
+    etag_matches,
+    negotiate_media_type,
+)
+from utils.normalize import normalized_string
+from utils.read_routing import read_session
+from utils.request_context import current_request
+
+
+class SingleFlight:
+    """
+    Share one in-flight execution between concurrent calls with the same key.
+
+    Attributes:
+        calls (int): Calls received.
+        executions (int): Calls that actually ran the function.
+        coalesced (int): Calls that waited on an execution started by another call.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run the function or join the execution already in flight for the same key.
+
+        Args:
+            key (Hashable): Identity of the call.
+            function (Callable[[], Awaitable[Any]]): Coroutine function to run.
+
+        Returns:
+            Any: The result shared by every caller of the flight.
+        """
+        self.calls += 1
+        request = current_request.get()
+        if (request is not None and request.profiled) or read_session.get() is not None:
+            # A profiled request runs its own execution so the work shows in its profile, and
+            # a request after a write of its client cannot share a read that missed that write
+            self.executions += 1
+            return await function()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            self.executions += 1
+            # The flight runs in its own task so a cancelled caller does not cancel the others
+            flight = asyncio.ensure_future(function())
+            self._flights[key] = flight
+            flight.add_done_callback(functools.partial(self._finish, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: Hashable, flight: asyncio.Task) -> None:
+        """
+        Forget a finished flight so the next call runs a fresh execution.
+
+        Args:
+            key (Hashable): Identity of the call.
+            flight (asyncio.Task): The finished flight.
+        """
+        self._flights.pop(key, None)
+        if not flight.cancelled():
+            flight.exception()  # Mark the error as retrieved when every caller went away
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the single-flight layer.
+
+        Returns:
+            Dict[str, int]: Calls, executions, coalesced calls and flights in progress.
+        """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
+
+
+# Single-flight layer shared by the read handlers of the worker
+read_flights = SingleFlight()
+
+
+def _key_value(value: Any, normalize: Callable[[str], str]) -> Hashable:
+    """
+    Convert a handler argument into a hashable part of the flight key.
+
+    Args:
+        value (Any): Value of the handler argument.
+        normalize (Callable[[str], str]): Normalization applied to string arguments.
+
+    Returns:
+        Hashable: The normalized value.
+    """
+    if isinstance(value, Response):
+        return None  # The response injected by FastAPI is different for every request
+    if isinstance(value, str):
+        return normalize(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return value
+
+
+def coalesced(normalize: Callable[[str], str] = normalized_string) -> Callable:
+    """
+    Decorator for read handlers that coalesces concurrent identical requests into one query and one serialized body.
+    The body is sent as JSON or MessagePack following the Accept header of each request, with an ETag that
+    answers a matching If-None-Match with 304 Not Modified. Headers set by the handler on an injected
+    `response: Response` parameter are sent to every coalesced caller.
+
+    Args:
+        normalize (Callable[[str], str]): Normalization applied to string parameters to build the key.
+
+    Returns:
+        Callable: The decorator for the route handler.
+    """
+
+    def decorator(
+        handler: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Response]]:
+        async def render(kwargs: Dict[str, Any]) -> SerializedContent:
+            content = jsonable_encoder(await handler(**kwargs))
+            response = kwargs.get("response")
+            headers = (
+                {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name != "content-length"
+                }
+                if isinstance(response, Response)
+                else {}
+            )
+            return SerializedContent(content, headers)
+
+        @functools.wraps(handler)
+        async def wrapper(**kwargs: Any) -> Response:
+            key = (
+                handler.__module__,
+                handler.__name__,
+                tuple(
+                    sorted(
+                        (name, _key_value(value, normalize))
+                        for name, value in kwargs.items()
+                    )
+                ),
+            )
+            content = await read_flights.do(key, lambda: render(kwargs))
+            request = current_request.get()
+            media_type = (
+                negotiate_media_type(request.accept) if request else JSON_MEDIA_TYPE
+            )
+            etag = content.etag(media_type)
+            headers = {**content.headers, "ETag": etag, "Vary": "Accept"}
+            if request and etag_matches(request.if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            return Response(
+                content=content.body(media_type),
+                media_type=media_type,
+                headers=headers,
+            )
+
+        return wrapper
+
+    return decorator
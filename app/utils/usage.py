@@ -0,0 +1,181 @@
+from typing import Dict, List, Set
+from beanie import Document
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateMany, UpdateOne
+from models.categories_model import Categories
+from models.ingredients_model import Ingredients
+from models.kitchen_tools_model import KitchenTools
+from models.recipes_model import Recipes
+
+# Aggregations over Recipes that count how many recipes reference each catalog entry
+USAGE_PIPELINES = {
+    Ingredients: [
+        {"$project": {"ids": {"$setUnion": ["$ingredients.ingredient_object.id", []]}}},
+        {"$unwind": "$ids"},
+        {"$group": {"_id": {"$toObjectId": "$ids"}, "count": {"$sum": 1}}},
+    ],
+    KitchenTools: [
+        {"$project": {"ids": {"$setUnion": ["$kitchen_tools.id", []]}}},
+        {"$unwind": "$ids"},
+        {"$group": {"_id": {"$toObjectId": "$ids"}, "count": {"$sum": 1}}},
+    ],
+    Categories: [
+        {"$group": {"_id": {"$toObjectId": "$category.id"}, "count": {"$sum": 1}}},
+    ],
+}
+
+
+def recipe_references(recipe: Recipes | None) -> Dict[type, Set[str]]:
+    """
+    Get the ids of the catalog entries referenced by a recipe.
+
+    Args:
+        recipe (Recipes | None): The recipe object, None for a recipe that does not exist.
+
+    Returns:
+        Dict[type, Set[str]]: Referenced ids per catalog model.
+    """
+    if recipe is None:
+        return {Ingredients: set(), KitchenTools: set(), Categories: set()}
+    return {
+        Ingredients: {
+            str(detail.ingredient_object.id) for detail in recipe.ingredients
+        },
+        KitchenTools: {str(tool.id) for tool in recipe.kitchen_tools},
+        Categories: {str(recipe.category.id)},
+    }
+
+
+def added_references(
+    previous: Recipes | None, current: Recipes | None
+) -> Dict[type, List[ObjectId]]:
+    """
+    Get the catalog entries referenced by a recipe after a write and not before it.
+
+    Args:
+        previous (Recipes | None): The recipe before the write, None when it is created.
+        current (Recipes | None): The recipe after the write, None when it is deleted.
+
+    Returns:
+        Dict[type, List[ObjectId]]: Added ids per catalog model.
+    """
+    previous_references = recipe_references(previous)
+    return {
+        model: [ObjectId(entry_id) for entry_id in ids - previous_references[model]]
+        for model, ids in recipe_references(current).items()
+    }
+
+
+async def acquire_references(previous: Recipes | None, current: Recipes | None) -> None:
+    """
+    Increment the usage_count of the catalog entries a recipe write starts to reference, before the write.
+
+    An entry in use can not be deleted, so a concurrent delete either sees the new count or runs first and makes the increment miss the entry.
+
+    Args:
+        previous (Recipes | None): The recipe before the write, None when it is created.
+        current (Recipes | None): The recipe after the write.
+
+    Raises:
+        HTTPException: If a referenced entry was deleted after it was looked up, the increments are undone and a 409 Conflict error is raised.
+    """
+    acquired = []
+    for model, entry_ids in added_references(previous, current).items():
+        if not entry_ids:
+            continue
+        collection = model.get_motor_collection()
+        result = await collection.update_many(
+            {"_id": {"$in": entry_ids}}, {"$inc": {"usage_count": 1}}
+        )
+        acquired.append((collection, entry_ids))
+        if result.matched_count < len(entry_ids):
+            # The entries that matched are in use, none of them was deleted since
+            for acquired_collection, acquired_ids in acquired:
+                await acquired_collection.update_many(
+                    {"_id": {"$in": acquired_ids}}, {"$inc": {"usage_count": -1}}
+                )
+            raise HTTPException(
+                status_code=409,
+                detail="An ingredient, kitchen tool or category of the recipe was deleted, try again",
+            )
+
+
+async def release_references(previous: Recipes | None, current: Recipes | None) -> None:
+    """
+    Decrement the usage_count of the catalog entries a recipe write stopped referencing, after the write.
+
+    It also undoes acquire_references(previous, current) when the write failed, called as release_references(current, previous).
+
+    Args:
+        previous (Recipes | None): The recipe before the write.
+        current (Recipes | None): The recipe after the write, None when it is deleted.
+    """
+    for model, entry_ids in added_references(current, previous).items():
+        if entry_ids:
+            await model.get_motor_collection().update_many(
+                {"_id": {"$in": entry_ids}}, {"$inc": {"usage_count": -1}}
+            )
+
+
+async def reconcile_usage_counts() -> Dict[str, int]:
+    """
+    Rebuild the usage_count of every catalog entry from an aggregation over Recipes.
+
+    Returns:
+        Dict[str, int]: Number of catalog entries in use per collection.
+    """
+    summary = {}
+    for model, pipeline in USAGE_PIPELINES.items():
+        counts = await Recipes.aggregate(pipeline).to_list()
+        used_ids: List[ObjectId] = [count["_id"] for count in counts]
+
+        operations = [
+            UpdateOne({"_id": count["_id"]}, {"$set": {"usage_count": count["count"]}})
+            for count in counts
+        ]
+        # Entries that are no longer referenced go back to zero
+        operations.append(
+            UpdateMany(
+                {"_id": {"$nin": used_ids}, "usage_count": {"$ne": 0}},
+                {"$set": {"usage_count": 0}},
+            )
+        )
+        await model.get_motor_collection().bulk_write(operations, ordered=False)
+        summary[model.get_collection_name()] = len(used_ids)
+    return summary
+
+
+async def delete_unused(entry: Document, label: str) -> None:
+    """
+    Delete a catalog entry only if no recipe uses it, checked and deleted in one atomic write.
+
+    Recipe writes increment the usage_count before they reference an entry, and entries whose usage was never counted are kept until reconcile-usage runs.
+
+    Args:
+        entry (Document): The ingredient, kitchen tool or category to delete.
+        label (str): Name of the entry type in the error messages.
+
+    Raises:
+        HTTPException: If the entry no longer exists, a 404 Not Found error is raised.
+        HTTPException: If a recipe uses the entry or its usage is not counted, a 409 Conflict error is raised.
+    """
+    collection = type(entry).get_motor_collection()
+    result = await collection.delete_one(
+        {"_id": entry.id, "usage_count": {"$exists": True, "$lte": 0}}
+    )
+    if result.deleted_count == 1:
+        return
+
+    current = await collection.find_one({"_id": entry.id}, {"usage_count": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    if "usage_count" not in current:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{label} usage is not counted yet, run reconcile-usage",
+        )
+    raise HTTPException(
+        status_code=409,
+        detail=f"{label} is used by {current['usage_count']} recipes",
+    )
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncGenerator, Dict, Set
+from pymongo import UpdateOne
+from models.recipes_model import Recipes
+from utils.normalize import NAME_COLLATION, normalized_string
+
+# View counter settings
+VIEW_FLUSH_SECONDS = float(os.getenv("MONGOCHEF_VIEW_FLUSH_SECONDS", "10"))
+VIEW_COUNTER_SIZE = int(os.getenv("MONGOCHEF_VIEW_COUNTER_SIZE", "10000"))
+# Hours for a view to weigh half as much in the trending score, a week of views keeps most of its weight
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("MONGOCHEF_TRENDING_HALF_LIFE", "72"))
+# Origin of the forward decay (ISO date), the weights double every half-life after it and stay below the
+# double limit for about 1000 half-lives: move it forward and multiply the stored scores by the same factor
+TRENDING_EPOCH = datetime.fromisoformat(
+    os.getenv("MONGOCHEF_TRENDING_EPOCH", "2025-01-01T00:00:00+00:00")
+).timestamp()
+
+logger = logging.getLogger(__name__)
+
+
+def view_weight(timestamp: float) -> float:
+    """
+    Weight of a view in the trending score with forward decay.
+
+    Adding the weight of every view at its time keeps the scores ordered as if all of them decayed continuously, so the stored scores never have to be rewritten.
+
+    Args:
+        timestamp (float): Unix time of the view.
+
+    Returns:
+        float: The weight, doubling every half-life.
+    """
+    hours = (timestamp - TRENDING_EPOCH) / 3600
+    return math.pow(2.0, hours / TRENDING_HALF_LIFE_HOURS)
+
+
+class SpaceSavingCounter:
+    """
+    Counts of the most viewed keys in bounded memory with the Space-Saving algorithm.
+
+    When the counter is full, a new key replaces a key with the lowest count and inherits that count as its error, so the popular keys are counted almost exactly and the long tail is dropped.
+
+    Attributes:
+        capacity (int): Maximum number of tracked keys.
+        total (int): Views recorded, tracked or not.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.total = 0
+        self.evicted = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._buckets: Dict[int, Set[str]] = defaultdict(set)
+        self._minimum = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: str, count: int = 1) -> None:
+        """
+        Record views of a key.
+
+        Args:
+            key (str): The viewed key.
+            count (int): Number of views.
+        """
+        self.total += count
+        current = self._counts.get(key)
+        if current is None:
+            error = 0
+            if len(self._counts) >= self.capacity:
+                # Replace a key with the lowest count, the new key may have been seen that many times
+                error = self._minimum
+                victim = self._buckets[error].pop()
+                del self._counts[victim]
+                del self._errors[victim]
+                self.evicted += 1
+                if not self._buckets[error]:
+                    del self._buckets[error]
+            self._errors[key] = error
+            current = error
+        else:
+            self._buckets[current].discard(key)
+            if not self._buckets[current]:
+                del self._buckets[current]
+
+        updated = current + count
+        self._counts[key] = updated
+        self._buckets[updated].add(key)
+        if len(self._counts) == 1 or updated < self._minimum:
+            self._minimum = updated
+        elif current == self._minimum and current not in self._buckets:
+            # The lowest bucket emptied, with single views the key moved to the next one
+            self._minimum = updated if count == 1 else min(self._buckets)
+
+    def guaranteed(self) -> Dict[str, int]:
+        """
+        Get the counts that are certainly reached, without the inherited errors.
+
+        Returns:
+            Dict[str, int]: Views per key, only keys with at least one certain view.
+        """
+        return {
+            key: count - self._errors[key]
+            for key, count in self._counts.items()
+            if count > self._errors[key]
+        }
+
+
+class ViewCounter:
+    """
+    Write-behind view counters: views are counted in memory per time bucket and flushed with a single bulk write.
+
+    Attributes:
+        capacity (int): Maximum number of recipes counted per bucket.
+        interval (float): Seconds between flushes.
+    """
+
+    def __init__(self, capacity: int, interval: float) -> None:
+        self.capacity = capacity
+        self.interval = interval
+        self.flushes = 0
+        self.flushed_views = 0
+        self.dropped_views = 0
+        self._bucket = SpaceSavingCounter(capacity)
+        self._bucket_start = time.time()
+        self._task: asyncio.Task | None = None
+
+    def record(self, title: str) -> None:
+        """
+        Count a view of a recipe in the current bucket.
+
+        Args:
+            title (str): The title requested by the client.
+        """
+        self._bucket.add(normalized_string(title))
+
+    async def flush(self) -> int:
+        """
+        Add the views of the current bucket to the recipes and start a new bucket.
+
+        Returns:
+            int: Number of views written.
+        """
+        bucket, start = self._bucket, self._bucket_start
+        self._bucket = SpaceSavingCounter(self.capacity)
+        self._bucket_start = time.time()
+        views = bucket.guaranteed()
+        self.dropped_views += bucket.total - sum(views.values())
+        if not views:
+            return 0
+
+        # Views of the bucket weigh as if they happened in its middle
+        weight = view_weight((start + self._bucket_start) / 2)
+        operations = [
+            UpdateOne(
+                {"title": title},
+                {"$inc": {"view_count": count, "trending_score": count * weight}},
+                collation=NAME_COLLATION,
+            )
+            for title, count in views.items()
+        ]
+        try:
+            await Recipes.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception:
+            # Keep the views for the next flush instead of losing them
+            for title, count in views.items():
+                self._bucket.add(title, count)
+            raise
+        self.flushes += 1
+        self.flushed_views += sum(views.values())
+        return sum(views.values())
+
+    def start(self) -> None:
+        """
+        Start flushing the counters periodically in a background task.
+        """
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the periodic flushes and write the views still in memory.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """
+        Flush the counters every interval until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("View counter flush failed")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the view tracking.
+
+        Returns:
+            Dict[str, int]: Recipes in the current bucket, pending, flushed and dropped views and flushes.
+        """
+        return {
+            "tracked": len(self._bucket),
+            "pending_views": self._bucket.total,
+            "flushed_views": self.flushed_views,
+            "dropped_views": self.dropped_views,
+            "evicted": self._bucket.evicted,
+            "flushes": self.flushes,
+        }
+
+
+# View counters of the worker, flushed by the lifespan of the application
+view_counter = ViewCounter(VIEW_COUNTER_SIZE, VIEW_FLUSH_SECONDS)
+
+
+async def count_view(recipes_title: str) -> AsyncGenerator[None, None]:
+    """
+    Dependency of the recipe detail endpoint that counts one view per request, coalesced requests included.
+
+    It runs on the event loop, where the counters are flushed, and counts the view once the recipe was found, so missing titles do not evict real ones.
+
+    Args:
+        recipes_title (str): The title in the path of the request.
+
+    Yields:
+        None: The view is counted if the endpoint returns without an error.
+    """
+    yield
+    view_counter.record(recipes_title)
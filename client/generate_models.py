@@ -0,0 +1,283 @@
+import argparse
+import json
+import keyword
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+import httpx
+
+# Generator settings, the schema is read from a running API unless a file is given
+DEFAULT_SOURCE = "http://127.0.0.1:8000/openapi.json"
+OUTPUT = Path(__file__).parent / "mongochef_client" / "models.py"
+REF_PREFIX = "#/components/schemas/"
+
+HEADER = '''"""
+Models of the MongoChef API, generated from its OpenAPI schema by generate_models.py.
+
+Do not edit this file, run `python client/generate_models.py` against the API instead.
+"""
+
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from pydantic import BaseModel, ConfigDict, Field
+'''
+
+# JSON schema types and string formats to Python annotations
+SIMPLE_TYPES = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "null": "None",
+}
+STRING_FORMATS = {"date-time": "datetime", "date": "date", "duration": "timedelta"}
+# JSON schema constraints to pydantic Field arguments
+CONSTRAINTS = {
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minItems": "min_length",
+    "maxItems": "max_length",
+    "minimum": "ge",
+    "maximum": "le",
+    "exclusiveMinimum": "gt",
+    "exclusiveMaximum": "lt",
+    "pattern": "pattern",
+}
+
+
+def load_schema(source: str) -> Dict[str, Any]:
+    """
+    Read the OpenAPI schema of the API.
+
+    Args:
+        source (str): URL of /openapi.json or path of a saved copy.
+
+    Returns:
+        Dict[str, Any]: The OpenAPI document.
+    """
+    if source.startswith(("http://", "https://")):
+        response = httpx.get(source, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    return json.loads(Path(source).read_text(encoding="utf-8"))
+
+
+def annotation(schema: Dict[str, Any]) -> str:
+    """
+    Python annotation of a JSON schema.
+
+    Args:
+        schema (Dict[str, Any]): Schema of a property or item.
+
+    Returns:
+        str: The annotation, Any for the schemas without a type.
+    """
+    if "$ref" in schema:
+        return schema["$ref"].removeprefix(REF_PREFIX)
+    if "anyOf" in schema:
+        members = []
+        for member in schema["anyOf"]:
+            member_annotation = annotation(member)
+            if member_annotation not in members:
+                members.append(member_annotation)
+        # None goes last, as in the hand-written annotations
+        members.sort(key=lambda member: member == "None")
+        return " | ".join(members)
+    schema_type = schema.get("type")
+    if schema_type == "array":
+        return f"List[{annotation(schema.get('items', {}))}]"
+    if schema_type == "object":
+        values = schema.get("additionalProperties", True)
+        return f"Dict[str, {annotation(values) if isinstance(values, dict) else 'Any'}]"
+    if schema_type == "string":
+        return STRING_FORMATS.get(schema.get("format"), "str")
+    return SIMPLE_TYPES.get(schema_type, "Any")
+
+
+def constraints(schema: Dict[str, Any]) -> List[str]:
+    """
+    Field arguments of the constraints of a property, taken from its only non-null member when it is nullable.
+
+    Args:
+        schema (Dict[str, Any]): Schema of the property.
+
+    Returns:
+        List[str]: The Field keyword arguments.
+    """
+    members = [
+        member for member in schema.get("anyOf", []) if member.get("type") != "null"
+    ]
+    source = members[0] if len(members) == 1 else schema
+    return [
+        f"{argument}={literal(source[name])}"
+        for name, argument in CONSTRAINTS.items()
+        if name in source
+    ]
+
+
+def literal(value: Any) -> str:
+    """
+    Python literal of a JSON value, strings with double quotes.
+
+    Args:
+        value (Any): A default or constraint from the schema.
+
+    Returns:
+        str: The source of the value.
+    """
+    return json.dumps(value) if isinstance(value, str) else repr(value)
+
+
+def field_name(name: str) -> str:
+    """
+    Python name of a property, aliases such as "_id" lose their leading underscores.
+
+    Args:
+        name (str): Name of the property in the schema.
+
+    Returns:
+        str: A valid attribute name.
+    """
+    python_name = re.sub(r"\W", "_", name).lstrip("_") or "field"
+    return f"{python_name}_" if keyword.iskeyword(python_name) else python_name
+
+
+def render_field(name: str, schema: Dict[str, Any], required: bool) -> str:
+    """
+    Render the line of a model field.
+
+    Args:
+        name (str): Name of the property in the schema.
+        schema (Dict[str, Any]): Schema of the property.
+        required (bool): Whether the property is required.
+
+    Returns:
+        str: The annotated attribute.
+    """
+    python_name = field_name(name)
+    field_annotation = annotation(schema)
+    arguments = constraints(schema)
+    if python_name != name:
+        arguments.append(f"alias={literal(name)}")
+
+    if "default" in schema:
+        arguments.insert(0, f"default={literal(schema['default'])}")
+    elif field_annotation.startswith("List[") and not required:
+        arguments.insert(0, "default_factory=list")
+    elif not required:
+        if "None" not in field_annotation.split(" | "):
+            field_annotation = f"{field_annotation} | None"
+        arguments.insert(0, "default=None")
+
+    if not arguments:
+        return f"    {python_name}: {field_annotation}"
+    if len(arguments) == 1 and arguments[0].startswith("default="):
+        return f"    {python_name}: {field_annotation} = {arguments[0][8:]}"
+    return f"    {python_name}: {field_annotation} = Field({', '.join(arguments)})"
+
+
+def render_model(name: str, schema: Dict[str, Any]) -> str:
+    """
+    Render the class of a component schema.
+
+    Args:
+        name (str): Name of the component.
+        schema (Dict[str, Any]): The component schema.
+
+    Returns:
+        str: The pydantic model.
+    """
+    lines = [f"class {name}(BaseModel):"]
+    description = schema.get("description", schema.get("title", name))
+    docstring = "\n".join(
+        f"    {line}".rstrip() for line in description.strip().splitlines()
+    )
+    lines += ['    """', docstring, '    """', ""]
+    # Unknown fields are ignored so the client keeps working with newer servers
+    lines.append('    model_config = ConfigDict(populate_by_name=True, extra="ignore")')
+
+    properties = schema.get("properties", {})
+    if properties:
+        lines.append("")
+    required = set(schema.get("required", []))
+    for property_name, property_schema in properties.items():
+        lines.append(
+            render_field(property_name, property_schema, property_name in required)
+        )
+    return "\n".join(lines)
+
+
+def references(schema: Any) -> Set[str]:
+    """
+    Components referenced anywhere inside a schema.
+
+    Args:
+        schema (Any): A schema or part of it.
+
+    Returns:
+        Set[str]: The names of the referenced components.
+    """
+    if isinstance(schema, dict):
+        found = set()
+        for key, value in schema.items():
+            if key == "$ref" and isinstance(value, str):
+                found.add(value.removeprefix(REF_PREFIX))
+            else:
+                found |= references(value)
+        return found
+    if isinstance(schema, list):
+        return set().union(*[references(item) for item in schema])
+    return set()
+
+
+def ordered(schemas: Dict[str, Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Sort the components so each model comes after the models it references.
+
+    Args:
+        schemas (Dict[str, Dict[str, Any]]): Component schemas by name.
+
+    Returns:
+        List[Tuple[str, Dict[str, Any]]]: The components, by name within each level.
+    """
+    result: List[Tuple[str, Dict[str, Any]]] = []
+    done: Set[str] = set()
+
+    def visit(name: str, path: Set[str]) -> None:
+        if name in done or name in path or name not in schemas:
+            return
+        for dependency in sorted(references(schemas[name])):
+            visit(dependency, path | {name})
+        done.add(name)
+        result.append((name, schemas[name]))
+
+    for name in sorted(schemas):
+        visit(name, set())
+    return result
+
+
+def generate(openapi: Dict[str, Any]) -> str:
+    """
+    Generate the models module of the client.
+
+    Args:
+        openapi (Dict[str, Any]): The OpenAPI document of the API.
+
+    Returns:
+        str: Source of models.py.
+    """
+    schemas = openapi.get("components", {}).get("schemas", {})
+    models = [render_model(name, schema) for name, schema in ordered(schemas)]
+    return HEADER + "\n\n" + "\n\n\n".join(models) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate the client models from the OpenAPI schema of the API."
+    )
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE)
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    args = parser.parse_args()
+    args.output.write_text(generate(load_schema(args.source)), encoding="utf-8")
+    print(f"Wrote {args.output}")
@@ -0,0 +1,12 @@
+"""
+Async client of the MongoChef API.
+"""
+
+from mongochef_client.cache import CachedResponse, ETagCache
+from mongochef_client.client import (
+    MongoChefClient,
+    MongoChefError,
+    RecipesResource,
+    Resource,
+    UsersResource,
+)
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable
+
+
+@dataclass
+class CachedResponse:
+    """
+    Body of a GET response kept with its entity tag.
+
+    Attributes:
+        etag (str): ETag header of the response.
+        data (Any): Decoded JSON body.
+        headers (Dict[str, str]): Headers needed after a 304 response, such as the next page cursor.
+    """
+
+    etag: str
+    data: Any
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ETagCache:
+    """
+    Least recently used cache of GET responses, revalidated with If-None-Match on every request.
+
+    Attributes:
+        max_entries (int): Maximum number of cached responses.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        """
+        Get a cached response.
+
+        Args:
+            key (Hashable): Path and query parameters of the request.
+
+        Returns:
+            CachedResponse | None: The cached response, None if it is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> None:
+        """
+        Store a response, evicting the least recently used one when the cache is full.
+
+        Args:
+            key (Hashable): Path and query parameters of the request.
+            entry (CachedResponse): The response to keep.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Remove a response from the cache.
+
+        Args:
+            key (Hashable): Path and query parameters of the request.
+        """
+        self._entries.pop(key, None)
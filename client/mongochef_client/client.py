@@ -0,0 +1,545 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Type,
+    TypeVar,
+)
+from urllib.parse import quote
+import httpx
+from pydantic import BaseModel
+from mongochef_client.cache import CachedResponse, ETagCache
+from mongochef_client.models import (
+    Categories,
+    CategoriesBase,
+    CountResponse,
+    Ingredients,
+    IngredientsBase,
+    KitchenTools,
+    KitchenToolsBase,
+    Recipes,
+    RecipesBase,
+    SimilarRecipe,
+    Users,
+    UsersBase,
+)
+
+# Client settings
+DEFAULT_URL = "http://127.0.0.1:8000"
+DEFAULT_PAGE_SIZE = 200
+MAX_BATCH_KEYS = 500  # Keys per request to the batch endpoints
+NEXT_CURSOR_HEADER = "x-next-cursor"
+TOTAL_COUNT_HEADER = "x-total-count"
+CAUSAL_TOKEN_HEADER = "x-causal-token"
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+def path_key(key: str) -> str:
+    """
+    Quote a name, title or email for a path segment, so slashes and question marks stay in the key.
+
+    Args:
+        key (str): The key of the document.
+
+    Returns:
+        str: The percent-encoded key.
+    """
+    return quote(key, safe="")
+
+
+class MongoChefError(Exception):
+    """
+    Error response of the API.
+
+    Attributes:
+        status_code (int): HTTP status of the response.
+        detail (Any): The detail field of the error body.
+    """
+
+    def __init__(self, status_code: int, detail: Any) -> None:
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class Resource(Generic[ModelType, SchemaType]):
+    """
+    Typed access to one collection of the API: /<prefix>/, /<prefix>/{key}, create, update and delete.
+
+    Attributes:
+        client (MongoChefClient): The client that sends the requests.
+        prefix (str): Path prefix of the router.
+        model (Type[ModelType]): Read model of the documents.
+        batch_keys (str | None): Body field of the /<prefix>/batch endpoint, None when the router has none.
+        batch_item (str | None): Field with the document in the items of the batch answer.
+    """
+
+    batch_keys: str | None = None
+    batch_item: str | None = None
+
+    def __init__(
+        self, client: "MongoChefClient", prefix: str, model: Type[ModelType]
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.model = model
+
+    async def iterate(
+        self, page_size: int = DEFAULT_PAGE_SIZE, **params: Any
+    ) -> AsyncIterator[ModelType]:
+        """
+        Iterate over the whole collection following the cursor of each page.
+
+        Args:
+            page_size (int): Documents requested per page.
+            **params (Any): Other query parameters of the list endpoint.
+
+        Yields:
+            ModelType: The documents in id order.
+        """
+        after = None
+        while True:
+            page_params = {**params, "limit": page_size}
+            if after is not None:
+                page_params["after"] = after
+            try:
+                page = await self.client.get(f"{self.prefix}/", page_params)
+            except MongoChefError as error:
+                if error.status_code == 404 and after is None:
+                    return  # Empty collection
+                raise
+            for item in page.data:
+                yield self.model.model_validate(item)
+            after = page.headers.get(NEXT_CURSOR_HEADER)
+            if after is None:
+                return
+
+    async def list(self, **params: Any) -> List[ModelType]:
+        """
+        Get every document of the collection.
+
+        Args:
+            **params (Any): Query parameters of the list endpoint.
+
+        Returns:
+            List[ModelType]: The documents.
+        """
+        return [item async for item in self.iterate(**params)]
+
+    async def count(self, exact: bool = False, **filters: Any) -> CountResponse:
+        """
+        Count the documents of the collection without downloading them.
+
+        Args:
+            exact (bool): Count the documents instead of reading the collection metadata when there is no filter.
+            **filters (Any): Filters of the count endpoint, such as min_usage or category.
+
+        Returns:
+            CountResponse: The count and whether it is estimated.
+        """
+        page = await self.client.get(
+            f"{self.prefix}/count", {**filters, "exact": exact}
+        )
+        return CountResponse.model_validate(page.data)
+
+    async def get(self, key: str) -> ModelType | None:
+        """
+        Get a document by its name, title or email.
+
+        Args:
+            key (str): The path parameter of the detail endpoint.
+
+        Returns:
+            ModelType | None: The document, None if it does not exist.
+        """
+        try:
+            page = await self.client.get(f"{self.prefix}/{path_key(key)}")
+        except MongoChefError as error:
+            if error.status_code == 404:
+                return None
+            raise
+        return self.model.model_validate(page.data)
+
+    async def get_many(self, keys: Iterable[str]) -> List[ModelType | None]:
+        """
+        Get many documents with the batch endpoint of the router, or with concurrent requests bounded by the client concurrency.
+
+        Args:
+            keys (Iterable[str]): Names, titles or emails.
+
+        Returns:
+            List[ModelType | None]: The documents in the order of the keys, None for the missing ones.
+        """
+        if self.batch_keys is None:
+            return await self.client.batch(self.get, keys)
+
+        keys = list(keys)
+        chunks = [
+            keys[start : start + MAX_BATCH_KEYS]
+            for start in range(0, len(keys), MAX_BATCH_KEYS)
+        ]
+
+        async def post(chunk: List[str]) -> Any:
+            response = await self.client.http.post(
+                f"{self.prefix}/batch", json={self.batch_keys: chunk}
+            )
+            return self.client.decode(response)
+
+        answers = await self.client.batch(post, chunks)
+        return [
+            self.model.model_validate(item[self.batch_item]) if item["found"] else None
+            for answer in answers
+            for item in answer
+        ]
+
+    async def create(self, item: SchemaType) -> ModelType:
+        """
+        Create a document.
+
+        Args:
+            item (SchemaType): The request schema of the router.
+
+        Returns:
+            ModelType: The created document.
+        """
+        data = await self.client.send("POST", f"{self.prefix}/create", item)
+        return self.model.model_validate(data)
+
+    async def create_many(
+        self, items: Iterable[SchemaType]
+    ) -> List[ModelType | MongoChefError]:
+        """
+        Create many documents with concurrent requests bounded by the client concurrency.
+
+        Args:
+            items (Iterable[SchemaType]): The request schemas.
+
+        Returns:
+            List[ModelType | MongoChefError]: The created documents or the error of each item, in order.
+        """
+        return await self.client.batch(self.create, items, return_errors=True)
+
+    async def update(self, key: str, item: SchemaType) -> ModelType:
+        """
+        Update a document.
+
+        Args:
+            key (str): Name, title or email of the document.
+            item (SchemaType): The request schema with the new values.
+
+        Returns:
+            ModelType: The updated document.
+        """
+        data = await self.client.send(
+            "PUT", f"{self.prefix}/update/{path_key(key)}", item
+        )
+        return self.model.model_validate(data)
+
+    async def delete(self, key: str) -> ModelType:
+        """
+        Delete a document.
+
+        Args:
+            key (str): Name, title or email of the document.
+
+        Returns:
+            ModelType: The deleted document.
+        """
+        data = await self.client.send("DELETE", f"{self.prefix}/delete/{path_key(key)}")
+        return self.model.model_validate(data)
+
+
+class RecipesResource(Resource[Recipes, RecipesBase]):
+    """
+    Access to the /recipes endpoints.
+    """
+
+    batch_keys = "titles"
+    batch_item = "recipe"
+
+    async def similar(self, title: str, k: int = 10) -> List[SimilarRecipe]:
+        """
+        Get the recipes with the most similar ingredients.
+
+        Args:
+            title (str): Title of the reference recipe.
+            k (int): Maximum number of similar recipes.
+
+        Returns:
+            List[SimilarRecipe]: The similar recipes, most similar first.
+        """
+        page = await self.client.get(
+            f"{self.prefix}/{path_key(title)}/similar", {"k": k}
+        )
+        return [SimilarRecipe.model_validate(item) for item in page.data]
+
+    async def trending(self, limit: int = 20) -> List[Recipes]:
+        """
+        Get the recipes with the most views lately.
+
+        Args:
+            limit (int): Maximum number of recipes.
+
+        Returns:
+            List[Recipes]: The trending recipes, highest score first.
+        """
+        page = await self.client.get(f"{self.prefix}/trending", {"limit": limit})
+        return [self.model.model_validate(item) for item in page.data]
+
+    async def upload_image(
+        self, title: str, image: bytes | AsyncIterator[bytes], content_type: str
+    ) -> Recipes:
+        """
+        Upload the image of a recipe.
+
+        Args:
+            title (str): Title of the recipe.
+            image (bytes | AsyncIterator[bytes]): The image, streamed when an iterator is given.
+            content_type (str): Content type of the image.
+
+        Returns:
+            Recipes: The recipe with its image.
+        """
+        response = await self.client.http.put(
+            f"{self.prefix}/{path_key(title)}/image",
+            content=image,
+            headers={"Content-Type": content_type},
+        )
+        return self.model.model_validate(self.client.decode(response))
+
+    async def download_image(self, sha256: str) -> bytes:
+        """
+        Download an image or thumbnail by its content hash.
+
+        Args:
+            sha256 (str): SHA-256 from the recipe image attribute.
+
+        Returns:
+            bytes: The image.
+        """
+        response = await self.client.http.get(f"{self.prefix}/images/{sha256}")
+        if response.status_code >= 400:
+            self.client.decode(response)
+        return response.content
+
+
+class UsersResource(Resource[Users, UsersBase]):
+    """
+    Access to the /users endpoints.
+    """
+
+    batch_keys = "emails"
+    batch_item = "user"
+
+
+class MongoChefClient:
+    """
+    Async client of the MongoChef API with pooled keep-alive connections, ETag revalidation and bounded batches.
+
+    Use it as an async context manager, or call aclose() when done:
+
+        async with MongoChefClient() as client:
+            async for recipe in client.recipes.iterate():
+                ...
+
+    Attributes:
+        http (httpx.AsyncClient): The underlying HTTP/1.1 client.
+        cache (ETagCache): Cached GET responses.
+        causal_token (str | None): X-Causal-Token of the latest write, sent with the reads so they see it.
+        recipes (RecipesResource): The /recipes endpoints.
+        ingredients (Resource[Ingredients, IngredientsBase]): The /ingredients endpoints.
+        kitchen_tools (Resource[KitchenTools, KitchenToolsBase]): The /kitchen_tools endpoints.
+        categories (Resource[Categories, CategoriesBase]): The /categories endpoints.
+        users (UsersResource): The /users endpoints.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        concurrency: int = 10,
+        cache_entries: int = 512,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """
+        Args:
+            base_url (str): URL of the API.
+            max_connections (int): Maximum open connections.
+            max_keepalive_connections (int): Idle connections kept open for reuse.
+            keepalive_expiry (float): Seconds an idle connection is kept open.
+            timeout (float): Timeout of each request in seconds.
+            concurrency (int): Requests in flight at the same time in the batch helpers.
+            cache_entries (int): Maximum number of cached GET responses.
+            transport (httpx.AsyncBaseTransport | None): Custom transport, for tests.
+        """
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+        self.cache = ETagCache(cache_entries)
+        self.causal_token: str | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.recipes = RecipesResource(self, "/recipes", Recipes)
+        self.ingredients: Resource[Ingredients, IngredientsBase] = Resource(
+            self, "/ingredients", Ingredients
+        )
+        self.kitchen_tools: Resource[KitchenTools, KitchenToolsBase] = Resource(
+            self, "/kitchen_tools", KitchenTools
+        )
+        self.categories: Resource[Categories, CategoriesBase] = Resource(
+            self, "/categories", Categories
+        )
+        self.users = UsersResource(self, "/users", Users)
+
+    async def __aenter__(self) -> "MongoChefClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled connections.
+        """
+        await self.http.aclose()
+
+    @staticmethod
+    def decode(response: httpx.Response) -> Any:
+        """
+        Decode a JSON response or raise its error.
+
+        Args:
+            response (httpx.Response): The API response.
+
+        Raises:
+            MongoChefError: If the response is an error.
+
+        Returns:
+            Any: The decoded body.
+        """
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = response.text
+            raise MongoChefError(response.status_code, detail)
+        return response.json()
+
+    async def get(
+        self, path: str, params: Dict[str, Any] | None = None
+    ) -> CachedResponse:
+        """
+        Send a GET request revalidating the cached response with If-None-Match.
+
+        Args:
+            path (str): Path of the endpoint.
+            params (Dict[str, Any] | None): Query parameters.
+
+        Raises:
+            MongoChefError: If the response is an error.
+
+        Returns:
+            CachedResponse: The body and headers, from the cache when the server answers 304.
+        """
+        params = params or {}
+        key = (path, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        headers = {"If-None-Match": cached.etag} if cached else {}
+        if self.causal_token is not None:
+            headers[CAUSAL_TOKEN_HEADER] = self.causal_token
+
+        response = await self.http.get(path, params=params, headers=headers)
+        if cached and response.status_code == 304:
+            self.cache.hits += 1
+            return cached
+        self.cache.misses += 1
+
+        try:
+            data = self.decode(response)
+        except MongoChefError:
+            self.cache.discard(key)
+            raise
+        entry = CachedResponse(
+            etag=response.headers.get("etag", ""),
+            data=data,
+            headers={
+                name: value
+                for name, value in response.headers.items()
+                if name in (NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER)
+            },
+        )
+        if entry.etag:
+            self.cache.put(key, entry)
+        return entry
+
+    async def send(self, method: str, path: str, body: BaseModel | None = None) -> Any:
+        """
+        Send a write request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path of the endpoint.
+            body (BaseModel | None): Request schema sent as JSON.
+
+        Raises:
+            MongoChefError: If the response is an error.
+
+        Returns:
+            Any: The decoded body.
+        """
+        response = await self.http.request(
+            method,
+            path,
+            json=body.model_dump(mode="json") if body is not None else None,
+        )
+        # Reads after this write wait for it on the secondaries
+        self.causal_token = response.headers.get(CAUSAL_TOKEN_HEADER, self.causal_token)
+        return self.decode(response)
+
+    async def batch(
+        self,
+        function: Callable[[ItemType], Awaitable[ResultType]],
+        items: Iterable[ItemType],
+        return_errors: bool = False,
+    ) -> List[ResultType]:
+        """
+        Call a client method for many items concurrently, with at most `concurrency` requests in flight.
+
+        Args:
+            function (Callable[[ItemType], Awaitable[ResultType]]): The client method.
+            items (Iterable[ItemType]): Argument of each call.
+            return_errors (bool): Return the MongoChefError of failed calls instead of raising the first one.
+
+        Returns:
+            List[ResultType]: The results in the order of the items.
+        """
+
+        async def bounded(item: ItemType) -> ResultType:
+            async with self._semaphore:
+                try:
+                    return await function(item)
+                except MongoChefError as error:
+                    if return_errors:
+                        return error
+                    raise
+
+        return await asyncio.gather(*[bounded(item) for item in items])
@@ -0,0 +1,476 @@
+"""
+Models of the MongoChef API, generated from its OpenAPI schema by generate_models.py.
+
+Do not edit this file, run `python client/generate_models.py` against the API instead.
+"""
+
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BulkUpsertResult(BaseModel):
+    """
+    BulkUpsertResult is a Pydantic model that represents the outcome of a bulk upload to a catalog collection.
+
+    Attributes:
+        created (int): The number of new entries.
+        existing (int): The number of entries that already existed or were repeated in the upload.
+        invalid (int): The number of lines that could not be parsed or validated.
+        errors (List[str]): The first validation errors, with their line numbers.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    created: int = 0
+    existing: int = 0
+    invalid: int = 0
+    errors: List[str] = Field(default_factory=list)
+
+
+class Categories(BaseModel):
+    """
+    Recipes category model extends from Document for MongoDB template with Beanie ODM.
+
+    Attributes:
+        - name: str (unique, case and diacritic insensitive)
+        - description: str | None
+        - usage_count: int (recipes that reference it)
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str | None = Field(default=None, alias="_id")
+    name: str
+    description: str | None = None
+    usage_count: int = 0
+
+
+class CategoriesBase(BaseModel):
+    """
+    Pydantic model for recipes categories validation in the endpoint.
+
+    Attributes:
+        - name: str
+        - description: str | None
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str = Field(min_length=1, max_length=30)
+    description: str | None = Field(max_length=100)
+
+
+class CategoriesBaseInfo(BaseModel):
+    """
+    CategoriesBaseInfo is a Pydantic model that represents the information of recipe categories.
+
+    Attributes:
+        name (str): The name of the recipe category.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str
+
+
+class CategoriesInfo(BaseModel):
+    """
+    Template for the categories model with Beanie linked to Recipes model.
+
+    Attributes:
+        id (PydanticObjectId): Id of the category.
+        name (str): Name of the category.
+        description (str | None): Description of the category.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str
+    name: str
+    description: str | None = None
+
+
+class CountResponse(BaseModel):
+    """
+    CountResponse is a Pydantic model that represents the number of documents of a collection.
+
+    Attributes:
+        count (int): The number of documents matching the filters.
+        estimated (bool): True when the count comes from the collection metadata and may be slightly off.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    count: int
+    estimated: bool
+
+
+class DuplicateCluster(BaseModel):
+    """
+    DuplicateCluster is a Pydantic model that represents a group of recipes with the same content.
+
+    Attributes:
+        fingerprint (str): The content fingerprint shared by the recipes.
+        titles (List[str]): The titles of the recipes, oldest first.
+        ids (List[str]): The ids of the recipes, in the same order as the titles.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    fingerprint: str
+    titles: List[str]
+    ids: List[str]
+
+
+class ValidationError(BaseModel):
+    """
+    ValidationError
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    loc: List[str | int]
+    msg: str
+    type: str
+
+
+class HTTPValidationError(BaseModel):
+    """
+    HTTPValidationError
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    detail: List[ValidationError] = Field(default_factory=list)
+
+
+class Ingredients(BaseModel):
+    """
+    Ingredients model extends from Document for MongoDB template with Beanie ODM.
+
+    Attributes:
+        - name: str (unique, case and diacritic insensitive)
+        - usage_count: int (recipes that reference it)
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str | None = Field(default=None, alias="_id")
+    name: str
+    usage_count: int = 0
+
+
+class IngredientsBase(BaseModel):
+    """
+    Pydantic model for ingredient validation in the endpoint.
+
+    Attributes:
+        - name: str
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str = Field(min_length=1, max_length=30)
+
+
+class IngredientsBaseDetail(BaseModel):
+    """
+    IngredientsBaseDetail is a Pydantic model that represents the details of an ingredient.
+
+    Attributes:
+        name (str): The name of the ingredient.
+        quantity (int): The quantity of the ingredient.
+        unit (str): The unit of measurement for the ingredient.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str
+    quantity: int
+    unit: str
+
+
+class IngredientsInfo(BaseModel):
+    """
+    Template for the ingredients model with Beanie linked to Recipes model.
+
+    Attributes:
+        id (PydanticObjectId): Id of the ingredient.
+        name (str): Name of the ingredient.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str
+    name: str
+
+
+class IngredientsDetail(BaseModel):
+    """
+    Template for the ingredients attribute in the Recipes model adding the quantity and unit attributes.
+
+    Attributes:
+        ingredient_object (IngredientsInfo): Ingredient object.
+        quantity (int | float): Quantity of the ingredient.
+        unit (str): Unit of the ingredient.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    ingredient_object: IngredientsInfo
+    quantity: int | float
+    unit: str
+
+
+class KitchenTools(BaseModel):
+    """
+    Kitchen Tools model extends from Document for MongoDB template with Beanie ODM.
+
+    Attributes:
+        - name: str (unique, case and diacritic insensitive)
+        - usage_count: int (recipes that reference it)
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str | None = Field(default=None, alias="_id")
+    name: str
+    usage_count: int = 0
+
+
+class KitchenToolsBase(BaseModel):
+    """
+    Pydantic model for kitchen tools validation in the endpoint.
+
+    Attributes:
+        - name: str
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str = Field(min_length=1, max_length=30)
+
+
+class KitchenToolsBaseInfo(BaseModel):
+    """
+    KitchenToolsBaseInfo is a Pydantic model that represents the information of kitchen tools.
+
+    Attributes:
+        name (str): The name of the kitchen tools
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str
+
+
+class KitchenToolsInfo(BaseModel):
+    """
+    Template for the kitchen tools model with Beanie linked to Recipes model.
+
+    Attributes:
+        id (PydanticObjectId): Id of the kitchen tool.
+        name (str): Name of the kitchen tool.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str
+    name: str
+
+
+class RecipeImage(BaseModel):
+    """
+    Template for the image attribute in the Recipes model, the files are stored in GridFS named by their content hash.
+
+    Attributes:
+        sha256 (str): SHA-256 of the original image.
+        content_type (str): Content type of the original image.
+        length (int): Size of the original image in bytes.
+        thumbnail_sha256 (str): SHA-256 of the thumbnail.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    sha256: str
+    content_type: str
+    length: int
+    thumbnail_sha256: str
+
+
+class Recipes(BaseModel):
+    """
+    Recipe model with Beanie to save in a MongoDB database.
+
+    Attributes:
+        id (str): Id of the recipe.
+        title (str): Title of the recipe.
+        ingredients (List[IngredientsDetail]): List of ingredients with quantity and unit.
+        kitchen_tools (List[KitchenToolsInfo]): List of kitchen tools.
+        portions (int): Number of portions.
+        instructions (str): Instructions to prepare the recipe.
+        cooking_time (timedelta): Cooking time for the recipe.
+        category (CategoriesInfo): Category of the recipe.
+        image (RecipeImage | None): Image of the recipe.
+        fingerprint (str | None): Hash of the canonical content, equal for recipes that only differ in title or formatting.
+        view_count (int): Views of the recipe, written behind by the view counters.
+        trending_score (float): Views weighted with an exponential decay, higher is more viewed lately.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str | None = Field(default=None, alias="_id")
+    title: str
+    ingredients: List[IngredientsDetail]
+    kitchen_tools: List[KitchenToolsInfo]
+    portions: int
+    instructions: str
+    cooking_time: timedelta
+    category: CategoriesInfo
+    image: RecipeImage | None = None
+    fingerprint: str | None = None
+    view_count: int = 0
+    trending_score: float = 0.0
+
+
+class RecipesBase(BaseModel):
+    """
+    RecipesBase is a Pydantic model that represents the base information of a recipe.
+
+    Attributes:
+        title (str): The title of the recipe.
+        ingredients (List[IngredientsBaseDetail]): A list of ingredients required for the recipe.
+        kitchen_tools (List[KitchenToolsBaseInfo]): A list of kitchen tools required for the recipe.
+        portions (int): The number of portions the recipe serves.
+        instructions (str): The instructions for preparing the recipe.
+        cooking_time (int): The time required to cook the recipe in minutes.
+        category (CategoriesBaseInfo): The category of the recipe.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    title: str = Field(min_length=1, max_length=50)
+    ingredients: List[IngredientsBaseDetail]
+    kitchen_tools: List[KitchenToolsBaseInfo]
+    portions: int = Field(gt=1.0)
+    instructions: str = Field(min_length=1)
+    cooking_time: int = Field(gt=0.0)
+    category: CategoriesBaseInfo
+
+
+class RecipesBatchItem(BaseModel):
+    """
+    RecipesBatchItem is a Pydantic model that represents the answer for one title of a batch.
+
+    Attributes:
+        title (str): The requested title.
+        found (bool): Whether a recipe has the title.
+        recipe (Recipes | None): The recipe, None if it was not found.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    title: str
+    found: bool
+    recipe: Recipes | None = None
+
+
+class RecipesBatchRequest(BaseModel):
+    """
+    RecipesBatchRequest is a Pydantic model that represents the titles requested from the batch endpoint.
+
+    Attributes:
+        titles (List[str]): The titles of the recipes, in the order of the answer.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    titles: List[str] = Field(min_length=1, max_length=500)
+
+
+class SimilarRecipe(BaseModel):
+    """
+    SimilarRecipe is a Pydantic model that represents a neighbour returned by the similar recipes index.
+
+    Attributes:
+        title (str): The title of the similar recipe.
+        similarity (float): The estimated Jaccard similarity of the ingredient sets, from 0 to 1.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    title: str
+    similarity: float
+
+
+class Users(BaseModel):
+    """
+    Users model extends from Document for MongoDB template with Beanie ODM.
+
+    Attributes:
+        - name: str
+        - lastname1: str
+        - lastname2: str | None
+        - email: EmailStr (unique=True)
+        - favorite_recipes: List[Link[Recipes]]
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    id: str | None = Field(default=None, alias="_id")
+    name: str
+    lastname1: str
+    lastname2: str | None
+    email: str
+
+
+class UsersBase(BaseModel):
+    """
+    Pydantic model for users validation in the endpoint
+
+    Attributes:
+        - name: str
+        - lastname1: str
+        - lastname2: str | None
+        - email: EmailStr
+        - favorite_recipes: list | None
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: str = Field(min_length=1, max_length=70)
+    lastname1: str = Field(min_length=1, max_length=70)
+    lastname2: str | None = Field(default=None, max_length=70)
+    email: str = Field(min_length=1, max_length=150)
+
+
+class UsersBatchItem(BaseModel):
+    """
+    Pydantic model for the answer of one email of a batch
+
+    Attributes:
+        - email: EmailStr
+        - found: bool
+        - user: Users | None
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    email: str
+    found: bool
+    user: Users | None = None
+
+
+class UsersBatchRequest(BaseModel):
+    """
+    Pydantic model for the emails requested from the batch endpoint
+
+    Attributes:
+        - emails: List[EmailStr]
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    emails: List[str] = Field(min_length=1, max_length=500)
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+# Benchmark settings
+API_URL = "http://127.0.0.1:8000"
+PATH = "/recipes/"
+# Encodings compared: name, Accept and Accept-Encoding headers
+VARIANTS = [
+    ("json", "application/json", "identity"),
+    ("json+gzip", "application/json", "gzip"),
+    ("json+br", "application/json", "br"),
+    ("msgpack", "application/msgpack", "identity"),
+    ("msgpack+gzip", "application/msgpack", "gzip"),
+    ("msgpack+br", "application/msgpack", "br"),
+]
+
+
+async def measure(
+    api: httpx.AsyncClient, accept: str, encoding: str, requests: int, concurrency: int
+) -> tuple[int, str, list[float]]:
+    """
+    Send the list request repeatedly with the given headers.
+
+    Args:
+        api (httpx.AsyncClient): HTTP client for the API.
+        accept (str): Accept header.
+        encoding (str): Accept-Encoding header.
+        requests (int): Number of requests.
+        concurrency (int): Requests in flight at the same time.
+
+    Returns:
+        tuple[int, str, list[float]]: Bytes on the wire of one response, the content encoding sent by the server and the latency of each request in milliseconds.
+    """
+    headers = {"Accept": accept, "Accept-Encoding": encoding}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    wire_bytes = 0
+    content_encoding = "identity"
+
+    async def one() -> None:
+        nonlocal wire_bytes, content_encoding
+        async with semaphore:
+            start = time.perf_counter()
+            async with api.stream("GET", PATH, headers=headers) as response:
+                # Read the raw body so the size is measured before decompression
+                async for _ in response.aiter_raw():
+                    pass
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            wire_bytes = response.num_bytes_downloaded
+            content_encoding = response.headers.get("content-encoding", "identity")
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+    return wire_bytes, content_encoding, latencies
+
+
+async def main(requests: int, concurrency: int) -> None:
+    """
+    Print bytes on the wire and latency percentiles of GET /recipes/ per encoding.
+
+    Args:
+        requests (int): Number of requests per variant.
+        concurrency (int): Requests in flight at the same time.
+    """
+    async with httpx.AsyncClient(base_url=API_URL, timeout=60) as api:
+        print(
+            f"{'variant':<14}  {'sent as':<8}  {'bytes':>12}  {'p50 ms':>8}  {'p99 ms':>8}"
+        )
+        for name, accept, encoding in VARIANTS:
+            await measure(api, accept, encoding, 1, 1)  # Warm up
+            wire_bytes, content_encoding, latencies = await measure(
+                api, accept, encoding, requests, concurrency
+            )
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name:<14}  {content_encoding:<8}  {wire_bytes:>12,}  "
+                f"{statistics.median(latencies):>8.1f}  {percentiles[98]:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bytes on the wire and p99 latency of GET /recipes/ per encoding, "
+        "seed 10k recipes first with seed.py."
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.requests, arguments.concurrency))
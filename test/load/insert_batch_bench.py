@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+
+from database import DATABASE_URL  # noqa: E402
+from models.ingredients_model import Ingredients  # noqa: E402
+from utils.batcher import BATCH_MAX_SIZE, BATCH_WINDOW_MS, InsertBatcher  # noqa: E402
+
+# Benchmark settings, a separate database keeps the application data untouched
+DATABASE_NAME = "mongochef_benchmark"
+CONCURRENCY_LEVELS = [1, 10, 100, 1000]
+
+
+async def insert_single(name: str) -> None:
+    """
+    Insert one ingredient with its own insert command.
+
+    Args:
+        name (str): Name of the ingredient.
+    """
+    await Ingredients(name=name).insert()
+
+
+async def run(
+    label: str, insert, documents: int, concurrency: int, duplicates: float
+) -> None:
+    """
+    Insert the documents with a number of concurrent callers and print the throughput.
+
+    Args:
+        label (str): Name of the strategy.
+        insert: Coroutine function that inserts one ingredient by name.
+        documents (int): Number of inserts.
+        concurrency (int): Callers running at the same time.
+        duplicates (float): Share of inserts that repeat an existing name.
+    """
+    await Ingredients.delete_all()
+    unique = max(1, int(documents * (1 - duplicates)))
+    names = [f"ingredient {number % unique}" for number in range(documents)]
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def one(name: str) -> None:
+        nonlocal rejected
+        async with semaphore:
+            try:
+                await insert(name)
+            except Exception:
+                rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(name) for name in names])
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<10}  {concurrency:>11}  {documents / elapsed:>12,.0f}  "
+        f"{elapsed * 1000:>10.1f}  {rejected:>9}"
+    )
+
+
+async def main(documents: int, duplicates: float) -> None:
+    """
+    Compare single inserts with the micro-batcher at increasing concurrency.
+
+    Args:
+        documents (int): Number of inserts per run.
+        duplicates (float): Share of inserts that repeat an existing name.
+    """
+    client = AsyncIOMotorClient(DATABASE_URL)
+    await init_beanie(database=client[DATABASE_NAME], document_models=[Ingredients])
+    batcher = InsertBatcher(Ingredients, BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+
+    print(
+        f"window {BATCH_WINDOW_MS} ms, max batch {BATCH_MAX_SIZE}, "
+        f"{documents} inserts, {duplicates:.0%} duplicates"
+    )
+    print(
+        f"{'strategy':<10}  {'concurrency':>11}  {'inserts/s':>12}  {'total ms':>10}  {'409s':>9}"
+    )
+    for concurrency in CONCURRENCY_LEVELS:
+        await run("single", insert_single, documents, concurrency, duplicates)
+        await run(
+            "batched",
+            lambda name: batcher.insert(Ingredients(name=name)),
+            documents,
+            concurrency,
+            duplicates,
+        )
+    print(f"batches: {batcher.stats()}")
+
+    await client.drop_database(DATABASE_NAME)
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Throughput of single inserts against the catalog micro-batcher."
+    )
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument(
+        "--duplicates", type=float, default=0.1, help="Share of repeated names"
+    )
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.documents, arguments.duplicates))
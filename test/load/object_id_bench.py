@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import bson
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+
+import seed  # noqa: E402
+from database import COLLECTIONS, DATABASE_URL  # noqa: E402
+from utils.migrations import (  # noqa: E402
+    RECIPES_COLLECTION,
+    collection_sizes,
+    migrate_object_ids,
+)
+
+# Benchmark settings, a separate database keeps the application data untouched
+DATABASE_NAME = "mongochef_benchmark"
+SAMPLE_SIZE = 10_000  # Recipes encoded by the offline estimate
+
+
+def estimate(recipes: int) -> None:
+    """
+    Compare the BSON size of the same synthetic recipes with string and ObjectId references, without a server.
+
+    Args:
+        recipes (int): Number of recipes the sizes are extrapolated to.
+    """
+    catalogs = [
+        seed.catalog("ingredient", seed.CATALOG_SIZE),
+        seed.catalog("kitchen tool", seed.CATALOG_SIZE // 10),
+        seed.catalog("category", seed.CATALOG_SIZE // 20),
+    ]
+    sizes = {}
+    for legacy_ids in (True, False):
+        random.seed(214)  # Same recipes for both layouts
+        sizes[legacy_ids] = sum(
+            len(bson.encode(seed.recipe(number, *catalogs, legacy_ids=legacy_ids)))
+            for number in range(SAMPLE_SIZE)
+        )
+
+    legacy, compact = sizes[True] / SAMPLE_SIZE, sizes[False] / SAMPLE_SIZE
+    print(f"avgObjSize: {legacy:.0f} -> {compact:.0f} bytes")
+    print(
+        f"size for {recipes} recipes: {legacy * recipes / 2**20:.1f} -> "
+        f"{compact * recipes / 2**20:.1f} MiB ({(compact - legacy) / legacy:+.1%})"
+    )
+
+
+async def measure(recipes: int, compact: bool) -> None:
+    """
+    Seed recipes with string references, migrate them and print the collStats sizes.
+
+    Args:
+        recipes (int): Number of recipes to seed.
+        compact (bool): Run compact after the migration so the storage and index files shrink.
+    """
+    seed.seed(recipes, drop=True, legacy_ids=True, database_name=DATABASE_NAME)
+    client = AsyncIOMotorClient(DATABASE_URL)
+    database = client[DATABASE_NAME]
+    try:
+        # Builds the same indexes as the application
+        await init_beanie(database=database, document_models=COLLECTIONS)
+        summary = await migrate_object_ids(database)
+        after = summary["after"]
+        if compact:
+            await database.command("compact", RECIPES_COLLECTION)
+            after = await collection_sizes(database, RECIPES_COLLECTION)
+    finally:
+        client.close()
+
+    print(f"{summary['migrated']} recipes converted")
+    for key, before in summary["before"].items():
+        value = after.get(key, 0)
+        change = (value - before) / before if before else 0
+        print(f"{key}: {before} -> {value} ({change:+.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Size of the recipes with string and ObjectId references."
+    )
+    parser.add_argument("recipes", type=int, nargs="?", default=500_000)
+    parser.add_argument(
+        "--offline", action="store_true", help="Estimate the BSON sizes only"
+    )
+    parser.add_argument(
+        "--compact", action="store_true", help="Compact the collection afterwards"
+    )
+    arguments = parser.parse_args()
+    if arguments.offline:
+        estimate(arguments.recipes)
+    else:
+        asyncio.run(measure(arguments.recipes, arguments.compact))
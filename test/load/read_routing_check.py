@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+import httpx
+from pymongo import MongoClient
+
+# Check settings, the API must use the same replica set URL in MONGOCHEF_DATABASE_URL
+API_URL = "http://127.0.0.1:8000"
+DATABASE_URL = os.getenv(
+    "MONGOCHEF_DATABASE_URL", "mongodb://localhost:27017/?replicaSet=rs0"
+)
+READ_PATHS = ["/ingredients/", "/ingredients/count", "/recipes/", "/recipes/count"]
+
+
+def member_queries(mongo: MongoClient) -> Dict[str, int]:
+    """
+    Read the query and command counters of every member of the replica set.
+
+    Args:
+        mongo (MongoClient): Client connected to the replica set.
+
+    Returns:
+        Dict[str, int]: Queries and commands executed per "host:port (role)".
+    """
+    hello = mongo.admin.command("hello")
+    if "setName" not in hello:
+        raise SystemExit("The server is not a replica set, start mongod with --replSet")
+    counters = {}
+    for host in hello["hosts"]:
+        with MongoClient(host, directConnection=True) as member:
+            status = member.admin.command("serverStatus")
+        role = "primary" if host == hello["primary"] else "secondary"
+        opcounters = status["opcounters"]
+        counters[f"{host} ({role})"] = opcounters["query"] + opcounters["command"]
+    return counters
+
+
+async def main(requests: int) -> None:
+    """
+    Write through the API, read it back with the causal token and print where the reads went.
+
+    Args:
+        requests (int): Reads sent to each routed path.
+    """
+    mongo = MongoClient(DATABASE_URL)
+    before = member_queries(mongo)
+    async with httpx.AsyncClient(base_url=API_URL, timeout=30) as api:
+        counted = await api.get("/ingredients/count", params={"exact": True})
+        counted.raise_for_status()
+        name = f"routing check {time.time_ns() % 10**9}"
+        response = await api.post("/ingredients/create", json={"name": name})
+        response.raise_for_status()
+        token = response.headers.get("x-causal-token")
+        if token is None:
+            raise SystemExit(
+                "The write has no X-Causal-Token, check MONGOCHEF_DATABASE_URL"
+            )
+
+        # The count is routed to a secondary, the token makes it wait for the write
+        counted_after = await api.get(
+            "/ingredients/count",
+            params={"exact": True},
+            headers={"X-Causal-Token": token},
+        )
+        counted_after.raise_for_status()
+        if counted_after.json()["count"] <= counted.json()["count"]:
+            raise SystemExit("The causal read missed the write")
+        print("causal read ok")
+
+        # Concurrent creates share an insert batch, each one must get the token of the batch
+        names = [f"{name} batch {index}" for index in range(10)]
+        created = await asyncio.gather(
+            *[api.post("/ingredients/create", json={"name": item}) for item in names]
+        )
+        tokens = [response.headers.get("x-causal-token") for response in created]
+        if any(response.status_code >= 300 for response in created) or None in tokens:
+            raise SystemExit("A batched create failed or has no X-Causal-Token")
+        for item, token in zip(names, tokens):
+            listed = await api.get("/ingredients/", headers={"X-Causal-Token": token})
+            listed.raise_for_status()
+            if item not in {ingredient["name"] for ingredient in listed.json()}:
+                raise SystemExit(f"The list after creating {item!r} missed it")
+        print("create then list ok")
+
+        for path in READ_PATHS:
+            responses = await asyncio.gather(*[api.get(path) for _ in range(requests)])
+            failed = [item.status_code for item in responses if item.status_code >= 500]
+            if failed:
+                raise SystemExit(f"{path}: {len(failed)} requests failed")
+
+        for item in [name, *names]:
+            response = await api.delete(f"/ingredients/delete/{item}")
+            response.raise_for_status()
+    after = member_queries(mongo)
+    mongo.close()
+
+    # With a single host every read falls back to the primary
+    print("member  queries_and_commands")
+    for member, queries in after.items():
+        print(f"{member}  {queries - before.get(member, 0)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check the secondary reads and the causal token against a replica set."
+    )
+    parser.add_argument("requests", type=int, nargs="?", default=100)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,151 @@
+import argparse
+import os
+import random
+from collections import Counter
+from bson import ObjectId
+from pymongo import MongoClient
+
+# Seed settings
+DATABASE_URL = os.getenv("MONGOCHEF_DATABASE_URL", "mongodb://localhost:27017")
+DATABASE_NAME = "mongochef"
+CATALOG_SIZE = 500
+BATCH_SIZE = 1000
+UNITS = ["g", "kg", "ml", "l", "cup", "tbsp", "tsp", "piece"]
+WORDS = (
+    "chop stir bake simmer fold whisk roast season rest serve slice grill "
+    "boil drain mix knead toast blend pour cover reduce"
+).split()
+
+
+def catalog(prefix: str, size: int) -> list[dict]:
+    """
+    Build the entries of a catalog collection.
+
+    Args:
+        prefix (str): Prefix of the entry names.
+        size (int): Number of entries.
+
+    Returns:
+        list[dict]: Catalog documents with their ids.
+    """
+    return [
+        {"_id": ObjectId(), "name": f"{prefix} {number}", "usage_count": 0}
+        for number in range(size)
+    ]
+
+
+def recipe(
+    number: int,
+    ingredients: list[dict],
+    tools: list[dict],
+    categories: list[dict],
+    legacy_ids: bool = False,
+) -> dict:
+    """
+    Build a synthetic recipe with a realistic size.
+
+    Args:
+        number (int): Number of the recipe, used in the title.
+        ingredients (list[dict]): Ingredient documents.
+        tools (list[dict]): Kitchen tool documents.
+        categories (list[dict]): Category documents.
+        legacy_ids (bool): Store the references as strings like the schema before ObjectId references.
+
+    Returns:
+        dict: Recipe document in the stored format.
+    """
+    reference = str if legacy_ids else ObjectId
+    category = random.choice(categories)
+    return {
+        "title": f"synthetic recipe {number}",
+        "ingredients": [
+            {
+                "ingredient_object": {
+                    "id": reference(item["_id"]),
+                    "name": item["name"],
+                },
+                "quantity": random.randint(1, 500),
+                "unit": random.choice(UNITS),
+            }
+            for item in random.sample(ingredients, random.randint(4, 12))
+        ],
+        "kitchen_tools": [
+            {"id": reference(item["_id"]), "name": item["name"]}
+            for item in random.sample(tools, random.randint(1, 4))
+        ],
+        "portions": random.randint(1, 8),
+        "instructions": " ".join(random.choices(WORDS, k=random.randint(60, 200))),
+        "cooking_time": float(random.randint(5, 240) * 60),
+        "category": {
+            "id": reference(category["_id"]),
+            "name": category["name"],
+            "description": None,
+        },
+    }
+
+
+def seed(
+    recipes: int,
+    drop: bool,
+    legacy_ids: bool = False,
+    database_name: str = DATABASE_NAME,
+) -> None:
+    """
+    Insert the catalog entries and the synthetic recipes.
+
+    Args:
+        recipes (int): Number of recipes to insert.
+        drop (bool): Drop the seeded collections first.
+        legacy_ids (bool): Store the references as strings like the schema before ObjectId references.
+        database_name (str): Database to seed.
+    """
+    client = MongoClient(DATABASE_URL)
+    database = client[database_name]
+    collections = {
+        "ingredients": catalog("ingredient", CATALOG_SIZE),
+        "kitchen_tools": catalog("kitchen tool", CATALOG_SIZE // 10),
+        "categories": catalog("category", CATALOG_SIZE // 20),
+    }
+    if drop:
+        for name in [*collections, "Recipes"]:
+            database[name].delete_many({})
+
+    usage = Counter()
+    batch = []
+    for number in range(recipes):
+        document = recipe(number, *collections.values(), legacy_ids=legacy_ids)
+        usage.update(
+            str(item["ingredient_object"]["id"]) for item in document["ingredients"]
+        )
+        usage.update(str(item["id"]) for item in document["kitchen_tools"])
+        usage[str(document["category"]["id"])] += 1
+        batch.append(document)
+        if len(batch) == BATCH_SIZE:
+            database["Recipes"].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        database["Recipes"].insert_many(batch, ordered=False)
+
+    for name, entries in collections.items():
+        for entry in entries:
+            entry["usage_count"] = usage[str(entry["_id"])]
+        database[name].insert_many(entries, ordered=False)
+    client.close()
+    print(f"Inserted {recipes} recipes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed MongoChef with synthetic recipes."
+    )
+    parser.add_argument("recipes", type=int, nargs="?", default=10_000)
+    parser.add_argument(
+        "--drop", action="store_true", help="Delete the seeded collections first"
+    )
+    parser.add_argument(
+        "--legacy-ids",
+        action="store_true",
+        help="Store the references as strings to try migrate-object-ids",
+    )
+    arguments = parser.parse_args()
+    seed(arguments.recipes, arguments.drop, arguments.legacy_ids)
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import time
+import httpx
+from pymongo import MongoClient
+
+# Load test settings
+API_URL = "http://127.0.0.1:8000"
+DATABASE_URL = os.getenv("MONGOCHEF_DATABASE_URL", "mongodb://localhost:27017")
+CONCURRENCY_LEVELS = [1, 10, 50, 100, 250, 500]
+
+
+def mongo_queries(client: MongoClient) -> int:
+    """
+    Read the number of queries executed by the MongoDB server.
+
+    Args:
+        client (MongoClient): MongoDB client.
+
+    Returns:
+        int: The opcounters query counter of the server.
+    """
+    return client.admin.command("serverStatus")["opcounters"]["query"]
+
+
+async def herd(api: httpx.AsyncClient, title: str, concurrency: int) -> float:
+    """
+    Send the same recipe detail request from many clients at the same time.
+
+    Args:
+        api (httpx.AsyncClient): HTTP client for the API.
+        title (str): Title of the recipe requested by the herd.
+        concurrency (int): Number of simultaneous requests.
+
+    Returns:
+        float: Elapsed seconds for the whole herd.
+    """
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *[api.get(f"/recipes/{title}") for _ in range(concurrency)]
+    )
+    elapsed = time.perf_counter() - start
+    failed = [response.status_code for response in responses if response.status_code != 200]
+    if failed:
+        raise SystemExit(f"{len(failed)} requests failed: {set(failed)}")
+    return elapsed
+
+
+async def main(title: str) -> None:
+    """
+    Run the herd at increasing concurrency and print the MongoDB queries it caused.
+
+    Args:
+        title (str): Title of an existing recipe.
+    """
+    mongo = MongoClient(DATABASE_URL)
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS))
+    async with httpx.AsyncClient(base_url=API_URL, limits=limits, timeout=30) as api:
+        print("requests  mongo_queries  coalesced  elapsed_ms  mongo_qps")
+        for concurrency in CONCURRENCY_LEVELS:
+            before_metrics = (await api.get("/admin/metrics")).json()["single_flight"]
+            before_queries = mongo_queries(mongo)
+
+            elapsed = await herd(api, title, concurrency)
+
+            queries = mongo_queries(mongo) - before_queries
+            after_metrics = (await api.get("/admin/metrics")).json()["single_flight"]
+            coalesced = after_metrics["coalesced"] - before_metrics["coalesced"]
+            print(
+                f"{concurrency:>8}  {queries:>13}  {coalesced:>9}  "
+                f"{elapsed * 1000:>10.1f}  {queries / elapsed:>9.0f}"
+            )
+    mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thundering herd load test for GET /recipes/{title}.")
+    parser.add_argument("title", help="Title of an existing recipe")
+    asyncio.run(main(parser.parse_args().title))